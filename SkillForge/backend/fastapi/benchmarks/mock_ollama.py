@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import uvicorn
+
+from services.keep_alive import seconds
+
+# Stand-in for Ollama's /api/generate and /api/chat with a controllable speed and failure profile.
+# Responses are canned per service (picked from the prompt's persona line), so the backend's
+# parsing and validation paths run exactly as they would against a real model.
+MOCK_OLLAMA_LATENCY = float(os.getenv("MOCK_OLLAMA_LATENCY", "0.2"))          # seconds before the first token
+MOCK_OLLAMA_TOKENS_PER_SEC = float(os.getenv("MOCK_OLLAMA_TOKENS_PER_SEC", "200"))
+MOCK_OLLAMA_MALFORMED_RATE = float(os.getenv("MOCK_OLLAMA_MALFORMED_RATE", "0"))  # 0..1 share of broken JSON
+MOCK_OLLAMA_LOAD_SECONDS = float(os.getenv("MOCK_OLLAMA_LOAD_SECONDS", "0"))  # calls that find the model unloaded
+MOCK_OLLAMA_MODELS = [m.strip() for m in os.getenv("MOCK_OLLAMA_MODELS", "llama3.2").split(",") if m.strip()]
+
+CHARS_PER_TOKEN = 4
+
+app = FastAPI(title="Mock Ollama")
+_loaded = {}  # model -> when its keep_alive runs out
+_stats = {"generate": 0, "chat": 0, "malformed": 0, "tokens": 0}
+
+
+def _roadmap() -> dict:
+    return {"roadmap": [
+        {
+            "step_number": i,
+            "title": f"Milestone {i}",
+            "description": "Build a small project that practices the skills of this stage and write up what you learned.",
+            "resources": ["Official documentation", "A hands-on course"],
+            "estimated_time": "2 weeks",
+        }
+        for i in range(1, 7)
+    ]}
+
+
+RESPONSES = {
+    # persona line in the prompt -> response body
+    "Resume Analyzer": lambda: {
+        "ats_score": random.randint(40, 95),
+        "summary": "Solid backend experience with Python and cloud services; light on the requested data tooling.",
+        "missing_keywords": ["Kubernetes", "Airflow", "Terraform"],
+        "feedback": "Quantify the impact of each role, move the skills section above education and mention CI/CD ownership.",
+    },
+    "Career Coach and Mentor": _roadmap,
+    "Data Extraction Specialist": lambda: {
+        "name": "Alex Doe",
+        "tagline": "Backend engineer who ships reliable APIs",
+        "about": "Engineer with five years of experience building Python services and data pipelines.",
+        "skills": ["Python", "FastAPI", "PostgreSQL", "Docker"],
+        "projects": [{"title": "Ledger API", "description": "Double-entry bookkeeping service", "tech_stack": ["Python"]}],
+        "contact": {"email": "alex@example.com"},
+    },
+    "Technical Interviewer": lambda: {
+        "title": f"Pair Sum #{random.randint(1, 10 ** 6)}",
+        "description": "Given an array of integers and a target, return the indices of the two numbers that add up to the target.",
+        "examples": [{"input": "nums = [2,7,11,15], target = 9", "output": "[0,1]", "explanation": "2 + 7 = 9"}],
+        "constraints": ["2 <= nums.length <= 10^4"],
+        "starter_code": "def pair_sum(nums, target):\n    pass",
+    },
+    "Game Master": lambda: {
+        "question": f"Which data structure gives O(1) average lookup? (#{random.randint(1, 10 ** 6)})",
+        "options": ["Hash map", "Linked list", "Binary heap", "Stack"],
+        "correct_index": 0,
+        "difficulty": "Easy",
+    },
+    # Section-mode LinkedIn prompt for one experience entry (checked before the whole-profile persona)
+    "POSITION TO DESCRIBE": lambda: {"description": ["Cut p95 latency by 40%", "Led the move to FastAPI"]},
+    "LinkedIn Expert": lambda: {
+        "headline": "Backend Engineer | Python, FastAPI, PostgreSQL | Building reliable APIs",
+        "about": "I build backend services that stay fast under load. " * 4,
+        "experience_descriptions": [{"company": "Acme", "role": "Engineer", "description": ["Cut p95 latency by 40%"]}],
+        "projects_section": "Ledger API - double-entry bookkeeping service in FastAPI.",
+        "skills_section": "Python, FastAPI, PostgreSQL, Docker, AWS",
+        "recommendation_draft": "Alex is a dependable engineer who raises the bar for the whole team.",
+    },
+}
+TEXT_RESPONSE = (
+    "Nice start! Think about what you have already seen while scanning the array. "
+    "A dictionary from value to index lets you check for the complement in constant time."
+)
+
+
+def _malform(text: str) -> str:
+    # The defects small models actually produce; services/json_repair.py should recover all of them
+    kind = random.choice(("fence", "trailing_comma", "single_quotes", "truncated"))
+    if kind == "fence":
+        return f"Sure! Here is the JSON:\n```json\n{text}\n```"
+    if kind == "trailing_comma":
+        return text[:-1] + ",}"
+    if kind == "single_quotes":
+        return text.replace('"', "'")
+    return text[: int(len(text) * 0.8)]
+
+
+def render_response(prompt: str, json_mode: bool) -> str:
+    for persona, build in RESPONSES.items():
+        if persona in prompt:
+            text = json.dumps(build())
+            if random.random() < MOCK_OLLAMA_MALFORMED_RATE:
+                _stats["malformed"] += 1
+                text = _malform(text)
+            return text
+    return json.dumps({"response": TEXT_RESPONSE}) if json_mode else TEXT_RESPONSE
+
+
+def _timings(prompt: str, text: str, load: float, eval_seconds: float) -> dict:
+    prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+    eval_count = max(1, len(text) // CHARS_PER_TOKEN)
+    return {
+        "done": True,
+        "done_reason": "stop",
+        "context": [1, 2, 3],
+        "load_duration": int(load * 1e9),
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": int(MOCK_OLLAMA_LATENCY * 1e9),
+        "eval_count": eval_count,
+        "eval_duration": int(max(eval_seconds, 1e-6) * 1e9),
+        "total_duration": int((load + MOCK_OLLAMA_LATENCY + eval_seconds) * 1e9),
+    }
+
+
+def _running() -> list:
+    now = time.monotonic()
+    for model in [m for m, expires in _loaded.items() if expires <= now]:
+        del _loaded[model]
+    return sorted(_loaded)
+
+
+async def _load(model: str, keep_alive) -> float:
+    # Like Ollama, every call resets the model's timer to the keep_alive it sends (default 5m)
+    cold = model not in _running()
+    _loaded[model] = time.monotonic() + seconds(keep_alive if keep_alive is not None else "5m")
+    if not cold or not MOCK_OLLAMA_LOAD_SECONDS:
+        return 0.0
+    await asyncio.sleep(MOCK_OLLAMA_LOAD_SECONDS)
+    return MOCK_OLLAMA_LOAD_SECONDS
+
+
+def _token_chunks(text: str):
+    for i in range(0, len(text), CHARS_PER_TOKEN):
+        yield text[i:i + CHARS_PER_TOKEN]
+
+
+async def _respond(body: dict, prompt: str, text: str, wrap):
+    """
+    wrap(piece) builds one response chunk; /api/generate and /api/chat differ only there.
+    """
+    load = await _load(body.get("model", ""), body.get("keep_alive"))
+    num_predict = (body.get("options") or {}).get("num_predict")
+    if num_predict and num_predict > 0:
+        text = text[:num_predict * CHARS_PER_TOKEN]
+    await asyncio.sleep(MOCK_OLLAMA_LATENCY)
+    eval_seconds = (len(text) / CHARS_PER_TOKEN) / MOCK_OLLAMA_TOKENS_PER_SEC
+    _stats["tokens"] += len(text) // CHARS_PER_TOKEN
+
+    if not body.get("stream", True):
+        await asyncio.sleep(eval_seconds)
+        return {"model": body.get("model"), **wrap(text), **_timings(prompt, text, load, eval_seconds)}
+
+    async def chunks():
+        started = time.perf_counter()
+        per_token = 1 / MOCK_OLLAMA_TOKENS_PER_SEC
+        for i, piece in enumerate(_token_chunks(text)):
+            # Sleep against the wall clock so the stream keeps its token rate under load
+            delay = started + (i + 1) * per_token - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield json.dumps({"model": body.get("model"), **wrap(piece), "done": False}) + "\n"
+        yield json.dumps({"model": body.get("model"), **wrap(""), **_timings(prompt, text, load, eval_seconds)}) + "\n"
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    _stats["generate"] += 1
+    prompt = body.get("prompt", "")
+    text = render_response(prompt, body.get("format") == "json")
+    return await _respond(body, prompt, text, lambda piece: {"response": piece})
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = await request.json()
+    _stats["chat"] += 1
+    prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+    text = render_response(prompt, body.get("format") == "json")
+    return await _respond(body, prompt, text, lambda piece: {"message": {"role": "assistant", "content": piece}})
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": m if ":" in m else f"{m}:latest", "model": m} for m in MOCK_OLLAMA_MODELS]}
+
+
+@app.get("/api/ps")
+async def running():
+    return {"models": [{"name": m, "model": m} for m in _running()]}
+
+
+@app.get("/mock/stats")
+async def mock_stats():
+    return _stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import asyncio
+import argparse
+
+from fastapi import FastAPI, Request
+import uvicorn
+
+# Stand-in for Piston's POST /execute. Every program "echoes" its stdin, so judge test cases whose
+# expected output equals their input are accepted; programs containing "raise" exit with an error.
+MOCK_PISTON_RUN_SECONDS = float(os.getenv("MOCK_PISTON_RUN_SECONDS", "0.05"))
+MOCK_PISTON_COMPILE_SECONDS = float(os.getenv("MOCK_PISTON_COMPILE_SECONDS", "0.5"))
+
+COMPILED_LANGUAGES = {"c", "c++", "java", "go", "rust"}
+
+app = FastAPI(title="Mock Piston")
+_stats = {"executions": 0, "compiles": 0}
+
+
+def _stage(stdout: str = "", stderr: str = "", code: int = 0) -> dict:
+    return {"stdout": stdout, "stderr": stderr, "output": stdout + stderr, "code": code, "signal": None}
+
+
+@app.post("/execute")
+async def execute(request: Request):
+    body = await request.json()
+    _stats["executions"] += 1
+    language = body.get("language", "")
+    source = "".join(f.get("content", "") for f in body.get("files", []))
+    response = {"language": language, "version": body.get("version", "*")}
+
+    if language in COMPILED_LANGUAGES:
+        _stats["compiles"] += 1
+        await asyncio.sleep(MOCK_PISTON_COMPILE_SECONDS)
+        response["compile"] = _stage()
+
+    await asyncio.sleep(MOCK_PISTON_RUN_SECONDS)
+    if "raise" in source:
+        response["run"] = _stage(stderr="Traceback (most recent call last):\nRuntimeError\n", code=1)
+    else:
+        response["run"] = _stage(stdout=body.get("stdin", ""))
+    return response
+
+
+@app.get("/mock/stats")
+async def mock_stats():
+    return _stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Piston server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11600)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import random
+
+from benchmarks.sample_resumes import sample_resume
+
+# Scripted load per endpoint. build(i, unique) returns the request for the i-th call; with unique=False
+# every call sends the same input, which measures the cache-hit path instead of generation.
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to build Python APIs with FastAPI and PostgreSQL, run services on "
+    "Kubernetes and AWS, own CI/CD pipelines and mentor junior engineers. Airflow and Terraform are a plus."
+)
+ROLES = ["Data Engineer", "ML Engineer", "Site Reliability Engineer", "Security Engineer", "Engineering Manager"]
+TOPICS = ["arrays", "graphs", "dynamic programming", "trees", "strings", "heaps"]
+ECHO_PROGRAM = "import sys\nprint(sys.stdin.read(), end='')\n"
+ECHO_PROGRAM_C = "#include <stdio.h>\nint main(void) { int c; while ((c = getchar()) != EOF) putchar(c); return 0; }\n"
+
+
+class Profile:
+    def __init__(self, name: str, description: str, build, concurrency: int = 8, requests: int = 100):
+        self.name = name
+        self.description = description
+        self.build = build
+        self.concurrency = concurrency
+        self.requests = requests
+
+
+def _tag(i: int, unique: bool) -> str:
+    return f"bench-{i}" if unique else "bench"
+
+
+def _analyze(size: str, mode: str = "hybrid"):
+    def build(i, unique):
+        tag = _tag(i, unique)
+        return {
+            "method": "POST", "path": "/analyze",
+            "params": {"job_description": f"{JOB_DESCRIPTION} Ref {tag}.", "mode": mode},
+            "files": {"file": (f"resume_{size}.pdf", sample_resume(size, tag), "application/pdf")},
+        }
+    return build
+
+
+def _roadmap(path: str):
+    def build(i, unique):
+        return {"method": "POST", "path": path, "json": {
+            "current_role": "Backend Developer",
+            "target_role": f"{ROLES[i % len(ROLES)]} ({_tag(i, unique)})" if unique else ROLES[0],
+            "skills": "Python, SQL, Docker",
+        }}
+    return build
+
+
+# The same three requests as users actually type them; after the first of each, the rest are near-duplicate hits
+PARAPHRASES = [
+    ("frontend dev", "ML engineer", "python, react"),
+    ("Frontend Developer", "ML Engineer", "React, Python"),
+    ("Front-end developer", "Machine Learning Engineer", "react,python"),
+    ("backend dev", "SRE", "go, docker, k8s"),
+    ("Backend Developer", "sre", "Docker, Go, Kubernetes"),
+    ("jr data analyst", "Data Engineer", "sql, excel"),
+    ("Junior Data Analyst", "data engineer", "Excel, SQL"),
+]
+
+
+def _roadmap_paraphrase(i, unique):
+    current_role, target_role, skills = PARAPHRASES[i % len(PARAPHRASES)]
+    return {"method": "POST", "path": "/roadmap", "json": {
+        "current_role": current_role, "target_role": target_role, "skills": skills,
+    }}
+
+
+def _portfolio(i, unique):
+    tag = _tag(i, unique)
+    return {
+        "method": "POST", "path": "/generate-portfolio",
+        "data": {"text_content": f"Open to remote work. {tag}"},
+        "files": {"file": ("resume.pdf", sample_resume("medium", tag), "application/pdf")},
+    }
+
+
+def _dsa_generate(i, unique):
+    topic = f"{TOPICS[i % len(TOPICS)]} {_tag(i, unique)}" if unique else TOPICS[0]
+    return {"method": "POST", "path": "/dsa/generate", "json": {"topic": topic, "difficulty": "Medium"}}
+
+
+def _dsa_run(i, unique):
+    return {"method": "POST", "path": "/dsa/run", "json": {"language": "python", "code": ECHO_PROGRAM, "stdin": f"{i}\n"}}
+
+
+def _dsa_run_compiled(i, unique):
+    # The same C program rerun with new stdin; unique sources (a tag comment) force a compile every time
+    code = f"// {_tag(i, unique)}\n{ECHO_PROGRAM_C}"
+    return {"method": "POST", "path": "/dsa/run", "json": {"language": "c", "code": code, "stdin": f"{i}\n"}}
+
+
+def _dsa_judge(i, unique):
+    cases = [{"input": f"{i} {n}\n", "output": f"{i} {n}\n"} for n in range(10)]
+    return {"method": "POST", "path": "/dsa/judge", "json": {"language": "python", "code": ECHO_PROGRAM, "test_cases": cases}}
+
+
+def _yuvi(path: str):
+    def build(i, unique):
+        return {"method": "POST", "path": path, "json": {
+            "code": "def two_sum(nums, target):\n    for i in range(len(nums)):\n        pass",
+            "question": "Two Sum",
+            "user_query": f"Why is my solution slow? ({_tag(i, unique)})",
+        }}
+    return build
+
+
+def _yuvi_session(i, unique):
+    # Five-turn conversations whose code grows a line per turn, as a user iterating on a solution would
+    turn = i % 5
+    lines = ["def two_sum(nums, target):", "    seen = {}"] + [f"    # step {n}" for n in range(turn)]
+    return {"method": "POST", "path": "/dsa/yuvi", "json": {
+        "code": "\n".join(lines),
+        "question": "Two Sum",
+        "user_query": f"What should I do next? (turn {turn})",
+        "session_id": f"bench-session-{i // 5}" if unique else "bench-session",
+    }}
+
+
+def _game(i, unique):
+    return {"method": "POST", "path": "/game/generate", "json": {"topic": TOPICS[i % len(TOPICS)] if unique else TOPICS[0]}}
+
+
+def _linkedin(path: str, mode: str = "single"):
+    def build(i, unique):
+        return {"method": "POST", "path": path, "params": {"mode": mode}, "json": {
+            "fullName": "Alex Doe",
+            "targetRole": f"Backend Engineer {_tag(i, unique)}",
+            "currentSummary": "Backend developer with 6 years of Python experience.",
+            "skills": "Python, FastAPI, PostgreSQL, Docker, AWS",
+            "experience": [
+                {"company": "Acme", "role": "Engineer", "duration": "2019-2023"},
+                {"company": "Globex", "role": "Senior Engineer", "duration": "2023-"},
+            ],
+        }}
+    return build
+
+
+PROFILES = {p.name: p for p in [
+    Profile("analyze-small", "1-page resume PDF, hybrid analysis", _analyze("small")),
+    Profile("analyze-large", "10-page resume PDF, hybrid analysis", _analyze("large"), concurrency=4, requests=40),
+    Profile("analyze-fast", "1-page resume PDF, keyword-only analysis (no LLM)", _analyze("small", "fast"), requests=200),
+    Profile("roadmap", "career roadmap", _roadmap("/roadmap")),
+    Profile("roadmap-stream", "career roadmap, NDJSON stream", _roadmap("/roadmap/stream")),
+    Profile("roadmap-paraphrase", "career roadmap, reworded repeats of a few requests", _roadmap_paraphrase),
+    Profile("portfolio", "3-page resume PDF plus notes", _portfolio, concurrency=4, requests=40),
+    Profile("dsa-generate", "DSA problem generation", _dsa_generate),
+    Profile("dsa-run", "single code execution", _dsa_run, concurrency=16, requests=200),
+    Profile("dsa-run-compiled", "C code execution, rerun with new stdin", _dsa_run_compiled, concurrency=8, requests=100),
+    Profile("dsa-judge", "10 test cases per submission", _dsa_judge, concurrency=4, requests=40),
+    Profile("yuvi", "tutor hint", _yuvi("/dsa/yuvi")),
+    Profile("yuvi-stream", "tutor hint, token stream", _yuvi("/dsa/yuvi/stream")),
+    Profile("yuvi-session", "five-turn tutor conversations with growing code", _yuvi_session),
+    Profile("game", "battle question from the pool", _game, concurrency=16, requests=200),
+    Profile("linkedin", "LinkedIn profile", _linkedin("/linkedin/generate")),
+    Profile("linkedin-stream", "LinkedIn profile, NDJSON stream", _linkedin("/linkedin/generate/stream")),
+    Profile("linkedin-sections", "LinkedIn profile, one generation per section", _linkedin("/linkedin/generate", "sections")),
+]}
+
+# Weighted mix approximating production traffic, for the "mixed" profile
+MIX = [
+    ("analyze-small", 30), ("roadmap", 15), ("dsa-run", 20), ("yuvi-stream", 10),
+    ("game", 10), ("dsa-generate", 5), ("linkedin", 5), ("portfolio", 5),
+]
+
+
+def _mixed(i, unique):
+    rng = random.Random(i)
+    name = rng.choices([n for n, _ in MIX], weights=[w for _, w in MIX])[0]
+    return PROFILES[name].build(i, unique)
+
+
+PROFILES["mixed"] = Profile("mixed", "weighted mix of all endpoints", _mixed, concurrency=16, requests=300)
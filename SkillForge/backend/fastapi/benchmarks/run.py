@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import datetime
+import subprocess
+
+import httpx
+
+from benchmarks.profiles import PROFILES
+
+# Load generator for the FastAPI backend. By default it starts the mock Ollama / Piston servers,
+# runs the app in-process against them and drives each profile with a fixed number of concurrent
+# clients; --url benchmarks an already running server instead (point its OLLAMA_URL / PISTON_API_URL
+# at the mocks this script starts).
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAG_SAMPLE_INTERVAL = 0.01
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+
+# --- mock servers ---
+
+def _wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Mock server on port {port} did not start")
+
+
+def start_mocks(args) -> list:
+    env = {
+        **os.environ,
+        "MOCK_OLLAMA_LATENCY": str(args.latency),
+        "MOCK_OLLAMA_TOKENS_PER_SEC": str(args.tokens_per_sec),
+        "MOCK_OLLAMA_MALFORMED_RATE": str(args.malformed_rate),
+        "MOCK_OLLAMA_LOAD_SECONDS": str(args.load_seconds),
+        "MOCK_PISTON_RUN_SECONDS": str(args.piston_run_seconds),
+        "MOCK_PISTON_COMPILE_SECONDS": str(args.piston_compile_seconds),
+    }
+    procs = []
+    for module, port in (("benchmarks.mock_ollama", args.ollama_port), ("benchmarks.mock_piston", args.piston_port)):
+        procs.append(subprocess.Popen([sys.executable, "-m", module, "--port", str(port)], cwd=BACKEND_DIR, env=env))
+    for port in (args.ollama_port, args.piston_port):
+        _wait_for_port(port)
+    return procs
+
+
+def configure_app_env(args):
+    # Must run before main is imported: services read their settings at import time
+    os.environ["OLLAMA_URL"] = f"http://127.0.0.1:{args.ollama_port}"
+    os.environ.pop("OLLAMA_BACKENDS", None)
+    os.environ["PISTON_API_URL"] = f"http://127.0.0.1:{args.piston_port}/execute"
+    os.environ["CODE_RUNNER_BACKEND"] = "local" if args.local_runner else "piston"
+    os.environ["LLM_CACHE_ENABLED"] = "1" if args.cache else "0"
+    os.environ["LLM_CACHE_DB"] = ""
+    os.environ.setdefault("GAME_POOL_PREWARM_TOPICS", "")
+
+
+# --- server metrics ---
+
+def parse_metrics(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        name_labels, _, value = line.rpartition(" ")
+        name, _, labels = name_labels.partition("{")
+        pairs = tuple(sorted(tuple(p.split("=", 1)) for p in labels.rstrip("}").split(",") if "=" in p))
+        samples[(name, tuple((k, v.strip('"')) for k, v in pairs))] = float(value)
+    return samples
+
+
+async def scrape(client: httpx.AsyncClient) -> dict:
+    try:
+        response = await client.get("/metrics")
+        return parse_metrics(response.text) if response.status_code == 200 else {}
+    except httpx.HTTPError:
+        return {}
+
+
+def _delta(before: dict, after: dict, name: str) -> dict:
+    return {labels: value - before.get((n, labels), 0.0) for (n, labels), value in after.items() if n == name}
+
+
+def server_breakdown(before: dict, after: dict) -> dict:
+    """
+    Mean time per stage and generation outcomes over the run, from the server's /metrics.
+    """
+    sums = _delta(before, after, "skillforge_stage_duration_seconds_sum")
+    counts = _delta(before, after, "skillforge_stage_duration_seconds_count")
+    stages = {}
+    for labels, count in counts.items():
+        if count:
+            stage = dict(labels)["stage"]
+            total = stages.setdefault(stage, [0.0, 0])
+            total[0] += sums.get(labels, 0.0)
+            total[1] += count
+    generations = {}
+    for labels, count in _delta(before, after, "skillforge_generations_total").items():
+        if count:
+            label = dict(labels)
+            generations.setdefault(label["service"], {})[label["outcome"]] = int(count)
+    return {
+        "stages_ms": {s: {"mean": round(1000 * t / n, 1), "count": n} for s, (t, n) in sorted(stages.items())},
+        "generations": generations,
+    }
+
+
+def lag_from_histogram(before: dict, after: dict) -> dict:
+    buckets = sorted(
+        (float("inf") if dict(labels)["le"] == "+Inf" else float(dict(labels)["le"]), count)
+        for labels, count in _delta(before, after, "skillforge_event_loop_lag_seconds_bucket").items()
+    )
+    total = buckets[-1][1] if buckets else 0
+
+    def quantile(q):
+        # Upper bound of the bucket holding the q-th sample; the histogram cannot say more
+        for bound, count in buckets:
+            if count >= q * total:
+                return None if bound == float("inf") else round(bound * 1000, 1)
+    if not total:
+        return {}
+    return {"p50": quantile(0.5), "p99": quantile(0.99), "samples": int(total), "source": "server histogram (upper bounds)"}
+
+
+# --- load ---
+
+async def watch_lag(samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+        samples.append(max(0.0, time.perf_counter() - started - LAG_SAMPLE_INTERVAL))
+
+
+async def send(client: httpx.AsyncClient, request: dict, user: str) -> tuple:
+    """
+    Returns (status, seconds to first body byte, total seconds). Status 0 means a transport error.
+    """
+    started = time.perf_counter()
+    first_byte = None
+    kwargs = {k: request[k] for k in ("json", "params", "data", "files") if k in request}
+    try:
+        async with client.stream(request["method"], request["path"], headers={"X-User-Id": user}, **kwargs) as response:
+            async for _ in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+            status = response.status_code
+    except httpx.HTTPError:
+        status = 0
+    total = time.perf_counter() - started
+    return status, first_byte if first_byte is not None else total, total
+
+
+async def run_profile(client: httpx.AsyncClient, profile, args, in_process: bool) -> dict:
+    concurrency = args.concurrency or profile.concurrency
+    count = args.requests or profile.requests
+    unique = not args.same_input
+
+    for i in range(args.warmup):
+        await send(client, profile.build(-1 - i, unique), "bench-warmup")
+
+    before = await scrape(client)
+    results = []
+    next_index = iter(range(count))
+    deadline = time.perf_counter() + args.duration if args.duration else None
+    lag, stop = [], asyncio.Event()
+    lag_task = asyncio.create_task(watch_lag(lag, stop)) if in_process else None
+
+    async def worker(n: int):
+        # Each worker is one user, so per-user admission limits behave as in production
+        for i in next_index:
+            if deadline and time.perf_counter() > deadline:
+                return
+            results.append(await send(client, profile.build(i, unique), f"bench-user-{n}"))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    if lag_task:
+        stop.set()
+        await lag_task
+    after = await scrape(client)
+
+    latencies = [total for status, _, total in results if 200 <= status < 400]
+    first_bytes = [ttfb for status, ttfb, _ in results if 200 <= status < 400]
+    statuses = {}
+    for status, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    report = {
+        "description": profile.description,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": len(results) - len(latencies),
+        "statuses": statuses,
+        "seconds": round(elapsed, 2),
+        "rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {q: round(percentile(latencies, p) * 1000, 1) for q, p in (("p50", .5), ("p95", .95), ("p99", .99))},
+        "ttfb_ms": {q: round(percentile(first_bytes, p) * 1000, 1) for q, p in (("p50", .5), ("p95", .95))},
+        **server_breakdown(before, after),
+    }
+    if lag_task:
+        report["loop_lag_ms"] = {
+            "p50": round(percentile(lag, .5) * 1000, 2),
+            "p99": round(percentile(lag, .99) * 1000, 2),
+            "max": round(max(lag, default=0.0) * 1000, 2),
+            "samples": len(lag),
+            "source": "in-process sampler",
+        }
+    else:
+        report["loop_lag_ms"] = lag_from_histogram(before, after)
+    return report
+
+
+# --- output ---
+
+def print_report(results: dict, baseline: dict = None):
+    header = f"{'profile':<16} {'reqs':>5} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ttfb p50':>9} {'lag p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        lat = r["latency_ms"]
+        print(
+            f"{name:<16} {r['requests']:>5} {r['errors']:>4} {r['rps']:>8.2f} {lat['p50']:>9.1f} {lat['p95']:>9.1f} "
+            f"{lat['p99']:>9.1f} {r['ttfb_ms']['p50']:>9.1f} {str(r['loop_lag_ms'].get('p99', '-')):>8}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            changes = []
+            for label, old, new in (
+                ("rps", previous["rps"], r["rps"]),
+                ("p50", previous["latency_ms"]["p50"], lat["p50"]),
+                ("p95", previous["latency_ms"]["p95"], lat["p95"]),
+                ("p99", previous["latency_ms"]["p99"], lat["p99"]),
+            ):
+                if old:
+                    changes.append(f"{label} {100 * (new - old) / old:+.1f}%")
+            print(f"{'':<16} vs baseline: {', '.join(changes)}")
+    print()
+    for name, r in results.items():
+        if r["stages_ms"]:
+            stages = ", ".join(f"{s} {v['mean']}ms" for s, v in r["stages_ms"].items())
+            print(f"{name}: {stages}")
+        for service, outcomes in r["generations"].items():
+            if set(outcomes) - {"ok"}:
+                print(f"{name}: {service} outcomes {outcomes}")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float):
+    # Measure warm workers, as a load balancer would route to; MODEL_WARMUP_ENABLED=0 measures cold starts
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        response = await client.get("/ready")
+        if response.status_code == 200:
+            return
+        if response.json().get("status") == "cold":
+            print("Models did not warm up (is the mock running?); benchmarking anyway")
+            return
+        await asyncio.sleep(0.2)
+
+
+async def main_async(args) -> dict:
+    names = list(PROFILES) if args.profiles == ["all"] else args.profiles
+    unknown = [n for n in names if n not in PROFILES]
+    if unknown:
+        raise SystemExit(f"Unknown profile(s): {', '.join(unknown)}. Choose from: {', '.join(PROFILES)}")
+
+    results = {}
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            await wait_ready(client, args.timeout)
+            for name in names:
+                results[name] = await run_profile(client, PROFILES[name], args, in_process=False)
+        return results
+
+    configure_app_env(args)
+    sys.path.insert(0, BACKEND_DIR)
+    import main as app_module
+    async with app_module.app.router.lifespan_context(app_module.app):
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            await wait_ready(client, args.timeout)
+            for name in names:
+                results[name] = await run_profile(client, PROFILES[name], args, in_process=True)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SkillForge FastAPI backend")
+    parser.add_argument("profiles", nargs="*", default=["all"], help=f"profiles to run: {', '.join(PROFILES)} or all")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, help="override each profile's concurrent clients")
+    parser.add_argument("--requests", type=int, help="override each profile's request count")
+    parser.add_argument("--duration", type=float, help="stop each profile after this many seconds")
+    parser.add_argument("--warmup", type=int, default=2, help="unrecorded requests before each profile")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--same-input", action="store_true", help="repeat one input (measures cache hits)")
+    parser.add_argument("--cache", action="store_true", help="leave the LLM response cache on (in-process only)")
+    parser.add_argument("--local-runner", action="store_true", help="run code in the local sandbox (needs root) instead of on mock Piston")
+    parser.add_argument("--no-mocks", action="store_true", help="do not start the mock servers")
+    parser.add_argument("--ollama-port", type=int, default=11500)
+    parser.add_argument("--piston-port", type=int, default=11600)
+    parser.add_argument("--latency", type=float, default=0.2, help="mock Ollama seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=200)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of mock responses with broken JSON")
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="mock model load time when a model is not loaded")
+    parser.add_argument("--piston-run-seconds", type=float, default=0.05)
+    parser.add_argument("--piston-compile-seconds", type=float, default=0.5)
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["profiles"]
+
+    procs = [] if args.no_mocks else start_mocks(args)
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    print_report(results, baseline)
+    if args.out:
+        mock_settings = {
+            k: getattr(args, k) for k in (
+                "latency", "tokens_per_sec", "malformed_rate", "load_seconds", "piston_run_seconds", "piston_compile_seconds",
+            )
+        }
+        with open(args.out, "w") as f:
+            json.dump({
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "revision": _git_revision(),
+                "target": args.url or "in-process",
+                "mock": mock_settings,
+                "profiles": results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,76 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from contextlib import asynccontextmanager
 import uvicorn
-import os
-import shutil
+import json
+import time
+import asyncio
+import hashlib
 
-from services.resume_parser import parse_resume
+from services.resume_parser import parse_resume_data, read_upload, ResumeTooLarge
+from services import resume_parser
 
-from services.ai_analyzer import analyze_resume
-from services.roadmap_generator import generate_roadmap
+from services.ai_analyzer import analyze_resume, keyword_analysis, ANALYSIS_MODES
+from services.batch_screening import start_batch, get_batch, expand_uploads, BatchTableFull, BATCH_MAX_RESUMES, BATCH_MAX_BYTES
+from services.roadmap_generator import generate_roadmap, stream_roadmap
 from services.portfolio_generator import generate_portfolio
-from services.dsa_service import generate_dsa_question, execute_code, ask_yuvi
-from services.game_service import generate_battle_question
-from services.linkedin_service import generate_linkedin_profile
+from services.prompt_budget import compact_resume
+from services.dsa_service import execute_code, ask_yuvi, stream_yuvi
+from services.judge import judge, JUDGE_MAX_CASES
+from services.question_pool import question_pool, GAME_POOL_PREWARM_TOPICS
+from services.problem_bank import problem_bank
+from services.linkedin_service import (
+    generate_linkedin_profile, stream_linkedin_profile, generate_linkedin_sections, stream_linkedin_sections,
+    regenerate_linkedin_section, LINKEDIN_MODES, LINKEDIN_MODE,
+)
+from services import ollama_client
+from services.model_router import router
+from services.model_warmup import model_warmup
+from services.llm_cache import cache, make_key, Fallback
+from services.semantic_cache import semantic_cache
+from services.result_store import result_store, current_user_id
+from services.supabase_auth import authenticated_user, user_from_authorization
+from services.jobs import job_queue, JobTableFull, JOB_MAX_WAIT
+from services.yuvi_sessions import yuvi_sessions
+from services import json_repair
+from services.scheduler import scheduler, priority_for_path, request_priority, request_user
+from services.single_flight import single_flight, MAX_VARIANTS
+from services import code_runner
+from services import metrics
+from services.metrics import HTTP_REQUEST_SECONDS, register_collector, watch_event_loop_lag, EVENT_LOOP_LAG_INTERVAL
+from services.tracing import start_trace, span, server_timing
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    router.start()
+    # Loads models in the background; /ready reports when they are warm
+    model_warmup.start()
+    lag_watcher = asyncio.create_task(watch_event_loop_lag(EVENT_LOOP_LAG_INTERVAL)) if EVENT_LOOP_LAG_INTERVAL > 0 else None
+    question_pool.prewarm(GAME_POOL_PREWARM_TOPICS)
+    await code_runner.start()
+    await problem_bank.start()
+    await result_store.start()
+    await job_queue.start()
+    yield
+    await job_queue.close()
+    if lag_watcher:
+        lag_watcher.cancel()
+    await code_runner.close()
+    await question_pool.close()
+    await single_flight.close()
+    await yuvi_sessions.close()
+    await result_store.close()
+    await problem_bank.close()
+    resume_parser.shutdown()
+    await model_warmup.close()
+    # Release pooled keep-alive connections to Ollama / Piston
+    await ollama_client.close()
+    await router.close()
 
-app = FastAPI(title="AI Resume Analyzer", version="1.0")
+app = FastAPI(title="AI Resume Analyzer", version="1.0", lifespan=lifespan)
 
 # CORS Setup
 app.add_middleware(
@@ -24,8 +79,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Yuvi-Session"],
 )
 
+@app.middleware("http")
+async def tag_scheduler_context(request: Request, call_next):
+    # Ollama calls made while serving this request queue under the route's priority class and this user
+    priority = priority_for_path(request.url.path)
+    if priority:
+        request_priority.set(priority)
+    # A verified Supabase token identifies the user; X-User-Id / client IP only group anonymous traffic
+    verified = user_from_authorization(request.headers.get("authorization"))
+    authenticated_user.set(verified)
+    user = verified or request.headers.get("x-user-id") or (request.client.host if request.client else None)
+    if user:
+        request_user.set(user)
+    return await call_next(request)
+
+@app.middleware("http")
+async def record_request_timing(request: Request, call_next):
+    # Stages run while serving the request are reported back in a Server-Timing header
+    trace = start_trace()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            elapsed, method=request.method, route=route.path if route else "unmatched", status=status
+        )
+    response.headers["Server-Timing"] = server_timing(trace + [("total", elapsed)])
+    return response
+
 class AnalysisRequest(BaseModel):
     job_description: str
 
@@ -40,20 +128,37 @@ class PortfolioRequest(BaseModel):
 class DSAGenRequest(BaseModel):
     topic: str
     difficulty: str
+    variants: int = Field(1, ge=1, le=MAX_VARIANTS)  # >1 returns {"questions": [...]} with distinct problems
 
 class DSARunRequest(BaseModel):
     language: str
     code: str
     stdin: str = ""
 
+class DSATestCase(BaseModel):
+    input: str = ""
+    output: str = ""
+
+class DSAJudgeRequest(BaseModel):
+    language: str
+    code: str
+    test_cases: List[DSATestCase] = Field(..., min_length=1, max_length=JUDGE_MAX_CASES)
+    stop_on_first_failure: bool = False
+    time_limit: Optional[float] = Field(None, gt=0)  # seconds per case, capped by CODE_RUN_TIMEOUT
+
 class DSAYuviRequest(BaseModel):
     code: str
     question: str
     user_query: str
+    session_id: Optional[str] = None  # from a previous reply; omit to start a new conversation
 
 class GameGenRequest(BaseModel):
     topic: str
 
+class GameBatchRequest(BaseModel):
+    topic: str
+    count: int = Field(10, ge=1, le=50)
+
 class LinkedInRequest(BaseModel):
     fullName: str
     targetRole: str
@@ -72,128 +177,545 @@ class LinkedInRequest(BaseModel):
     location: str = ""
     tone: str = "Professional"
 
+def stored_analysis_response(stored: dict) -> dict:
+    return {
+        "id": stored["id"],
+        "filename": stored["file_name"],
+        "analysis": stored["analysis_result"],
+        "stored_at": stored.get("created_at"),
+    }
+
+def track_activity(user_id: str, activity_type: str, result_id: str):
+    if result_id:
+        result_store.save("user_activity", {
+            "user_id": user_id, "activity_type": activity_type, "metadata": {"result_id": result_id},
+        })
+
+def submit_job(kind: str, factory) -> JSONResponse:
+    """
+    Queues factory() as a background job and answers 202 with the job to poll at /jobs/{job_id}.
+    """
+    try:
+        job = job_queue.submit(kind, factory)
+    except JobTableFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    return JSONResponse(status_code=202, content=job.as_dict())
+
+def ndjson_response(events) -> StreamingResponse:
+    """
+    Wraps an async iterator of event dicts as a newline-delimited JSON stream.
+    """
+    async def body():
+        async for event in events:
+            yield json.dumps(event) + "\n"
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
 @app.get("/")
 def read_root():
     return {"message": "AI Resume Analyzer API is running"}
 
+@app.get("/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once every warm-up model is loaded on a healthy Ollama backend, 503 while
+    warming up or when a model has gone cold. "/" stays the liveness probe.
+    """
+    state = model_warmup.stats()
+    return JSONResponse(state, status_code=200 if model_warmup.ready() else 503)
+
 @app.post("/analyze")
 async def analyze_resume_endpoint(
     file: UploadFile = File(...),
-    job_description: str = "" # In a real multipart form, this might need to be a Form field
+    job_description: str = "", # In a real multipart form, this might need to be a Form field
+    no_cache: bool = False,
+    mode: str = "hybrid",
+    job: bool = False,
+    stream: bool = False
 ):
-    # 1. Save temp file
-    temp_filename = f"temp_{file.filename}"
-    with open(temp_filename, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
+    """
+    With ?stream=true, answers with NDJSON: in hybrid mode a "score" event carries the keyword analysis as
+    soon as the resume is parsed, then "done" carries the full response once the LLM has written the narrative.
+    """
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(ANALYSIS_MODES)}")
     try:
-        # 2. Parse Resume
-        text = parse_resume(temp_filename)
-        
-        if not text:
-             raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
-
-        # 3. Analyze with AI
-        # Note: If job_description is empty, we can provide a generic analysis
-        analysis = analyze_resume(text, job_description)
-        
-        return {
-            "filename": file.filename,
-            "extracted_text_preview": text[:200] + "...",
-            "analysis": analysis
-        }
+        with span("resume.read"):
+            data = await read_upload(file)
+        if stream:
+            scheduler.check_admission()
+            return ndjson_response(stream_analysis(data, file.filename, job_description, mode, no_cache))
+        if job:
+            return submit_job("analyze", lambda: run_analysis(data, file.filename, job_description, mode, no_cache))
+        return await run_analysis(data, file.filename, job_description, mode, no_cache)
+    except HTTPException:
+        raise
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Cleanup
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
+
+async def run_analysis(data: bytes, filename: str, job_description: str, mode: str, no_cache: bool) -> dict:
+    async for event in analysis_events(data, filename, job_description, mode, no_cache):
+        if event["type"] == "done":
+            return event["result"]
+
+async def stream_analysis(data: bytes, filename: str, job_description: str, mode: str, no_cache: bool):
+    try:
+        async for event in analysis_events(data, filename, job_description, mode, no_cache):
+            yield event
+    except HTTPException as e:
+        yield {"type": "error", "detail": e.detail}
+    except Exception as e:
+        yield {"type": "error", "detail": str(e)}
+
+async def analysis_events(data: bytes, filename: str, job_description: str, mode: str, no_cache: bool):
+    # 1. Return this user's stored analysis of the same resume + job description, if any
+    user_id = current_user_id()
+    input_hash = make_key("analyze", {
+        "resume": hashlib.sha256(data).hexdigest(), "job_description": job_description, "mode": mode,
+    })
+    if not no_cache:
+        stored = await result_store.find("resume_analyses", input_hash, user_id)
+        if stored:
+            yield {"type": "done", "result": stored_analysis_response(stored)}
+            return
+
+    # 2. Parse Resume
+    text = await parse_resume_data(data)
+    
+    if not text:
+         raise HTTPException(status_code=400, detail="Could not extract text from PDF.")
+
+    # 3. Analyze with AI; in hybrid mode the keyword score is ready long before the narrative
+    # Note: If job_description is empty, we can provide a generic analysis
+    if mode == "hybrid":
+        yield {"type": "score", "analysis": keyword_analysis(text, job_description)}
+    analysis = await analyze_resume(text, job_description, mode=mode, bypass_cache=no_cache)
+
+    # 4. Persist in the background (fallback answers are not worth keeping)
+    result_id = None
+    if user_id and not isinstance(analysis, Fallback):
+        result_id = result_store.save("resume_analyses", {
+            "user_id": user_id,
+            "file_name": filename or "resume.pdf",
+            "job_description": job_description,
+            "ats_score": int(round(analysis.get("ats_score", 0))),
+            "analysis_result": analysis,
+            "input_hash": input_hash,
+        })
+        track_activity(user_id, "resume_analysis", result_id)
+    
+    yield {"type": "done", "result": {
+        "id": result_id,
+        "filename": filename,
+        "extracted_text_preview": text[:200] + "...",
+        "analysis": analysis
+    }}
+
+@app.post("/analyze/batch")
+async def analyze_batch_endpoint(
+    files: List[UploadFile] = File(...),
+    job_description: str = Form(""),
+    mode: str = Form("hybrid"),
+    stream: bool = False
+):
+    """
+    Screens many resumes (PDFs and/or .zip archives of PDFs) against one job description.
+    Returns a job ID to poll, or with ?stream=true an NDJSON stream of results as they finish.
+    mode="fast" skips the LLM entirely for bulk triage.
+    """
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(ANALYSIS_MODES)}")
+    # Check the limits the request itself shows before reading anything
+    if len(files) > BATCH_MAX_RESUMES:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {BATCH_MAX_RESUMES} resumes.")
+    if sum(f.size or 0 for f in files) > BATCH_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"A batch can contain at most {BATCH_MAX_BYTES // (1024 * 1024)} MB of resumes.")
+    try:
+        data = await asyncio.gather(*(read_upload(f) for f in files))
+        resumes = await asyncio.to_thread(expand_uploads, [(f.filename, d) for f, d in zip(files, data)])
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No PDF resumes found in the upload.")
+
+    try:
+        job = start_batch(job_description, resumes, mode)
+    except BatchTableFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    if stream:
+        return ndjson_response(job.events())
+    return job.progress()
+
+@app.get("/analyze/batch/{job_id}")
+async def analyze_batch_status(job_id: str):
+    job = get_batch(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found.")
+    return {**job.progress(), "ranked": job.ranked()}
+
+@app.get("/analyze/batch/{job_id}/stream")
+async def analyze_batch_stream(job_id: str):
+    job = get_batch(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found.")
+    return ndjson_response(job.events())
 
 @app.post("/roadmap")
-async def create_roadmap(request: RoadmapRequest):
+async def create_roadmap(request: RoadmapRequest, no_cache: bool = False):
     try:
-        roadmap = generate_roadmap(request.current_role, request.target_role, request.skills)
+        user_id = current_user_id()
+        input_hash = make_key("roadmap", request.dict())
+        if not no_cache:
+            stored = await result_store.find("career_roadmaps", input_hash, user_id)
+            if stored:
+                return {**stored["roadmap_data"], "id": stored["id"], "stored_at": stored.get("created_at")}
+
+        roadmap = await generate_roadmap(request.current_role, request.target_role, request.skills, bypass_cache=no_cache)
+        if user_id and not isinstance(roadmap, Fallback):
+            result_id = result_store.save("career_roadmaps", {
+                "user_id": user_id,
+                "current_role": request.current_role,
+                "target_role": request.target_role,
+                "skills": request.skills,
+                "roadmap_data": roadmap,
+                "input_hash": input_hash,
+            })
+            track_activity(user_id, "roadmap_generation", result_id)
+            return {**roadmap, "id": result_id}
         return roadmap
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/roadmap/stream")
+async def create_roadmap_stream(request: RoadmapRequest, no_cache: bool = False):
+    scheduler.check_admission()
+    return ndjson_response(
+        stream_roadmap(request.current_role, request.target_role, request.skills, bypass_cache=no_cache)
+    )
+
+@app.get("/analyze/{result_id}")
+async def get_stored_analysis(result_id: str):
+    stored = await result_store.get("resume_analyses", result_id, current_user_id())
+    if not stored:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return stored_analysis_response(stored)
+
+@app.get("/roadmap/{result_id}")
+async def get_stored_roadmap(result_id: str):
+    stored = await result_store.get("career_roadmaps", result_id, current_user_id())
+    if not stored:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+    return {**stored["roadmap_data"], "id": stored["id"], "stored_at": stored.get("created_at")}
+
 @app.post("/generate-portfolio")
 async def create_portfolio(
     file: Optional[UploadFile] = File(None),
-    text_content: Optional[str] = Form(None)
+    text_content: Optional[str] = Form(None),
+    no_cache: bool = False,
+    job: bool = False
 ):
-    temp_filename = None
-    user_data = ""
-
     try:
-        # 1. Handle File Upload (if present)
-        if file:
-            temp_filename = f"temp_portfolio_{file.filename}"
-            with open(temp_filename, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            parsed_text = parse_resume(temp_filename)
-            if parsed_text:
-                user_data += f"\nRESUME CONTENT:\n{parsed_text}\n"
-        
-        # 2. Handle Text Input (if present)
-        if text_content:
-            user_data += f"\nUSER NOTES:\n{text_content}\n"
-
-        if not user_data.strip():
+        if not file and not (text_content or "").strip():
              raise HTTPException(status_code=400, detail="Please provide a resume or text description.")
+        with span("resume.read"):
+            data = await read_upload(file) if file else None
+        if job:
+            return submit_job("portfolio", lambda: run_portfolio(data, text_content, no_cache))
+        return await run_portfolio(data, text_content, no_cache)
 
-        # 3. Generate Portfolio
-        portfolio_code = generate_portfolio(user_data)
-        return portfolio_code
-
+    except HTTPException:
+        raise
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if temp_filename and os.path.exists(temp_filename):
-            os.remove(temp_filename)
+
+async def run_portfolio(data: Optional[bytes], text_content: Optional[str], no_cache: bool) -> dict:
+    user_data = ""
+    prompt_tokens = None
+
+    # 1. Handle File Upload (if present)
+    if data:
+        parsed_text = await parse_resume_data(data)
+        if parsed_text:
+            # Keep the prompt inside the portfolio token budget (contact, summary, skills, projects first)
+            with span("prompt.compact"):
+                resume = compact_resume(parsed_text, "portfolio")
+            prompt_tokens = {"resume": resume.report()}
+            user_data += f"\nRESUME CONTENT:\n{resume.text}\n"
+    
+    # 2. Handle Text Input (if present)
+    if text_content:
+        user_data += f"\nUSER NOTES:\n{text_content}\n"
+
+    if not user_data.strip():
+         raise HTTPException(status_code=400, detail="Please provide a resume or text description.")
+
+    # 3. Generate Portfolio
+    portfolio_code = await generate_portfolio(user_data, bypass_cache=no_cache)
+    if prompt_tokens:
+        return {**portfolio_code, "prompt_tokens": prompt_tokens}
+    return portfolio_code
 
 # --- DSA DOJO ENDPOINTS ---
 
 @app.post("/dsa/generate")
 async def dsa_generate(request: DSAGenRequest):
     try:
-        return generate_dsa_question(request.topic, request.difficulty)
+        if request.variants > 1:
+            return {"questions": await problem_bank.get_batch(request.topic, request.difficulty, request.variants)}
+        return await problem_bank.get(request.topic, request.difficulty)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/dsa/bank")
+async def dsa_bank_stats():
+    return problem_bank.stats()
+
 @app.post("/dsa/run")
 async def dsa_run(request: DSARunRequest):
     try:
-        return execute_code(request.language, request.code, request.stdin)
+        return await execute_code(request.language, request.code, request.stdin)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/dsa/judge")
+async def dsa_judge(request: DSAJudgeRequest):
+    try:
+        return await judge(
+            request.language,
+            request.code,
+            [case.dict() for case in request.test_cases],
+            stop_on_failure=request.stop_on_first_failure,
+            time_limit=request.time_limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/dsa/yuvi")
 async def dsa_yuvi(request: DSAYuviRequest):
     try:
-        response = ask_yuvi(request.code, request.question, request.user_query)
-        return {"response": response}
+        session = yuvi_sessions.open(request.session_id, request.question)
+        response = await ask_yuvi(session, request.code, request.user_query)
+        return {"response": response, "session_id": session.id}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/dsa/yuvi/stream")
+async def dsa_yuvi_stream(request: DSAYuviRequest):
+    scheduler.check_admission()
+    session = yuvi_sessions.open(request.session_id, request.question)
+    return StreamingResponse(
+        stream_yuvi(session, request.code, request.user_query),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Yuvi-Session": session.id}
+    )
+
+@app.delete("/dsa/yuvi/session/{session_id}")
+async def dsa_yuvi_end_session(session_id: str):
+    if not yuvi_sessions.end(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"message": "Session ended"}
+
 # --- GAME BOX ENDPOINTS ---
 
 @app.post("/game/generate")
 async def game_generate(request: GameGenRequest):
     try:
-        return generate_battle_question(request.topic)
+        return await question_pool.get(request.topic)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/game/generate/batch")
+async def game_generate_batch(request: GameBatchRequest):
+    try:
+        return {"questions": await question_pool.get_batch(request.topic, request.count)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/game/pool")
+async def game_pool_stats():
+    return question_pool.stats()
+
 # --- LINKEDIN MAKER ENDPOINTS ---
 
+def check_linkedin_mode(mode: str):
+    if mode not in LINKEDIN_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(LINKEDIN_MODES)}")
+
 @app.post("/linkedin/generate")
-async def linkedin_generate(request: LinkedInRequest):
+async def linkedin_generate(request: LinkedInRequest, no_cache: bool = False, job: bool = False, mode: str = LINKEDIN_MODE):
+    """
+    mode="sections" generates each section (and each experience entry) separately and concurrently;
+    the response has the same shape.
+    """
+    check_linkedin_mode(mode)
+    generate = generate_linkedin_sections if mode == "sections" else generate_linkedin_profile
     try:
-        return generate_linkedin_profile(request.dict())
+        if job:
+            return submit_job("linkedin", lambda: generate(request.dict(), bypass_cache=no_cache))
+        return await generate(request.dict(), bypass_cache=no_cache)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/linkedin/generate/stream")
+async def linkedin_generate_stream(request: LinkedInRequest, no_cache: bool = False, mode: str = LINKEDIN_MODE):
+    check_linkedin_mode(mode)
+    scheduler.check_admission()
+    stream = stream_linkedin_sections if mode == "sections" else stream_linkedin_profile
+    return ndjson_response(stream(request.dict(), bypass_cache=no_cache))
+
+@app.post("/linkedin/generate/section/{section}")
+async def linkedin_regenerate_section(section: str, request: LinkedInRequest, index: Optional[int] = None):
+    """
+    Regenerates one section of a profile without touching the others; index picks the entry for
+    section "experience_descriptions". Returns {"section", "index", "value"}.
+    """
+    try:
+        return await regenerate_linkedin_section(section, request.dict(), index)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# --- SCHEDULER ENDPOINTS ---
+
+@app.get("/scheduler/stats")
+async def scheduler_stats():
+    return scheduler.stats()
+
+@app.get("/router/stats")
+async def router_stats():
+    return router.stats()
+
+# --- JOB ENDPOINTS ---
+
+@app.get("/jobs")
+async def jobs_stats():
+    return job_queue.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Job status, plus the result once it has completed. ?wait=N holds the request up to N seconds
+    (capped by JOB_MAX_WAIT) for the job to finish, so clients can long-poll instead of spinning.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait > 0 and not job.finished:
+        await job.wait(min(wait, JOB_MAX_WAIT))
+    return job.as_dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_queue.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    # A running job stops at its next await; give it a moment so the reply shows the final status
+    await job.wait(5)
+    return job.as_dict()
+
+# --- CACHE ENDPOINTS ---
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        **cache.stats(),
+        "semantic": semantic_cache.stats(),
+        "parsed_resumes": resume_parser.stats(),
+        "coalescing": single_flight.stats(),
+        "json_repair": json_repair.stats,
+        "result_store": result_store.stats(),
+        "yuvi_sessions": yuvi_sessions.stats(),
+        "compiled_artifacts": code_runner.artifact_cache.stats(),
+    }
+
+@app.delete("/cache")
+async def cache_clear():
+    cache.clear()
+    return {"message": "Cache cleared"}
+
+# --- METRICS ---
+
+def _collect_service_stats() -> list:
+    sched = scheduler.stats()
+    routes = router.stats()
+    cache_stats = cache.stats()
+    similar = semantic_cache.stats()
+    parsed = resume_parser.stats()
+    stored = result_store.stats()
+    jobs = job_queue.stats()
+    tutor = yuvi_sessions.stats()
+    bank = problem_bank.stats()
+    artifacts = code_runner.artifact_cache.stats()
+    warmup = model_warmup.stats()
+    return [
+        ("skillforge_scheduler_in_flight", "gauge", "Ollama calls currently running.", [({}, sched["in_flight"])]),
+        ("skillforge_scheduler_capacity", "gauge", "Concurrent Ollama calls allowed.", [({}, sched["capacity"])]),
+        ("skillforge_scheduler_queued", "gauge", "Ollama calls waiting for a slot.",
+            [({"priority": p}, c["queued"]) for p, c in sched["classes"].items()]),
+        ("skillforge_scheduler_rejected_total", "counter", "Calls refused by admission control or deadline.",
+            [({"priority": p, "reason": reason}, n) for p, c in sched["classes"].items() for reason, n in c["rejected"].items()]),
+        ("skillforge_backend_outstanding", "gauge", "Requests in flight per Ollama backend.",
+            [({"backend": b["url"]}, b["outstanding"]) for b in routes["backends"]]),
+        ("skillforge_backend_healthy", "gauge", "1 if the Ollama backend is taking traffic.",
+            [({"backend": b["url"]}, int(b["healthy"])) for b in routes["backends"]]),
+        ("skillforge_model_warm", "gauge", "1 if the model is loaded on at least one healthy Ollama backend.",
+            [({"model": model}, int(state["warm"])) for model, state in warmup["models"].items()]),
+        ("skillforge_llm_cache_entries", "gauge", "Entries in the in-memory LLM response cache.", [({}, cache_stats["entries"])]),
+        ("skillforge_llm_cache_lookups_total", "counter", "LLM cache lookups by result.",
+            [({"service": svc, "result": result}, c[result]) for svc, c in cache_stats["services"].items()
+             for result in ("hits", "disk_hits", "misses") if result in c]),
+        ("skillforge_semantic_cache_entries", "gauge", "Entries in the near-duplicate cache per service.",
+            [({"service": svc}, c["entries"]) for svc, c in similar["services"].items()]),
+        ("skillforge_semantic_cache_lookups_total", "counter", "Near-duplicate cache lookups after an exact miss, by result.",
+            [({"service": svc, "result": result}, c[result]) for svc, c in similar["services"].items() for result in ("hits", "misses")]),
+        ("skillforge_parsed_resume_cache_total", "counter", "Parsed-resume cache lookups by result.",
+            [({"result": result}, parsed[result]) for result in ("hits", "misses") if result in parsed]),
+        ("skillforge_result_store_pending", "gauge", "Result rows waiting for the background writer.", [({}, stored["pending"])]),
+        ("skillforge_result_store_rows_total", "counter", "Result rows by write outcome.",
+            [({"result": result}, stored[result]) for result in ("written", "dropped", "failed")]),
+        ("skillforge_jobs", "gauge", "Background jobs in the job table by status.",
+            [({"status": status}, n) for status, n in jobs["by_status"].items()]),
+        ("skillforge_problem_bank_problems", "gauge", "DSA problems in the local problem bank.", [({}, bank["problems"])]),
+        ("skillforge_problem_bank_lookups_total", "counter", "DSA problem requests served from the bank (hit) or generated (miss).",
+            [({"result": "hit"}, bank["hits"]), ({"result": "miss"}, bank["misses"])]),
+        ("skillforge_code_artifact_cache_bytes", "gauge", "Disk used by cached compiled submissions.", [({}, artifacts["bytes"])]),
+        ("skillforge_code_artifact_cache_lookups_total", "counter", "Compiled-submission cache lookups by result.",
+            [({"result": "hit"}, artifacts["hits"]), ({"result": "miss"}, artifacts["misses"])]),
+        ("skillforge_yuvi_sessions", "gauge", "Open Yuvi tutor conversations.", [({}, tutor["sessions"])]),
+        ("skillforge_yuvi_turns_total", "counter", "Yuvi turns by how the user's code was sent.",
+            [({"code": kind}, tutor[kind]) for kind in ("full", "diff", "unchanged")]),
+        ("skillforge_json_outputs_total", "counter", "Model JSON outputs by handling (parsed, repaired, reasked, failed).",
+            [({"result": result}, n) for result, n in json_repair.stats.items()]),
+    ]
+
+register_collector(_collect_service_stats)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,26 +1,98 @@
-import requests
-import json
+from services.model_router import model_for
+from services.llm_cache import cached, Fallback
+from services.scheduler import SchedulerRejected
+from services.json_repair import generate_json
+from services.llm_schemas import ResumeAnalysis, AnalysisNarrative
+from services.keyword_matcher import match_resume, ResumeCorpus
+from services.prompt_budget import compact_resume, compact_job_description
+from services.tracing import span, traced
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
-# You can change this to "llama3", "mistral", etc.
-DEFAULT_MODEL = "llama3.2" 
+DEFAULT_MODEL = model_for("analyze")  # override with MODEL_ANALYZE
 
-def analyze_resume(resume_text: str, job_description: str, model: str = DEFAULT_MODEL) -> dict:
+# "hybrid": keyword matcher computes ats_score/missing_keywords, the LLM only writes summary + feedback
+# "fast":   keyword matcher only, no LLM call (bulk triage)
+# "llm":    the LLM does everything (original behaviour)
+ANALYSIS_MODES = ("hybrid", "fast", "llm")
+
+def _local_analysis(prescore: dict, job_description: str) -> dict:
+    matched, missing = prescore["matched_keywords"], prescore["missing_keywords"]
+    if job_description.strip():
+        summary = f"Matches {len(matched)} of {len(matched) + len(missing)} key terms from the job description."
+        feedback = (
+            f"Consider adding evidence of: {', '.join(missing[:10])}."
+            if missing else "Your resume covers the key terms in this job description."
+        )
+    else:
+        skills = prescore["resume_skills"][:10]
+        summary = f"Detected skills: {', '.join(skills)}." if skills else "No recognizable skills detected."
+        feedback = "Add a job description for a targeted keyword analysis."
+    return {
+        "ats_score": prescore["ats_score"],
+        "summary": summary,
+        "missing_keywords": missing,
+        "matched_keywords": matched,
+        "feedback": feedback,
+        "scoring": "keyword",
+    }
+
+def keyword_analysis(resume_text: str, job_description: str, corpus: ResumeCorpus = None) -> dict:
+    """
+    The analysis "fast" mode returns: keyword score and template summary/feedback, in milliseconds.
+    """
+    return _local_analysis(match_resume(resume_text, job_description, corpus), job_description)
+
+@cached("analyze")
+@traced("analyze")
+async def analyze_resume(
+    resume_text: str, job_description: str, model: str = DEFAULT_MODEL, mode: str = "hybrid", corpus: ResumeCorpus = None
+) -> dict:
     """
     Analyzes the resume against the job description using a local LLM via Ollama.
     Returns a dictionary with ATS score, summary, missing keywords, and feedback.
+    corpus (e.g. the rest of a screening batch) supplies the keyword score's IDF.
+    """
+    prescore = match_resume(resume_text, job_description, corpus)
+    if mode == "fast":
+        return _local_analysis(prescore, job_description)
+
+    # The keyword scan above saw the full text; the prompt only gets what fits the budget
+    with span("prompt.compact"):
+        resume = compact_resume(resume_text, "analyze")
+        jd = compact_job_description(job_description)
+    prompt_tokens = {"resume": resume.report(), "job_description": jd.report()}
+
+    if mode == "hybrid":
+        prompt = f"""
+    You are an expert ATS (Applicant Tracking System) and Resume Analyzer.
+    A keyword scan of the resume against the job description produced:
+    ATS SCORE: {prescore["ats_score"]}/100
+    MATCHED KEYWORDS: {", ".join(prescore["matched_keywords"]) or "none"}
+    MISSING KEYWORDS: {", ".join(prescore["missing_keywords"]) or "none"}
+
+    RESUME:
+    {resume.text}
+
+    JOB DESCRIPTION:
+    {jd.text}
+
+    Using the scan above, write the narrative parts of the analysis only.
+    Provide the output in the following JSON format ONLY. Do not include any other text or markdown formatting outside the JSON.
+    {{
+        "summary": "<brief summary of the candidate's fit>",
+        "feedback": "<detailed feedback on how to improve the resume>"
+    }}
     """
-    
-    prompt = f"""
-    You are an expert ATS (Applicant Tracking System) and Resume Analyzer. 
+    else:
+        prompt = f"""
+    You are an expert ATS (Applicant Tracking System) and Resume Analyzer.
     Analyze the following resume against the provided job description.
-    
+
     RESUME:
-    {resume_text}
-    
+    {resume.text}
+
     JOB DESCRIPTION:
-    {job_description}
-    
+    {jd.text}
+
     Provide the output in the following JSON format ONLY. Do not include any other text or markdown formatting outside the JSON.
     {{
         "ats_score": <number between 0 and 100>,
@@ -29,36 +101,38 @@ def analyze_resume(resume_text: str, job_description: str, model: str = DEFAULT_
         "feedback": "<detailed feedback on how to improve the resume>"
     }}
     """
-    
+
     payload = {
         "model": model,
         "prompt": prompt,
         "stream": False,
         "format": "json" # Enforce JSON mode if supported by the model
     }
-    
+
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        
-        # Parse the 'response' field from Ollama
-        ai_output = result.get("response", "{}")
-        
-        # clean up potential markdown code blocks if the model adds them
-        if "```json" in ai_output:
-            ai_output = ai_output.split("```json")[1].split("```")[0]
-        elif "```" in ai_output:
-             ai_output = ai_output.split("```")[1].split("```")[0]
-             
-        return json.loads(ai_output)
-        
+        analysis = await generate_json(payload, AnalysisNarrative if mode == "hybrid" else ResumeAnalysis)
+
+        if mode == "hybrid":
+            return {
+                **_local_analysis(prescore, job_description),
+                "summary": analysis["summary"],
+                "feedback": analysis["feedback"],
+                "scoring": "hybrid",
+                "prompt_tokens": prompt_tokens,
+            }
+        return {**analysis, "prompt_tokens": prompt_tokens}
+
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Error querying Ollama: {e}")
+        if mode == "hybrid":
+            # The keyword scan is still a useful answer without the narrative
+            return Fallback({**_local_analysis(prescore, job_description), "llm_error": str(e)})
         # Return a fallback error response
-        return {
+        return Fallback({
             "ats_score": 0,
             "summary": "Error analyzing resume.",
             "missing_keywords": [],
             "feedback": f"Failed to connect to AI model. Ensure Ollama is running. Error: {str(e)}"
-        }
+        })
@@ -0,0 +1,222 @@
+import io
+import os
+import time
+import uuid
+import asyncio
+import zipfile
+from collections import OrderedDict
+
+from services.resume_parser import parse_resume_data, MAX_RESUME_BYTES, RESUME_PARSER_WORKERS, ResumeTooLarge
+from services.ai_analyzer import analyze_resume
+from services.keyword_matcher import ResumeCorpus
+from services.llm_cache import Fallback
+from services.scheduler import request_priority
+
+# Screening many resumes against one job description
+BATCH_MAX_RESUMES = int(os.getenv("BATCH_MAX_RESUMES", "500"))
+# Uploaded plus (declared) decompressed bytes one batch may hold; zip entries are only decompressed while parsed
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(200 * 1024 * 1024)))
+BATCH_PARSE_CONCURRENCY = int(os.getenv("BATCH_PARSE_CONCURRENCY", str(RESUME_PARSER_WORKERS)))  # resumes decompressed/parsed at once
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))  # per batch job
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "50"))  # running batches; finished ones are evicted to make room
+BATCH_JOB_TTL = float(os.getenv("BATCH_JOB_TTL", str(6 * 3600)))
+
+
+def _score(result: dict) -> float:
+    try:
+        return float(result["analysis"]["ats_score"])
+    except (KeyError, TypeError, ValueError):
+        return -1.0
+
+
+class BatchTableFull(Exception):
+    pass
+
+
+class ZipEntry:
+    """
+    A PDF inside an uploaded archive, decompressed only when the batch gets to it.
+    """
+    def __init__(self, archive: bytes, info: zipfile.ZipInfo):
+        self.archive = archive
+        self.info = info
+
+    def read(self) -> bytes:
+        # zipfile stops at the declared size and fails the CRC check, so file_size bounds what this returns
+        with zipfile.ZipFile(io.BytesIO(self.archive)) as archive:
+            return archive.read(self.info)
+
+
+def expand_uploads(uploads: list) -> list:
+    """
+    Turns (filename, bytes) uploads into a flat list of (filename, source) PDFs, where source is the bytes,
+    a ZipEntry for a PDF inside a .zip archive, or None for a PDF over MAX_RESUME_BYTES.
+    Nothing is decompressed: the limits are checked against the archives' directories.
+    """
+    resumes = []
+    total_bytes = 0
+    too_many = ValueError(f"A batch can contain at most {BATCH_MAX_RESUMES} resumes.")
+    too_large = ResumeTooLarge(f"A batch can contain at most {BATCH_MAX_BYTES // (1024 * 1024)} MB of resumes.")
+    for filename, data in uploads:
+        if filename.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                entries = [i for i in archive.infolist() if not i.is_dir() and i.filename.lower().endswith(".pdf")]
+            if len(resumes) + len(entries) > BATCH_MAX_RESUMES:
+                raise too_many
+            for info in entries:
+                if info.file_size > MAX_RESUME_BYTES:
+                    resumes.append((info.filename, None))
+                    continue
+                total_bytes += info.file_size
+                resumes.append((info.filename, ZipEntry(data, info)))
+        else:
+            if len(resumes) >= BATCH_MAX_RESUMES:
+                raise too_many
+            total_bytes += len(data)
+            resumes.append((filename, data))
+        if total_bytes > BATCH_MAX_BYTES:
+            raise too_large
+    return resumes
+
+
+class BatchJob:
+    def __init__(self, job_description: str, resumes: list, mode: str = "hybrid"):
+        self.id = uuid.uuid4().hex
+        self.job_description = job_description
+        self.mode = mode
+        self.total = len(resumes)
+        self.results = []
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        self.task = None
+        self._changed = asyncio.Condition()
+        self._resumes = resumes
+
+    @property
+    def status(self) -> str:
+        if self.cancelled:
+            return "cancelled"
+        if self.finished_at:
+            return "completed"
+        return "running"
+
+    def ranked(self) -> list:
+        return sorted(self.results, key=_score, reverse=True)
+
+    def progress(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "mode": self.mode,
+            "total": self.total,
+            "completed": len(self.results),
+            "failed": sum(1 for r in self.results if r.get("error")),
+            "elapsed": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+
+    async def _add(self, result: dict):
+        async with self._changed:
+            self.results.append(result)
+            self._changed.notify_all()
+
+    async def _parse_one(self, filename: str, source, parse_slots: asyncio.Semaphore):
+        """
+        The resume's text, or None after recording why it could not be read.
+        """
+        try:
+            if source is None:
+                raise ValueError("Resume exceeds the upload size limit.")
+            async with parse_slots:
+                data = await asyncio.to_thread(source.read) if isinstance(source, ZipEntry) else source
+                text = await parse_resume_data(data)
+            if not text:
+                raise ValueError("Could not extract text from PDF.")
+            return text
+        except Exception as e:
+            await self._add({"filename": filename, "error": str(e)})
+            return None
+
+    async def _screen_one(self, filename: str, text: str, corpus: ResumeCorpus, llm_slots: asyncio.Semaphore):
+        result = {"filename": filename}
+        try:
+            async with llm_slots:
+                analysis = await analyze_resume(text, self.job_description, mode=self.mode, corpus=corpus)
+            result["analysis"] = analysis
+            # A hybrid fallback still carries a usable keyword score
+            if isinstance(analysis, Fallback) and "llm_error" not in analysis:
+                result["error"] = analysis.get("feedback", "Analysis failed.")
+        except Exception as e:
+            result["error"] = str(e)
+        await self._add(result)
+
+    async def run(self):
+        """
+        Parses every resume first, so all of them are scored against one corpus (the batch's own IDF),
+        then analyzes them.
+        """
+        request_priority.set("background")
+        parse_slots = asyncio.Semaphore(BATCH_PARSE_CONCURRENCY)
+        llm_slots = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+        resumes, self._resumes = self._resumes, None
+        try:
+            texts = await asyncio.gather(*(self._parse_one(name, source, parse_slots) for name, source in resumes))
+            parsed = [(name, text) for (name, _), text in zip(resumes, texts) if text]
+            del resumes, texts
+            corpus = await asyncio.to_thread(ResumeCorpus, [text for _, text in parsed])
+            await asyncio.gather(*(self._screen_one(name, text, corpus, llm_slots) for name, text in parsed))
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        finally:
+            async with self._changed:
+                self.finished_at = time.time()
+                self._changed.notify_all()
+
+    async def events(self):
+        """
+        Yields each per-resume result as it finishes, then a final event with the ranked list.
+        """
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.results) > sent or self.finished_at)
+                fresh = self.results[sent:]
+                done = self.finished_at is not None
+            for result in fresh:
+                yield {"type": "result", **result}
+            sent += len(fresh)
+            if done:
+                break
+        yield {"type": "done", **self.progress(), "ranked": self.ranked()}
+
+
+_jobs = OrderedDict()
+
+
+def _expire_jobs():
+    now = time.time()
+    for job_id in [j for j, job in _jobs.items() if job.finished_at and now - job.finished_at > BATCH_JOB_TTL]:
+        del _jobs[job_id]
+    # Over the limit, the oldest finished batches go first; running ones are never dropped
+    for job_id in [j for j, job in _jobs.items() if job.finished_at]:
+        if len(_jobs) < BATCH_MAX_JOBS:
+            break
+        del _jobs[job_id]
+
+
+def start_batch(job_description: str, resumes: list, mode: str = "hybrid") -> BatchJob:
+    """
+    Starts screening resumes in the background. Raises BatchTableFull when BATCH_MAX_JOBS batches are still running.
+    """
+    _expire_jobs()
+    if len(_jobs) >= BATCH_MAX_JOBS:
+        raise BatchTableFull(f"Too many batches in progress (limit {BATCH_MAX_JOBS}); try again later.")
+    job = BatchJob(job_description, resumes, mode)
+    _jobs[job.id] = job
+    job.task = asyncio.create_task(job.run())
+    return job
+
+
+def get_batch(job_id: str):
+    return _jobs.get(job_id)
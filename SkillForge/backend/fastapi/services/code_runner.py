@@ -0,0 +1,876 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+import signal
+import asyncio
+import tempfile
+import selectors
+import subprocess
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the local backend is unavailable
+    resource = None
+
+from services.ollama_client import get_client
+
+# Code execution backends for DSA Dojo.
+# "piston" posts submissions to a Piston API. "local" runs them on this host, each compile and run in its own
+# sandbox (see below); it needs root to set that up and refuses to start without it.
+CODE_RUNNER_BACKEND = os.getenv("CODE_RUNNER_BACKEND", "piston")
+# Languages whose toolchain is not installed locally are sent to Piston instead
+CODE_RUNNER_PISTON_FALLBACK = os.getenv("CODE_RUNNER_PISTON_FALLBACK", "1") == "1"
+PISTON_API_URL = os.getenv("PISTON_API_URL", "https://emkc.org/api/v2/piston/execute")
+
+CODE_RUN_TIMEOUT = float(os.getenv("CODE_RUN_TIMEOUT", "5"))  # wall-clock seconds per run
+CODE_RUN_CPU_SECONDS = int(os.getenv("CODE_RUN_CPU_SECONDS", "5"))
+CODE_RUN_MEMORY_MB = int(os.getenv("CODE_RUN_MEMORY_MB", "256"))
+CODE_COMPILE_TIMEOUT = float(os.getenv("CODE_COMPILE_TIMEOUT", "30"))
+CODE_OUTPUT_LIMIT = int(os.getenv("CODE_OUTPUT_LIMIT", str(64 * 1024)))  # bytes of stdout + stderr kept
+CODE_FILE_SIZE_LIMIT = int(os.getenv("CODE_FILE_SIZE_LIMIT", str(16 * 1024 * 1024)))
+# Processes/threads a run may add. RLIMIT_NPROC counts every task of the sandbox user, so the limit is
+# set this far above what that user already runs
+CODE_RUN_MAX_PROCESSES = int(os.getenv("CODE_RUN_MAX_PROCESSES", "128"))
+CODE_RUNNER_WORKERS = int(os.getenv("CODE_RUNNER_WORKERS", "8"))  # concurrent local executions
+CODE_RUNNER_WARM_POOL = int(os.getenv("CODE_RUNNER_WARM_POOL", "2"))  # idle interpreters kept per language
+CODE_RUNNER_PYTHON = os.getenv("CODE_RUNNER_PYTHON", "python3")
+GO_BUILD_CACHE = os.getenv("GO_BUILD_CACHE", os.path.join(tempfile.gettempdir(), "skillforge-gocache"))
+
+# The local backend's sandbox: every compile and run gets its own pid, network, mount, IPC, UTS and cgroup
+# namespaces (a fresh /proc that shows nothing of this server, and no network), and drops to an
+# unprivileged uid with no capabilities. /tmp, /var/tmp and /dev/shm are replaced by empty tmpfs mounts,
+# and only the submission's workdir is mounted back, at /tmp/box. The app directory, the working
+# directory, the artifact cache and CODE_RUNNER_SANDBOX_HIDE (comma-separated) are covered by empty mounts.
+CODE_RUNNER_SANDBOX_UID = int(os.getenv("CODE_RUNNER_SANDBOX_UID", "65534"))  # nobody
+CODE_RUNNER_SANDBOX_GID = int(os.getenv("CODE_RUNNER_SANDBOX_GID", "65534"))
+CODE_RUNNER_SANDBOX_HIDE = [p.strip() for p in os.getenv("CODE_RUNNER_SANDBOX_HIDE", "").split(",") if p.strip()]
+CODE_RUNNER_SANDBOX_TMPFS_MB = int(os.getenv("CODE_RUNNER_SANDBOX_TMPFS_MB", "64"))  # size of each scratch tmpfs
+
+# Compiled builds are kept by a hash of language, toolchain version, compile command and source, so
+# rerunning the same code with new stdin skips the compiler. Least recently used builds go first once
+# the cache outgrows its size limit.
+CODE_ARTIFACT_CACHE_ENABLED = os.getenv("CODE_ARTIFACT_CACHE_ENABLED", "1") == "1"
+CODE_ARTIFACT_CACHE_DIR = os.getenv("CODE_ARTIFACT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "skillforge-artifacts"))
+CODE_ARTIFACT_CACHE_MB = int(os.getenv("CODE_ARTIFACT_CACHE_MB", "256"))
+# Compile a trivial program per compiled language at startup, so the first real submission does not pay
+# for cold compiler binaries and (for Go) an empty build cache
+CODE_RUNNER_WARM_TOOLCHAINS = os.getenv("CODE_RUNNER_WARM_TOOLCHAINS", "1") == "1"
+
+# ru_maxrss of a child forked from this (large) server process starts at the server's own peak RSS,
+# so on Linux peak memory is sampled from /proc/<pid>/status while the program runs instead.
+# ru_maxrss is still used when it exceeds the server's peak (a short-lived but large program).
+MEMORY_SAMPLE_INTERVAL = 0.005
+_HAS_PROC = os.path.exists("/proc/self/status")
+
+# Map common names to Piston language versions/names
+PISTON_LANGUAGES = {
+    "python": {"language": "python", "version": "3.10.0"},
+    "javascript": {"language": "javascript", "version": "18.15.0"},
+    "java": {"language": "java", "version": "15.0.2"},
+    "c": {"language": "c", "version": "10.2.0"},
+    "cpp": {"language": "c++", "version": "10.2.0"},
+    "go": {"language": "go", "version": "1.16.2"},
+}
+
+# Warm interpreters start with this bootstrap, block until they receive "<path>\n" on stdin,
+# then run that file; everything after the newline is the program's own stdin.
+_PY_BOOTSTRAP = (
+    "import os, sys\n"
+    "b = b''\n"
+    "while not b.endswith(b'\\n'):\n"
+    "    c = os.read(0, 1)\n"
+    "    if not c: sys.exit(0)\n"
+    "    b += c\n"
+    "path = b.decode().strip()\n"
+    "sys.argv = [path]\n"
+    "sys.path.insert(0, os.path.dirname(path))\n"
+    "code = compile(open(path).read(), path, 'exec')\n"
+    "del b, c, path\n"
+    "exec(code, {'__name__': '__main__', '__builtins__': __builtins__})\n"
+)
+_JS_BOOTSTRAP = (
+    "const fs = require('fs'); const b = Buffer.alloc(1); let s = '';"
+    "for (;;) { if (!fs.readSync(0, b, 0, 1, null)) process.exit(0); const c = b.toString();"
+    " if (c === '\\n') break; s += c; }"
+    "process.argv[1] = s; require(s);"
+)
+
+# Per-language toolchain. limit_address_space is off for runtimes that reserve large virtual memory up front.
+LANGUAGES = {
+    "python": {
+        "source": "main.py",
+        "run": lambda: [CODE_RUNNER_PYTHON, "-I", "main.py"],
+        "warm": lambda: [CODE_RUNNER_PYTHON, "-I", "-c", _PY_BOOTSTRAP],
+        "limit_address_space": True,
+    },
+    "javascript": {
+        "source": "main.js",
+        "run": lambda: ["node", f"--max-old-space-size={CODE_RUN_MEMORY_MB}", "main.js"],
+        "warm": lambda: ["node", f"--max-old-space-size={CODE_RUN_MEMORY_MB}", "-e", _JS_BOOTSTRAP],
+        "limit_address_space": False,
+    },
+    "c": {
+        "source": "main.c",
+        "compile": lambda src: ["gcc", "-O2", "-pipe", "-o", "main", src, "-lm"],
+        "version": ["gcc", "--version"],
+        "hello": "int main(void) { return 0; }\n",
+        "run": lambda: ["./main"],
+        "limit_address_space": True,
+    },
+    "cpp": {
+        "source": "main.cpp",
+        "compile": lambda src: ["g++", "-O2", "-pipe", "-std=c++17", "-o", "main", src],
+        "version": ["g++", "--version"],
+        "hello": "#include <iostream>\nint main() { std::cout << 0; return 0; }\n",
+        "run": lambda: ["./main"],
+        "limit_address_space": True,
+    },
+    "java": {
+        "source": "Main.java",
+        "compile": lambda src: ["javac", "-J-Xmx512m", src],
+        "version": ["javac", "-version"],
+        "hello": "public class Main { public static void main(String[] a) { } }\n",
+        "run": lambda: ["java", f"-Xmx{CODE_RUN_MEMORY_MB}m", "-Xss64m", "-cp", ".", "Main"],
+        "limit_address_space": False,
+    },
+    "go": {
+        "source": "main.go",
+        "compile": lambda src: ["go", "build", "-o", "main", src],
+        "version": ["go", "version"],
+        "hello": "package main\n\nimport \"fmt\"\n\nfunc main() { fmt.Print() }\n",
+        "run": lambda: ["./main"],
+        "limit_address_space": False,
+    },
+}
+LANGUAGE_ALIASES = {"py": "python", "python3": "python", "js": "javascript", "node": "javascript", "c++": "cpp", "golang": "go"}
+
+
+def normalize_language(language: str) -> str:
+    language = language.lower().strip()
+    return LANGUAGE_ALIASES.get(language, language)
+
+
+class ExecutionError(Exception):
+    pass
+
+
+# --- process plumbing (runs in worker threads) ---
+
+def _limits(cpu_seconds: int, memory_mb, file_bytes: int, processes=None):
+    def apply():
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (file_bytes, file_bytes))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        if memory_mb:
+            memory = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        if processes:
+            resource.setrlimit(resource.RLIMIT_NPROC, (processes, processes))
+    return apply
+
+
+def _user_tasks(uid: int) -> int:
+    # Threads count towards RLIMIT_NPROC too, so sum Threads: over this user's processes
+    uid = str(uid)
+    total = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                fields = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        if fields.get("Uid", "").split()[:1] == [uid]:
+            total += int(fields.get("Threads", "1"))
+    return total
+
+
+def _process_limit():
+    """
+    RLIMIT_NPROC for a submission: CODE_RUN_MAX_PROCESSES more tasks than the sandbox user already has,
+    so a fork bomb stops there.
+    """
+    if not CODE_RUN_MAX_PROCESSES or not _HAS_PROC:
+        return None
+    return _user_tasks(CODE_RUNNER_SANDBOX_UID) + CODE_RUN_MAX_PROCESSES
+
+
+# --- sandbox ---
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SANDBOX_DIR = "/tmp/box"  # where the workdir appears inside the sandbox
+_SANDBOX_GO_CACHE = "/tmp/gocache"
+
+# Runs as root inside the new namespaces: $1 workdir, $2 Go build cache (or ""), $3 scratch dirs and
+# $4 dirs to hide (colon-separated), then the command. The directories are opened before /tmp is covered,
+# and mounted back from those descriptors. This shell stays pid 1 and runs the program as its child, since
+# the kernel drops signals such as SIGXCPU that have no handler when they are sent to a namespace's pid 1;
+# a program killed by signal N makes it exit with 128 + N.
+_SANDBOX_STUB = f"""
+set -e
+exec 3<"$1"
+if [ -n "$2" ]; then exec 4<"$2"; fi
+IFS=:
+for dir in $3; do
+    if [ -d "$dir" ]; then mount -t tmpfs -o mode=1777,nosuid,nodev,size={CODE_RUNNER_SANDBOX_TMPFS_MB}m sandbox-tmp "$dir"; fi
+done
+mkdir -p {_SANDBOX_DIR}
+mount --bind /proc/self/fd/3 {_SANDBOX_DIR}
+if [ -n "$2" ]; then mkdir -p {_SANDBOX_GO_CACHE}; mount --bind /proc/self/fd/4 {_SANDBOX_GO_CACHE}; fi
+exec 3<&- 4<&-
+for dir in $4; do
+    if [ -d "$dir" ]; then mount -t tmpfs -o ro,mode=0,size=4k sandbox-hidden "$dir"; fi
+done
+unset IFS
+cd {_SANDBOX_DIR}
+shift 4
+# The program keeps stderr (restored inside the child); this shell's "Segmentation fault"-style
+# reports go to /dev/null
+exec 5>&2 2>/dev/null
+sh -c 'exec 2>&5 5>&-; exec "$@"' sh setpriv --reuid={CODE_RUNNER_SANDBOX_UID} --regid={CODE_RUNNER_SANDBOX_GID} \\
+    --clear-groups --inh-caps=-all --bounding-set=-all --no-new-privs -- "$@" && status=0 || status=$?
+exit $status
+"""
+
+
+def _sandbox_argv(argv: list, workdir: str, go_cache: bool = False) -> list:
+    scratch = dict.fromkeys(["/tmp", "/var/tmp", "/dev/shm", tempfile.gettempdir()])
+    hidden = dict.fromkeys([_APP_DIR, os.getcwd(), CODE_ARTIFACT_CACHE_DIR, GO_BUILD_CACHE, *CODE_RUNNER_SANDBOX_HIDE])
+    return [
+        "unshare", "--pid", "--fork", "--kill-child", "--mount-proc", "--net", "--mount", "--ipc", "--uts", "--cgroup",
+        "--", "sh", "-c", _SANDBOX_STUB, "sandbox",
+        workdir, GO_BUILD_CACHE if go_cache else "", ":".join(scratch), ":".join(hidden), *argv,
+    ]
+
+
+def _make_workdir(prefix: str) -> str:
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    os.chown(workdir, CODE_RUNNER_SANDBOX_UID, CODE_RUNNER_SANDBOX_GID)
+    return workdir
+
+
+def _prepare_go_cache():
+    # Shared by compiles only; runs never see it
+    os.makedirs(GO_BUILD_CACHE, exist_ok=True)
+    for root, dirs, files in os.walk(GO_BUILD_CACHE):
+        for name in [root, *(os.path.join(root, n) for n in dirs + files)]:
+            os.lchown(name, CODE_RUNNER_SANDBOX_UID, CODE_RUNNER_SANDBOX_GID)
+
+
+def sandbox_problem():
+    """
+    Why the local backend's sandbox cannot be used here, or None when it works.
+    """
+    if resource is None or not _HAS_PROC:
+        return "it needs Linux"
+    if os.geteuid() != 0:
+        return "creating its namespaces and switching to the sandbox uid need root"
+    if CODE_RUNNER_SANDBOX_UID == 0 or CODE_RUNNER_SANDBOX_GID == 0:
+        return "CODE_RUNNER_SANDBOX_UID/GID must not be root"
+    for tool in ("unshare", "setpriv"):
+        if shutil.which(tool) is None:
+            return f"{tool} (util-linux) is not installed"
+    workdir = _make_workdir("skillforge-probe-")
+    try:
+        done = subprocess.run(
+            # Running as the sandbox uid, with the sandbox shell as pid 1 of its own /proc
+            _sandbox_argv(["sh", "-c", f'[ "$(id -u)" = {CODE_RUNNER_SANDBOX_UID} ] && grep -q sandbox /proc/1/cmdline'], workdir),
+            capture_output=True, text=True, timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        return f"the probe failed: {e}"
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if done.returncode != 0:
+        return f"the probe failed: {done.stderr.strip() or done.returncode}"
+    return None
+
+
+def _env() -> dict:
+    # Paths as the sandboxed program sees them
+    return {
+        "PATH": os.environ.get("PATH", "/usr/local/bin:/usr/bin:/bin"),
+        "HOME": _SANDBOX_DIR,
+        "TMPDIR": _SANDBOX_DIR,
+        "LANG": "C.UTF-8",
+        "GOCACHE": _SANDBOX_GO_CACHE,
+        "GOPATH": os.path.join(_SANDBOX_GO_CACHE, "gopath"),
+        "GO111MODULE": "off",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+
+
+def _spawn(argv: list, workdir: str, cpu_seconds: int, memory_mb, processes=None, go_cache: bool = False) -> subprocess.Popen:
+    return subprocess.Popen(
+        _sandbox_argv(argv, workdir, go_cache),
+        cwd=workdir,
+        env=_env(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        preexec_fn=_limits(cpu_seconds, memory_mb, CODE_FILE_SIZE_LIMIT, processes),
+        start_new_session=True,  # own process group, so a timeout kills everything it forked
+    )
+
+
+def _kill(proc: subprocess.Popen):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _peak_rss_kb(pid: int) -> int:
+    # The program runs a few processes below the one we started (unshare, the sandbox shell), so take
+    # the largest peak in the tree
+    peak = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    peak = int(line.split()[1])
+                    break
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = f.read().split()
+    except (OSError, ValueError):
+        return peak
+    for child in children:
+        peak = max(peak, _peak_rss_kb(int(child)))
+    return peak
+
+
+def _drive(proc: subprocess.Popen, stdin_data: bytes, timeout: float, output_limit: int) -> dict:
+    """
+    Feeds stdin, collects capped stdout/stderr and enforces the wall-clock limit.
+    Returns Piston-style stage fields plus time (ms), cpu_time (ms) and memory (KB, peak RSS).
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    out, err = bytearray(), bytearray()
+    buffers = {proc.stdout.fileno(): out, proc.stderr.fileno(): err}
+    timed_out = truncated = False
+    pending = memoryview(stdin_data)
+    peak_kb = 0
+
+    with selectors.DefaultSelector() as sel:
+        for fd in buffers:
+            os.set_blocking(fd, False)
+            sel.register(fd, selectors.EVENT_READ)
+        if pending:
+            os.set_blocking(proc.stdin.fileno(), False)
+            sel.register(proc.stdin.fileno(), selectors.EVENT_WRITE)
+        else:
+            proc.stdin.close()
+
+        while sel.get_map():
+            if _HAS_PROC:
+                peak_kb = max(peak_kb, _peak_rss_kb(proc.pid))
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                timed_out = True
+                _kill(proc)
+                break
+            wait = min(remaining, MEMORY_SAMPLE_INTERVAL) if _HAS_PROC else remaining
+            for key, _ in sel.select(wait):
+                fd = key.fd
+                if fd not in buffers:
+                    try:
+                        pending = pending[os.write(fd, pending[:65536]):]
+                    except BlockingIOError:
+                        continue
+                    except BrokenPipeError:
+                        # The program exited or closed stdin without reading all of it
+                        pending = pending[:0]
+                    if not pending:
+                        sel.unregister(fd)
+                        proc.stdin.close()
+                    continue
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    sel.unregister(fd)
+                    continue
+                room = output_limit - len(out) - len(err)
+                if len(chunk) > room:
+                    buffers[fd] += chunk[:max(room, 0)]
+                    if not truncated:
+                        truncated = True
+                        _kill(proc)
+                else:
+                    buffers[fd] += chunk
+
+    for stream in (proc.stdin, proc.stdout, proc.stderr):
+        if not stream.closed:
+            stream.close()
+    # Closing stdout/stderr does not mean the program exited; keep enforcing the deadline while reaping
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.perf_counter() >= deadline:
+            timed_out = True
+            _kill(proc)
+            _, status, usage = os.wait4(proc.pid, 0)
+            break
+        if _HAS_PROC:
+            peak_kb = max(peak_kb, _peak_rss_kb(proc.pid))
+        time.sleep(MEMORY_SAMPLE_INTERVAL)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+
+    stdout = out.decode("utf-8", "replace")
+    stderr = err.decode("utf-8", "replace")
+    if timed_out:
+        stderr += f"\nTime limit exceeded ({timeout:g}s)"
+    if truncated:
+        stderr += f"\nOutput limit exceeded ({output_limit} bytes)"
+    # ru_maxrss is only meaningful when it exceeds what the child inherited from this process
+    rusage_kb = usage.ru_maxrss if usage.ru_maxrss > resource.getrusage(resource.RUSAGE_SELF).ru_maxrss else 0
+    code = proc.returncode if proc.returncode >= 0 else None
+    sig = signal.Signals(-proc.returncode).name if proc.returncode < 0 else None
+    if code is not None and code > 128 and code - 128 in signal.valid_signals():
+        # The sandbox shell's report of a program killed by a signal
+        code, sig = None, signal.Signals(code - 128).name
+    return {
+        "stdout": stdout,
+        "stderr": stderr,
+        "output": stdout + stderr,
+        "code": code,
+        "signal": sig,
+        "timed_out": timed_out,
+        "output_truncated": truncated,
+        "time": round(elapsed * 1000, 2),
+        "cpu_time": round((usage.ru_utime + usage.ru_stime) * 1000, 2),
+        "memory": max(peak_kb, rusage_kb) or None,
+    }
+
+
+# --- compiled artifact cache ---
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactCache:
+    """
+    Successful builds on disk, one directory per key: build/ holds the compiled workdir and compile.json
+    the compiler's result. A hit copies the build into the submission's fresh workdir, so a program that
+    rewrites its own files cannot change what the next run of the same source gets.
+    """
+    def __init__(self, root: str = CODE_ARTIFACT_CACHE_DIR, max_bytes: int = CODE_ARTIFACT_CACHE_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._bytes = 0
+        self._versions = {}  # language -> first line of its compiler's version output
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def toolchain_version(self, language: str) -> str:
+        if language not in self._versions:
+            try:
+                done = subprocess.run(LANGUAGES[language]["version"], capture_output=True, text=True, timeout=10)
+                # javac 8 prints its version to stderr
+                lines = (done.stdout.strip() or done.stderr.strip()).splitlines()
+                self._versions[language] = lines[0] if lines else ""
+            except (OSError, subprocess.SubprocessError):
+                self._versions[language] = ""
+        return self._versions[language]
+
+    def key(self, language: str, source: str, code: str):
+        """
+        The cache key for a build, or None when the toolchain version is unknown (nothing is cached then).
+        """
+        version = self.toolchain_version(language)
+        if not version:
+            return None
+        material = json.dumps([language, version, LANGUAGES[language]["compile"](source), code])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _load(self):
+        # Builds left by an earlier run are reused; compile.json's mtime is the last use
+        self._loaded = True
+        if not os.path.isdir(self.root):
+            return
+        found = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".tmp-"):
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            try:
+                found.append((os.stat(os.path.join(path, "compile.json")).st_mtime, name, _tree_size(path)))
+            except OSError:
+                shutil.rmtree(path, ignore_errors=True)
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._bytes += size
+        self._evict()
+
+    def _evict(self):
+        # Caller holds the lock
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._stats["evicted"] += 1
+            shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+
+    def fetch(self, key: str, workdir: str):
+        """
+        Copies the cached build for key into workdir and returns its compile result, or None on a miss.
+        """
+        path = os.path.join(self.root, key)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            found = key in self._entries
+            if found:
+                self._entries.move_to_end(key)
+        if found:
+            try:
+                shutil.copytree(os.path.join(path, "build"), workdir, dirs_exist_ok=True)
+                with open(os.path.join(path, "compile.json")) as f:
+                    result = json.load(f)
+                os.utime(os.path.join(path, "compile.json"))
+                self._stats["hits"] += 1
+                return result
+            except (OSError, ValueError):
+                # Evicted while we were copying it
+                pass
+        self._stats["misses"] += 1
+        return None
+
+    def store(self, key: str, workdir: str, compile_result: dict):
+        path = os.path.join(self.root, key)
+        if key in self._entries:
+            return
+        staging = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        try:
+            shutil.copytree(workdir, os.path.join(staging, "build"))
+            with open(os.path.join(staging, "compile.json"), "w") as f:
+                json.dump(compile_result, f)
+            size = _tree_size(staging)
+            if size > self.max_bytes:
+                shutil.rmtree(staging, ignore_errors=True)
+                return
+            os.rename(staging, path)
+        except OSError as e:
+            # Most often the same source was just stored by a concurrent compile
+            if not os.path.isdir(path):
+                print(f"Artifact cache store failed: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if key not in self._entries:
+                self._entries[key] = size
+                self._bytes += size
+                self._stats["stored"] += 1
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "enabled": CODE_ARTIFACT_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "toolchains": {lang: version for lang, version in self._versions.items() if version},
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+artifact_cache = ArtifactCache()
+
+
+# --- local backend ---
+
+class Prepared:
+    """
+    A submission ready to run: a workdir with the compiled binary, or the source for an interpreter.
+    """
+    def __init__(self, language: str, workdir: str, source: str, compile_result=None):
+        self.language = language
+        self.workdir = workdir
+        self.source = source
+        self.compile_result = compile_result
+
+    @property
+    def ok(self) -> bool:
+        return self.compile_result is None or self.compile_result["code"] == 0
+
+
+class LocalBackend:
+    name = "local"
+
+    def __init__(self, workers: int = CODE_RUNNER_WORKERS, warm_pool: int = CODE_RUNNER_WARM_POOL):
+        self.workers = workers
+        self.warm_pool = warm_pool
+        self._executor = None
+        self._warm = {lang: deque() for lang, spec in LANGUAGES.items() if "warm" in spec}
+        self._refilling = set()
+        self._available = {}
+        self._sandboxed = False  # set by start() once the sandbox has been checked
+
+    def _run_in_pool(self, func, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="code-runner")
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def supports(self, language: str) -> bool:
+        spec = LANGUAGES.get(language)
+        if spec is None or not self._sandboxed:
+            return False
+        if language not in self._available:
+            tool = (spec["compile"]("x") if "compile" in spec else spec["run"]())[0]
+            self._available[language] = shutil.which(tool) is not None
+        return self._available[language]
+
+    def _run_memory(self, language: str):
+        return CODE_RUN_MEMORY_MB if LANGUAGES[language]["limit_address_space"] else None
+
+    # warm interpreters
+
+    def _spawn_warm(self, language: str):
+        workdir = _make_workdir("skillforge-run-")
+        proc = _spawn(LANGUAGES[language]["warm"](), workdir, CODE_RUN_CPU_SECONDS, self._run_memory(language), _process_limit())
+        return proc, workdir
+
+    async def _refill(self, language: str):
+        if language in self._refilling:
+            return
+        self._refilling.add(language)
+        try:
+            while len(self._warm[language]) < self.warm_pool:
+                self._warm[language].append(await self._run_in_pool(self._spawn_warm, language))
+        finally:
+            self._refilling.discard(language)
+
+    async def _take_warm(self, language: str):
+        pool = self._warm[language]
+        warm = None
+        while pool:
+            proc, workdir = pool.popleft()
+            if proc.poll() is None:
+                warm = (proc, workdir)
+                break
+            shutil.rmtree(workdir, ignore_errors=True)
+        if self.warm_pool:
+            asyncio.create_task(self._refill(language))
+        if warm is None:
+            warm = await self._run_in_pool(self._spawn_warm, language)
+        return warm
+
+    async def start(self):
+        """
+        Checks the sandbox and refuses to start without it: submissions never run unisolated.
+        """
+        problem = await asyncio.to_thread(sandbox_problem)
+        if problem:
+            raise RuntimeError(f"CODE_RUNNER_BACKEND=local cannot sandbox submissions: {problem}. Use CODE_RUNNER_BACKEND=piston.")
+        await asyncio.to_thread(_prepare_go_cache)
+        self._sandboxed = True
+        if self.warm_pool:
+            for language in self._warm:
+                if self.supports(language):
+                    asyncio.create_task(self._refill(language))
+        if CODE_RUNNER_WARM_TOOLCHAINS:
+            asyncio.create_task(self._warm_toolchains())
+
+    # compile / run
+
+    def _source_name(self, language: str, code: str) -> str:
+        if language == "java":
+            match = re.search(r"public\s+(?:final\s+)?class\s+(\w+)", code)
+            if match and match.group(1) != "Main":
+                # javac requires the file to be named after the public class; run it via Main
+                return f"{match.group(1)}.java"
+        return LANGUAGES[language]["source"]
+
+    def _compile(self, language: str, code: str, use_cache: bool = True) -> Prepared:
+        spec = LANGUAGES[language]
+        workdir = _make_workdir("skillforge-build-")
+        source = self._source_name(language, code)
+        with open(os.path.join(workdir, source), "w") as f:
+            f.write(code)
+        if "compile" not in spec:
+            return Prepared(language, workdir, code)
+        key = artifact_cache.key(language, source, code) if use_cache and CODE_ARTIFACT_CACHE_ENABLED else None
+        if key:
+            start = time.perf_counter()
+            cached = artifact_cache.fetch(key, workdir)
+            if cached is not None:
+                # time is what restoring the build took, not the original compile
+                cached.update(cached=True, time=round((time.perf_counter() - start) * 1000, 2), cpu_time=None, memory=None)
+                return Prepared(language, workdir, code, cached)
+        proc = _spawn(spec["compile"](source), workdir, int(CODE_COMPILE_TIMEOUT), None, go_cache=True)
+        result = _drive(proc, b"", CODE_COMPILE_TIMEOUT, CODE_OUTPUT_LIMIT)
+        if language == "java" and source != "Main.java" and result["code"] == 0:
+            main_class = source[:-5]
+            with open(os.path.join(workdir, "Main.java"), "w") as f:
+                f.write(f"public class Main {{ public static void main(String[] a) throws Exception {{ {main_class}.main(a); }} }}")
+            extra = _drive(_spawn(spec["compile"]("Main.java"), workdir, int(CODE_COMPILE_TIMEOUT), None, go_cache=True), b"", CODE_COMPILE_TIMEOUT, CODE_OUTPUT_LIMIT)
+            result["time"] += extra["time"]
+        if key and result["code"] == 0:
+            artifact_cache.store(key, workdir, result)
+        result["cached"] = False
+        return Prepared(language, workdir, code, result)
+
+    async def prepare(self, language: str, code: str) -> Prepared:
+        """
+        Writes the submission to a fresh workdir and compiles it if the language needs it,
+        restoring an identical earlier build from the artifact cache when there is one.
+        """
+        return await self._run_in_pool(self._compile, language, code)
+
+    async def _warm_toolchains(self):
+        for language, spec in LANGUAGES.items():
+            if "compile" not in spec or not self.supports(language):
+                continue
+            try:
+                # Bypasses the artifact cache: the point is to run the compiler once
+                prepared = await self._run_in_pool(self._compile, language, spec["hello"], False)
+                self.cleanup(prepared)
+                artifact_cache.toolchain_version(language)
+            except Exception as e:
+                print(f"Warming the {language} toolchain failed: {e}")
+
+    def _run_compiled(self, prepared: Prepared, stdin: str, timeout: float) -> dict:
+        language = prepared.language
+        proc = _spawn(LANGUAGES[language]["run"](), prepared.workdir, CODE_RUN_CPU_SECONDS, self._run_memory(language), _process_limit())
+        return _drive(proc, stdin.encode(), timeout, CODE_OUTPUT_LIMIT)
+
+    def _run_warm(self, warm, prepared: Prepared, stdin: str, timeout: float) -> dict:
+        proc, workdir = warm
+        source = LANGUAGES[prepared.language]["source"]
+        try:
+            with open(os.path.join(workdir, source), "w") as f:
+                f.write(prepared.source)
+            # The interpreter sees the workdir at _SANDBOX_DIR
+            path = os.path.join(_SANDBOX_DIR, source)
+            return _drive(proc, path.encode() + b"\n" + stdin.encode(), timeout, CODE_OUTPUT_LIMIT)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def run(self, prepared: Prepared, stdin: str = "", timeout: float = CODE_RUN_TIMEOUT) -> dict:
+        """
+        Runs a prepared submission once with the given stdin.
+        """
+        if "warm" in LANGUAGES[prepared.language]:
+            warm = await self._take_warm(prepared.language)
+            return await self._run_in_pool(self._run_warm, warm, prepared, stdin, timeout)
+        return await self._run_in_pool(self._run_compiled, prepared, stdin, timeout)
+
+    def cleanup(self, prepared: Prepared):
+        shutil.rmtree(prepared.workdir, ignore_errors=True)
+
+    async def execute(self, language: str, code: str, stdin: str = "") -> dict:
+        prepared = await self.prepare(language, code)
+        try:
+            result = {"language": language, "version": "local", "backend": self.name}
+            timing = {}
+            if prepared.compile_result is not None:
+                result["compile"] = prepared.compile_result
+                timing = {"compile_ms": prepared.compile_result["time"], "compile_cached": prepared.compile_result["cached"]}
+            if not prepared.ok:
+                # Mirror Piston: a failed compile reports its output as the run output
+                result["run"] = {**prepared.compile_result, "stdout": "", "time": 0}
+                result["timing"] = {**timing, "run_ms": 0}
+                return result
+            result["run"] = await self.run(prepared, stdin)
+            result["timing"] = {**timing, "run_ms": result["run"]["time"]}
+            return result
+        finally:
+            self.cleanup(prepared)
+
+    async def close(self):
+        for pool in self._warm.values():
+            while pool:
+                proc, workdir = pool.popleft()
+                _kill(proc)
+                proc.wait()
+                shutil.rmtree(workdir, ignore_errors=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# --- Piston backend ---
+
+class PistonBackend:
+    name = "piston"
+
+    def supports(self, language: str) -> bool:
+        return True
+
+    async def execute(self, language: str, code: str, stdin: str = "") -> dict:
+        config = PISTON_LANGUAGES.get(language, {"language": language, "version": "*"})
+        payload = {
+            "language": config["language"],
+            "version": config["version"],
+            "files": [
+                {
+                    "content": code
+                }
+            ],
+            "stdin": stdin
+        }
+        response = await get_client().post(PISTON_API_URL, json=payload)
+        response.raise_for_status()
+        return response.json()
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+local_backend = LocalBackend()
+piston_backend = PistonBackend()
+
+
+def backend_for(language: str):
+    if CODE_RUNNER_BACKEND == "local":
+        if local_backend.supports(language):
+            return local_backend
+        if not CODE_RUNNER_PISTON_FALLBACK:
+            raise ExecutionError(f"Language '{language}' is not available on this server.")
+    return piston_backend
+
+
+async def execute(language: str, code: str, stdin: str = "") -> dict:
+    language = normalize_language(language)
+    return await backend_for(language).execute(language, code, stdin)
+
+
+async def start():
+    if CODE_RUNNER_BACKEND == "local":
+        await local_backend.start()
+
+
+async def close():
+    await local_backend.close()
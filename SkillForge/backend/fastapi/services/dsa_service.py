@@ -1,11 +1,21 @@
-import requests
-import json
+from services.ollama_client import chat, chat_stream
+from services.model_router import model_for
+from services.llm_cache import Fallback, make_key, ttl_for
+from services.semantic_cache import semantic_cache
+from services.scheduler import SchedulerRejected
+from services.json_repair import generate_json
+from services.llm_schemas import DSAQuestion
+from services.single_flight import coalesced
+from services.tracing import span, traced
+from services.yuvi_sessions import YuviSession, yuvi_sessions
+from services import code_runner
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
-PISTON_API_URL = "https://emkc.org/api/v2/piston/execute"
-DEFAULT_MODEL = "llama3.2"
+DEFAULT_MODEL = model_for("dsa")  # override with MODEL_DSA
+YUVI_MODEL = model_for("yuvi")  # override with MODEL_YUVI
 
-def generate_dsa_question(topic: str, difficulty: str, model: str = DEFAULT_MODEL) -> dict:
+@coalesced("dsa")
+@traced("dsa")
+async def generate_dsa_question(topic: str, difficulty: str, model: str = DEFAULT_MODEL) -> dict:
     """
     Generates a DSA question based on topic and difficulty.
     Returns structured JSON: {title, description, examples, starter_code}
@@ -34,83 +44,90 @@ def generate_dsa_question(topic: str, difficulty: str, model: str = DEFAULT_MODE
     }
     
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        ai_output = result.get("response", "{}")
-        return json.loads(ai_output)
+        return await generate_json(payload, DSAQuestion)
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Error generating question: {e}")
-        return {
+        return Fallback({
             "title": "Error Generating Question",
             "description": "Please try again.",
             "examples": [],
             "constraints": [],
             "starter_code": "# Error"
-        }
+        })
 
-def execute_code(language: str, code: str, stdin: str = "") -> dict:
+async def execute_code(language: str, code: str, stdin: str = "") -> dict:
     """
-    Executes code using the Piston API.
+    Executes code with the configured runner backend (local sandbox by default, Piston optional).
+    Returns the Piston response shape: {language, version, run: {stdout, stderr, output, code, signal}}.
     """
-    # Map common names to Piston language versions/names
-    lang_map = {
-        "python": {"language": "python", "version": "3.10.0"},
-        "javascript": {"language": "javascript", "version": "18.15.0"},
-        "java": {"language": "java", "version": "15.0.2"},
-        "c": {"language": "c", "version": "10.2.0"},
-        "cpp": {"language": "c++", "version": "10.2.0"},
-        "go": {"language": "go", "version": "1.16.2"},
-    }
-    
-    config = lang_map.get(language.lower(), {"language": language.lower(), "version": "*"})
-    
-    payload = {
-        "language": config["language"],
-        "version": config["version"],
-        "files": [
-            {
-                "content": code
-            }
-        ],
-        "stdin": stdin
-    }
-    
     try:
-        response = requests.post(PISTON_API_URL, json=payload)
-        response.raise_for_status()
-        return response.json()
+        with span("code.execute"):
+            return await code_runner.execute(language, code, stdin)
     except Exception as e:
         return {"run": {"output": f"Execution Error: {str(e)}"}}
 
-def ask_yuvi(code: str, question: str, user_query: str, model: str = DEFAULT_MODEL) -> str:
+def _first_turn_scope(session: YuviSession, code: str, model: str):
     """
-    Yuvi the AI Tutor provides hints or explanations.
+    Semantic-cache scope for FAQ-style first questions ("how do I start?") about the same problem and
+    code; None after the first turn, when the answer depends on the conversation so far.
     """
-    prompt = f"""
-    You are 'Yuvi', a friendly and encouraging AI Coding Tutor.
-    The user is solving this problem:
-    {question}
-    
-    Here is their current code:
-    {code}
-    
-    User Question: "{user_query}"
-    
-    Provide a helpful, concise hint or explanation. 
-    DO NOT give the full solution unless explicitly asked. 
-    Be encouraging!
+    if session.turns:
+        return None
+    return make_key("yuvi", {"question": session.question, "code": " ".join(code.split()), "model": model})
+
+@traced("yuvi")
+async def ask_yuvi(session: YuviSession, code: str, user_query: str, model: str = YUVI_MODEL) -> str:
     """
-    
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False
-    }
-    
-    try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        return response.json().get("response", "Yuvi is thinking...")
-    except Exception as e:
-        return f"Yuvi is having trouble connecting: {str(e)}"
+    Yuvi the AI Tutor provides hints or explanations, continuing the session's conversation.
+    """
+    async with session.lock:
+        message, kind = session.user_message(code, user_query)
+        scope = _first_turn_scope(session, code, model)
+        reply = semantic_cache.lookup("yuvi", scope, {"user_query": user_query}) if scope else None
+        if reply is None:
+            try:
+                result = await chat(session.payload(message, model, False), affinity=session.id)
+                reply = (result.get("message") or {}).get("content")
+            except SchedulerRejected:
+                raise
+            except Exception as e:
+                return f"Yuvi is having trouble connecting: {str(e)}"
+            if not reply:
+                return "Yuvi is thinking..."
+            if scope:
+                semantic_cache.store("yuvi", scope, {"user_query": user_query}, reply, ttl_for("yuvi"))
+        session.commit(message, reply, code)
+    yuvi_sessions.record(kind)
+    yuvi_sessions.maybe_summarize(session, model)
+    return reply
+
+@traced("yuvi.stream")
+async def stream_yuvi(session: YuviSession, code: str, user_query: str, model: str = YUVI_MODEL):
+    """
+    Streaming variant of ask_yuvi. Yields the hint text token by token.
+    """
+    async with session.lock:
+        message, kind = session.user_message(code, user_query)
+        scope = _first_turn_scope(session, code, model)
+        reply = semantic_cache.lookup("yuvi", scope, {"user_query": user_query}) if scope else None
+        if reply is not None:
+            yield reply
+        else:
+            parts = []
+            try:
+                async for chunk in chat_stream(session.payload(message, model, True), affinity=session.id):
+                    content = (chunk.get("message") or {}).get("content")
+                    if content:
+                        parts.append(content)
+                        yield content
+            except Exception as e:
+                yield f"Yuvi is having trouble connecting: {str(e)}"
+                return
+            reply = "".join(parts)
+            if scope and reply:
+                semantic_cache.store("yuvi", scope, {"user_query": user_query}, reply, ttl_for("yuvi"))
+        session.commit(message, reply, code)
+    yuvi_sessions.record(kind)
+    yuvi_sessions.maybe_summarize(session, model)
@@ -1,11 +1,18 @@
-import requests
-import json
 import random
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
-DEFAULT_MODEL = "llama3.2"
+from services.model_router import model_for
+from services.llm_cache import Fallback
+from services.scheduler import SchedulerRejected
+from services.json_repair import generate_json
+from services.llm_schemas import BattleQuestion
+from services.single_flight import coalesced
+from services.tracing import traced
 
-def generate_battle_question(topic: str, model: str = DEFAULT_MODEL) -> dict:
+DEFAULT_MODEL = model_for("game")  # override with MODEL_GAME
+
+@coalesced("game")
+@traced("game")
+async def generate_battle_question(topic: str, model: str = DEFAULT_MODEL) -> dict:
     """
     Generates a multiple-choice battle question.
     Returns: { question, options: [A,B,C,D], correct_index, difficulty }
@@ -31,17 +38,15 @@ def generate_battle_question(topic: str, model: str = DEFAULT_MODEL) -> dict:
     }
     
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        ai_output = result.get("response", "{}")
-        return json.loads(ai_output)
+        return await generate_json(payload, BattleQuestion)
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Error generating battle question: {e}")
         # Fallback question to prevent crash
-        return {
+        return Fallback({
             "question": f"Which of these is related to {topic}?",
             "options": ["Knowledge", "Power", "Wisdom", "All of the above"],
             "correct_index": 3,
             "difficulty": "Easy"
-        }
+        })
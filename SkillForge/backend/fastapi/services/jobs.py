@@ -0,0 +1,206 @@
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+
+from fastapi import HTTPException
+
+from services.scheduler import request_priority, request_user
+from services.supabase_auth import authenticated_user
+
+# Job mode for long generations: submit returns an id at once, a worker pool runs the work and
+# the client polls for the result, so a dropped connection or proxy timeout no longer loses it.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_JOBS = int(os.getenv("JOB_MAX_JOBS", "200"))  # queued + running + finished jobs kept
+JOB_TTL = float(os.getenv("JOB_TTL", "3600"))  # seconds a finished job's result stays retrievable
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", "30"))  # longest ?wait= a poll may block for
+
+FINISHED = ("completed", "failed", "cancelled")
+
+
+class JobTableFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, kind: str, factory):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.status_code = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.task = None
+        # The submitting request's scheduler context, restored when the job runs
+        self.priority = request_priority.get()
+        self.user = request_user.get()
+        self.authenticated_user = authenticated_user.get()
+        self._factory = factory
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        self._factory = None
+        self._done.set()
+
+    async def wait(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def as_dict(self) -> dict:
+        body = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed": round((self.finished_at or time.time()) - (self.started_at or self.created_at), 3),
+        }
+        if self.status == "completed":
+            body["result"] = self.result
+        elif self.error:
+            body["error"] = self.error
+            body["status_code"] = self.status_code
+        return body
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, max_jobs: int = JOB_MAX_JOBS, ttl: float = JOB_TTL):
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._queue = None
+        self._workers = []
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0, "expired": 0}
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        for job in self._jobs.values():
+            if not job.finished:
+                self.cancel(job.id)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _expire(self):
+        now = time.time()
+        for job_id in [j for j, job in self._jobs.items() if job.finished and now - job.finished_at > self.ttl]:
+            del self._jobs[job_id]
+            self._stats["expired"] += 1
+        # Over the limit, the oldest finished results go first; unfinished work is never dropped
+        for job_id in [j for j, job in self._jobs.items() if job.finished]:
+            if len(self._jobs) < self.max_jobs:
+                break
+            del self._jobs[job_id]
+            self._stats["expired"] += 1
+
+    def submit(self, kind: str, factory) -> Job:
+        """
+        Queues factory() (a coroutine function) as a job. Raises JobTableFull when max_jobs jobs are
+        still queued or running.
+        """
+        self._expire()
+        if len(self._jobs) >= self.max_jobs:
+            self._stats["rejected"] += 1
+            raise JobTableFull(f"Too many jobs in progress (limit {self.max_jobs}); try again later.")
+        job = Job(kind, factory)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self._stats["submitted"] += 1
+        return job
+
+    def get(self, job_id: str):
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        """
+        Cancels a queued or running job. A running job's task is cancelled, which closes its
+        in-flight Ollama request so the generation stops upstream too.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.task and not job.task.done():
+            job.task.cancel()
+        else:
+            self._stats["cancelled"] += 1
+            job._finish("cancelled")
+        return job
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            if job.finished:
+                continue
+            job.task = asyncio.create_task(self._run(job))
+            try:
+                await asyncio.shield(job.task)
+            except asyncio.CancelledError:
+                if not job.task.done():
+                    # The worker itself is shutting down
+                    job.task.cancel()
+                    raise
+                if not job.finished:
+                    # Cancelled before the task got to run
+                    self._stats["cancelled"] += 1
+                    job._finish("cancelled")
+            except Exception:
+                pass
+
+    async def _run(self, job: Job):
+        request_priority.set(job.priority)
+        request_user.set(job.user)
+        authenticated_user.set(job.authenticated_user)
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = await job._factory()
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            job._finish("cancelled")
+            raise
+        except HTTPException as e:
+            job.error, job.status_code = e.detail, e.status_code
+            self._stats["failed"] += 1
+            job._finish("failed")
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error, job.status_code = str(e), 500
+            self._stats["failed"] += 1
+            job._finish("failed")
+        else:
+            self._stats["completed"] += 1
+            job._finish("completed")
+
+    def stats(self) -> dict:
+        statuses = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "jobs": len(self._jobs),
+            "max_jobs": self.max_jobs,
+            "by_status": statuses,
+            **self._stats,
+        }
+
+
+job_queue = JobQueue()
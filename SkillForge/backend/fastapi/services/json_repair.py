@@ -0,0 +1,227 @@
+import os
+import re
+import json
+
+from pydantic import ValidationError
+
+from services.ollama_client import generate
+from services.tracing import span
+
+# Tolerant parsing of model output plus schema validation.
+# A response with a few bad fields is fixed by asking the model for just those fields
+# instead of throwing the whole generation away.
+JSON_REPAIR_MAX_REASKS = int(os.getenv("JSON_REPAIR_MAX_REASKS", "1"))
+
+_LITERALS = {"True": "true", "False": "false", "None": "null", "undefined": "null", "NaN": "null"}
+_DANGLING_KEY_RE = re.compile(r'([,{])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+stats = {"parsed": 0, "repaired": 0, "reasked": 0, "failed": 0}
+
+
+def extract_json(text: str) -> str:
+    """
+    Returns the first balanced {...} object in the text (ignoring code fences and chatter around it),
+    or everything from the first brace on if the object was cut off.
+    """
+    start = (text or "").find("{")
+    if start == -1:
+        raise ValueError("No JSON object in model output")
+    depth, quote, escape = 0, None, False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if quote:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+
+def repair_json(text: str) -> str:
+    """
+    Fixes the defects small models commonly produce: single-quoted strings, Python literals,
+    unquoted keys, trailing commas, and output truncated mid-object (open strings, dangling keys,
+    unclosed arrays/objects).
+    """
+    out, stack = [], []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch in "\"'":
+            # Re-emit every string double-quoted
+            quote, i = ch, i + 1
+            out.append('"')
+            while i < n and text[i] != quote:
+                if text[i] == "\\" and i + 1 < n:
+                    escaped = text[i + 1]
+                    out.append(escaped if escaped == "'" else "\\" + escaped)
+                    i += 2
+                    continue
+                out.append('\\"' if text[i] == '"' else ("\\n" if text[i] == "\n" else text[i]))
+                i += 1
+            out.append('"')
+            i += 1
+            continue
+        if ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+        elif ch.isalpha() or ch == "_":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            rest = text[j:].lstrip()
+            if rest.startswith(":") and stack and stack[-1] == "}":
+                out.append(f'"{word}"')
+            else:
+                out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    repaired = "".join(out).rstrip()
+    if stack:
+        # Truncated: drop a half-written trailing element, then close what is still open
+        repaired = repaired.rstrip(",").rstrip()
+        if stack[-1] == "}":
+            repaired = _DANGLING_KEY_RE.sub(lambda m: "{" if m.group(1) == "{" else "", repaired)
+        if repaired.endswith(":"):
+            repaired = repaired[:-1]
+        repaired = repaired.rstrip().rstrip(",") + "".join(reversed(stack))
+    return repaired
+
+
+def _strip_trailing_comma(out: list):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def parse_model_json(text: str):
+    """
+    Parses the JSON object in a model response, repairing it if plain json.loads fails.
+    Raises ValueError when nothing usable can be recovered.
+    """
+    with span("json.parse"):
+        candidate = extract_json(text)
+        try:
+            value = json.loads(candidate)
+            stats["parsed"] += 1
+            return value
+        except ValueError:
+            pass
+        try:
+            value = json.loads(repair_json(candidate))
+        except ValueError as e:
+            stats["failed"] += 1
+            raise ValueError(f"Could not repair JSON in model output: {e}")
+        stats["repaired"] += 1
+        return value
+
+
+def _drop_invalid_items(data: dict, errors: list) -> dict:
+    # Output cut off mid-list leaves a half-written last element; losing it beats regenerating the list
+    bad_items = {}
+    for err in errors:
+        loc = err["loc"]
+        if len(loc) >= 2 and isinstance(loc[1], int) and isinstance(data.get(loc[0]), list):
+            bad_items.setdefault(loc[0], set()).add(loc[1])
+    pruned = dict(data)
+    for field, indexes in bad_items.items():
+        kept = [item for i, item in enumerate(data[field]) if i not in indexes]
+        if kept:
+            pruned[field] = kept
+    return pruned
+
+
+def validate_fields(schema, data) -> tuple:
+    """
+    Validates data against a pydantic model, dropping invalid list elements when the rest of the list is usable.
+    Returns (validated dict, []) or (None, [top-level fields that are missing or invalid]).
+    """
+    if not isinstance(data, dict):
+        return None, list(schema.model_fields)
+    try:
+        return schema.model_validate(data).model_dump(), []
+    except ValidationError as e:
+        errors = e.errors()
+    try:
+        return schema.model_validate(_drop_invalid_items(data, errors)).model_dump(), []
+    except ValidationError as e:
+        return None, sorted({str(err["loc"][0]) for err in e.errors() if err["loc"]})
+
+
+def _fields_schema(schema, fields: list) -> dict:
+    full = schema.model_json_schema()
+    fragment = {
+        "type": "object",
+        "properties": {f: full["properties"][f] for f in fields if f in full.get("properties", {})},
+        "required": fields,
+    }
+    if "$defs" in full and "$ref" in json.dumps(fragment["properties"]):
+        fragment["$defs"] = full["$defs"]
+    return fragment
+
+
+async def _reask(payload: dict, data: dict, schema, fields: list) -> dict:
+    kept = {k: v for k, v in (data if isinstance(data, dict) else {}).items() if k not in fields}
+    prompt = f"""{payload["prompt"]}
+
+    Your previous answer was incomplete. These fields are already done and must not be repeated:
+    {json.dumps(kept)}
+
+    Return ONLY a JSON object with the missing or invalid fields {", ".join(fields)}, matching this JSON schema:
+    {json.dumps(_fields_schema(schema, fields))}
+    """
+    stats["reasked"] += 1
+    with span("json.reask"):
+        result = await generate({**payload, "prompt": prompt, "stream": False, "format": "json"})
+    fixes = parse_model_json(result.get("response", ""))
+    return {k: v for k, v in fixes.items() if k in fields} if isinstance(fixes, dict) else {}
+
+
+async def ensure_valid(payload: dict, data, schema) -> dict:
+    """
+    Validates parsed model output, re-asking the model only for the fields that failed.
+    Raises ValueError if they are still invalid after JSON_REPAIR_MAX_REASKS attempts.
+    """
+    valid, bad = validate_fields(schema, data)
+    for _ in range(JSON_REPAIR_MAX_REASKS):
+        if not bad:
+            break
+        fixes = await _reask(payload, data, schema, bad)
+        data = {**{k: v for k, v in (data if isinstance(data, dict) else {}).items() if k not in bad}, **fixes}
+        valid, bad = validate_fields(schema, data)
+    if bad:
+        raise ValueError(f"Model output has missing or invalid fields: {', '.join(bad)}")
+    return valid
+
+
+async def generate_json(payload: dict, schema) -> dict:
+    """
+    Runs a JSON-mode generation and returns it validated against schema.
+    """
+    result = await generate(payload)
+    try:
+        data = parse_model_json(result.get("response", ""))
+    except ValueError as e:
+        print(f"Unusable model output, asking again: {e}")
+        data = {}
+    return await ensure_valid(payload, data, schema)
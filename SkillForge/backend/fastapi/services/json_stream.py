@@ -0,0 +1,148 @@
+import json
+
+from services.ollama_client import generate_stream
+from services.json_repair import parse_model_json, validate_fields, ensure_valid
+
+
+class JSONStreamParser:
+    """
+    Incrementally parses a JSON object as model tokens arrive.
+
+    feed() returns the events completed by the new text:
+      {"type": "item", "key": <top-level key>, "value": <one finished array element>}
+      {"type": "field", "key": <top-level key>, "value": <finished non-array value>}
+    Text before the opening brace (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._key = None
+        self._value_start = None
+        self._item_start = None
+        self.finished = False
+
+    def _decode(self, start: int, end: int):
+        raw = self.text[start:end].strip()
+        if not raw:
+            return None, False
+        try:
+            return json.loads(raw), True
+        except ValueError:
+            return None, False
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        events = []
+        while self._pos < len(self.text) and not self.finished:
+            i = self._pos
+            ch = self.text[i]
+            self._pos += 1
+            depth = len(self._stack)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if depth == 1:
+                        self._last_string = self.text[self._string_start + 1:i]
+                continue
+
+            if depth == 0:
+                if ch == "{":
+                    self._stack.append("{")
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._stack.append(ch)
+                if depth == 1 and ch == "[":
+                    self._item_start = i + 1
+            elif ch in "}]":
+                if depth == 2 and ch == "]" and self._stack[1] == "[":
+                    self._emit_item(events, i)
+                    self._item_start = None
+                self._stack.pop()
+                if depth == 1:
+                    self._emit_field(events, i)
+                    self.finished = True
+            elif ch == ":" and depth == 1:
+                self._key = self._last_string
+                self._value_start = i + 1
+            elif ch == ",":
+                if depth == 1:
+                    self._emit_field(events, i)
+                elif depth == 2 and self._stack[1] == "[":
+                    self._emit_item(events, i)
+                    self._item_start = i + 1
+        return events
+
+    def _emit_item(self, events: list, end: int):
+        if self._item_start is None:
+            return
+        value, ok = self._decode(self._item_start, end)
+        if ok:
+            events.append({"type": "item", "key": self._key, "value": value})
+
+    def _emit_field(self, events: list, end: int):
+        if self._value_start is None:
+            return
+        value, ok = self._decode(self._value_start, end)
+        if ok and not isinstance(value, list):
+            events.append({"type": "field", "key": self._key, "value": value})
+        self._value_start = None
+
+
+def parse_complete(text: str):
+    """
+    Parses the full streamed text, repairing truncated or sloppy JSON.
+    """
+    return parse_model_json(text)
+
+
+def replay_events(result: dict):
+    """
+    Turns an already complete result (e.g. a cache hit) into the same events a live stream produces.
+    """
+    for key, value in result.items():
+        if isinstance(value, list):
+            for item in value:
+                yield {"type": "item", "key": key, "value": item}
+        else:
+            yield {"type": "field", "key": key, "value": value}
+
+
+async def stream_json_events(payload: dict, schema=None):
+    """
+    Streams a JSON-mode generation, yielding parser events as tokens arrive and
+    a final {"type": "done", "result": <parsed object>} event.
+    With a schema, fields that fail validation are re-requested and sent as
+    {"type": "field", "key": ..., "value": ..., "replace": true} events before "done".
+    """
+    parser = JSONStreamParser()
+    async for chunk in generate_stream(payload):
+        for event in parser.feed(chunk.get("response", "")):
+            yield event
+    try:
+        result = parse_complete(parser.text)
+    except ValueError:
+        if schema is None:
+            raise
+        result = {}
+    if schema is not None:
+        _, bad = validate_fields(schema, result)
+        result = await ensure_valid(payload, result, schema)
+        for key in bad:
+            # Replaces whatever was streamed for this key so far
+            yield {"type": "field", "key": key, "value": result[key], "replace": True}
+    yield {"type": "done", "result": result}
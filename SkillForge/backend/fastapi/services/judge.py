@@ -0,0 +1,138 @@
+import os
+import asyncio
+
+from services import code_runner
+from services.tracing import span
+
+# Judge a submission against many test cases: compile once, then run every case against the same build.
+JUDGE_MAX_CASES = int(os.getenv("JUDGE_MAX_CASES", "50"))
+JUDGE_PARALLEL_CASES = int(os.getenv("JUDGE_PARALLEL_CASES", "4"))
+JUDGE_OUTPUT_PREVIEW = 2000  # characters of stdout/stderr echoed back per case
+
+VERDICTS = {
+    "AC": "Accepted",
+    "WA": "Wrong Answer",
+    "TLE": "Time Limit Exceeded",
+    "RE": "Runtime Error",
+    "CE": "Compilation Error",
+}
+
+
+def _normalize_output(text: str) -> str:
+    # Ignore trailing spaces on each line and trailing blank lines, like most online judges
+    lines = [line.rstrip() for line in (text or "").replace("\r\n", "\n").split("\n")]
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
+
+
+def verdict_for(run: dict, expected: str) -> str:
+    if run.get("timed_out") or run.get("signal") == "SIGXCPU":
+        return "TLE"
+    if run.get("signal") or run.get("code"):
+        return "RE"
+    if _normalize_output(run.get("stdout", "")) != _normalize_output(expected):
+        return "WA"
+    return "AC"
+
+
+def _case_result(index: int, case: dict, run: dict) -> dict:
+    verdict = verdict_for(run, case.get("output", ""))
+    return {
+        "index": index,
+        "verdict": verdict,
+        "time": run.get("time"),
+        "cpu_time": run.get("cpu_time"),
+        "memory": run.get("memory"),
+        "stdout": (run.get("stdout") or "")[:JUDGE_OUTPUT_PREVIEW],
+        "stderr": (run.get("stderr") or "")[:JUDGE_OUTPUT_PREVIEW],
+        "expected": case.get("output", ""),
+    }
+
+
+def _summary(language: str, cases: list, results: list, compile_result=None) -> dict:
+    results = sorted(results, key=lambda r: r["index"])
+    failed = next((r for r in results if r["verdict"] != "AC"), None)
+    summary = {
+        "language": language,
+        "verdict": failed["verdict"] if failed else "AC",
+        "passed": sum(1 for r in results if r["verdict"] == "AC"),
+        "total": len(cases),
+        "cases": results,
+    }
+    summary["verdict_text"] = VERDICTS[summary["verdict"]]
+    if compile_result is not None:
+        summary["compile"] = compile_result
+    return summary
+
+
+def _compile_error(language: str, cases: list, compile_result: dict) -> dict:
+    summary = _summary(language, cases, [], compile_result)
+    summary["verdict"], summary["verdict_text"] = "CE", VERDICTS["CE"]
+    return summary
+
+
+async def _run_cases(run_one, cases: list, stop_on_failure: bool) -> list:
+    """
+    Runs run_one(index, case) for every case. With stop_on_failure the cases run in order and
+    stop at the first non-AC verdict; otherwise up to JUDGE_PARALLEL_CASES run at once.
+    """
+    if stop_on_failure:
+        results = []
+        for index, case in enumerate(cases):
+            result = await run_one(index, case)
+            results.append(result)
+            if result["verdict"] != "AC":
+                break
+        return results
+
+    slots = asyncio.Semaphore(JUDGE_PARALLEL_CASES)
+
+    async def limited(index, case):
+        async with slots:
+            return await run_one(index, case)
+
+    return await asyncio.gather(*(limited(i, c) for i, c in enumerate(cases)))
+
+
+async def judge(language: str, code: str, cases: list, stop_on_failure: bool = False, time_limit: float = None) -> dict:
+    """
+    Judges code against [{"input": ..., "output": ...}] test cases.
+    Returns an overall verdict (AC/WA/TLE/RE/CE) plus per-case verdicts with time (ms), cpu_time (ms) and memory (KB).
+    """
+    if len(cases) > JUDGE_MAX_CASES:
+        raise ValueError(f"At most {JUDGE_MAX_CASES} test cases can be judged at once.")
+    language = code_runner.normalize_language(language)
+    timeout = min(time_limit or code_runner.CODE_RUN_TIMEOUT, code_runner.CODE_RUN_TIMEOUT)
+    backend = code_runner.backend_for(language)
+
+    if backend is code_runner.piston_backend:
+        # Piston has no compile-once API; fall back to one execution per case
+        compile_errors = []
+
+        async def run_remote(index, case):
+            response = await backend.execute(language, code, case.get("input", ""))
+            compiled = response.get("compile") or {}
+            if compiled.get("code"):
+                compile_errors.append(compiled)
+            return _case_result(index, case, response.get("run", {}))
+
+        results = await _run_cases(run_remote, cases, stop_on_failure)
+        if compile_errors:
+            return _compile_error(language, cases, compile_errors[0])
+        return _summary(language, cases, results)
+
+    with span("code.compile"):
+        prepared = await backend.prepare(language, code)
+    try:
+        if not prepared.ok:
+            return _compile_error(language, cases, prepared.compile_result)
+
+        async def run_local(index, case):
+            run = await backend.run(prepared, case.get("input", ""), timeout)
+            return _case_result(index, case, run)
+
+        results = await _run_cases(run_local, cases, stop_on_failure)
+        return _summary(language, cases, results, prepared.compile_result)
+    finally:
+        backend.cleanup(prepared)
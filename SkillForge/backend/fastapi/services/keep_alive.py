@@ -0,0 +1,82 @@
+import os
+import re
+import time
+from collections import deque
+
+# How long Ollama keeps each model loaded after a request. Ollama resets a model's timer on every call
+# to the keep_alive that call sends, so each generation carries one picked from the model's recent
+# traffic: busy models stay resident longer, rarely used ones give their memory back sooner.
+OLLAMA_KEEP_ALIVE_BUSY = os.getenv("OLLAMA_KEEP_ALIVE_BUSY", "30m")
+OLLAMA_KEEP_ALIVE_IDLE = os.getenv("OLLAMA_KEEP_ALIVE_IDLE", "5m")  # Ollama's own default
+OLLAMA_KEEP_ALIVE_BUSY_REQUESTS = int(os.getenv("OLLAMA_KEEP_ALIVE_BUSY_REQUESTS", "10"))  # calls within the window
+OLLAMA_KEEP_ALIVE_WINDOW = float(os.getenv("OLLAMA_KEEP_ALIVE_WINDOW", "600"))  # seconds
+
+_DURATION_RE = re.compile(r"^(-?\d+(?:\.\d+)?)(ms|s|m|h)?$")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+
+def seconds(keep_alive) -> float:
+    """
+    A keep_alive value ("30m", "1h", 300, "-1") in seconds; negative means "never unload".
+    """
+    match = _DURATION_RE.match(str(keep_alive).strip())
+    if not match:
+        raise ValueError(f"Invalid keep_alive: {keep_alive!r}")
+    value = float(match.group(1)) * _UNITS[match.group(2)]
+    return float("inf") if value < 0 else value
+
+
+# A typo should fail at startup, not after the first generation
+seconds(OLLAMA_KEEP_ALIVE_BUSY), seconds(OLLAMA_KEEP_ALIVE_IDLE)
+
+
+class KeepAlive:
+    def __init__(self):
+        self._calls = {}  # model -> deque of call times within the window
+        self._loaded = {}  # (backend url, model) -> when Ollama will unload it
+
+    def _recent(self, model: str) -> deque:
+        calls = self._calls.setdefault(model, deque())
+        cutoff = time.monotonic() - OLLAMA_KEEP_ALIVE_WINDOW
+        while calls and calls[0] < cutoff:
+            calls.popleft()
+        return calls
+
+    def busy(self, model: str) -> bool:
+        return len(self._recent(model)) >= OLLAMA_KEEP_ALIVE_BUSY_REQUESTS
+
+    def current(self, model: str) -> str:
+        """
+        The keep_alive model's recent traffic earns, without counting a call.
+        """
+        return OLLAMA_KEEP_ALIVE_BUSY if self.busy(model) else OLLAMA_KEEP_ALIVE_IDLE
+
+    def for_model(self, model: str) -> str:
+        """
+        Counts a call to model and returns the keep_alive to send with it.
+        """
+        self._recent(model).append(time.monotonic())
+        return self.current(model)
+
+    def loaded(self, url: str, model: str, keep_alive):
+        # Called after Ollama answered, so the model is resident from now until keep_alive runs out
+        self._loaded[(url, model)] = time.monotonic() + seconds(keep_alive)
+
+    def unloaded(self, url: str, model: str):
+        self._loaded.pop((url, model), None)
+
+    def remaining(self, url: str, model: str) -> float:
+        """
+        Seconds until model unloads from the backend at url (0 when it is not known to be loaded).
+        """
+        return max(self._loaded.get((url, model), 0.0) - time.monotonic(), 0.0)
+
+    def stats(self) -> dict:
+        models = {
+            model: {"recent_calls": len(self._recent(model)), "keep_alive": self.current(model)}
+            for model in list(self._calls)
+        }
+        return {"busy": OLLAMA_KEEP_ALIVE_BUSY, "idle": OLLAMA_KEEP_ALIVE_IDLE, "models": models}
+
+
+keep_alive = KeepAlive()
@@ -0,0 +1,234 @@
+import os
+import re
+import math
+import hashlib
+from collections import Counter
+
+# Local resume vs job-description matcher, BM25-weighted.
+# Runs in milliseconds, so it can score every resume before (or instead of) an LLM call.
+# Each job-description keyword is a BM25 query term. A resume's credit for it saturates with repeats and is
+# normalized by resume length, so stuffing a keyword or padding the resume does not buy score.
+# Scores depend only on their inputs: IDF (a skill every candidate lists says little) is applied only when the
+# caller passes a corpus, such as the other resumes of a screening batch.
+
+SKILL_VOCABULARY = {
+    # languages
+    "python", "java", "javascript", "typescript", "c", "c++", "c#", "go", "golang", "rust", "ruby", "php",
+    "kotlin", "swift", "scala", "matlab", "sql", "bash", "shell", "perl", "dart", "haskell", "elixir",
+    # web / frontend
+    "html", "css", "sass", "react", "react native", "next.js", "vue", "angular", "svelte", "redux", "tailwind",
+    "bootstrap", "jquery", "webpack", "vite", "node.js", "express", "graphql", "rest", "rest api", "websocket",
+    # backend / frameworks
+    "django", "flask", "fastapi", "spring", "spring boot", "rails", "laravel", ".net", "asp.net", "microservices",
+    # data / ml
+    "machine learning", "deep learning", "nlp", "computer vision", "pytorch", "tensorflow", "keras",
+    "scikit-learn", "pandas", "numpy", "spark", "hadoop", "airflow", "kafka", "etl", "data analysis",
+    "data engineering", "statistics", "llm", "mlops", "tableau", "power bi", "excel",
+    # databases
+    "postgresql", "postgres", "mysql", "mongodb", "redis", "elasticsearch", "sqlite", "dynamodb", "cassandra",
+    "oracle", "supabase", "firebase",
+    # cloud / devops
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ansible", "jenkins", "ci/cd", "github actions",
+    "linux", "git", "nginx", "serverless", "lambda", "prometheus", "grafana",
+    # practices
+    "agile", "scrum", "tdd", "unit testing", "system design", "data structures", "algorithms", "oop",
+    "distributed systems", "security", "jira", "figma",
+}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "its", "of",
+    "on", "or", "that", "the", "this", "to", "was", "were", "will", "with", "you", "your", "we", "our", "us", "they",
+    "their", "them", "who", "what", "which", "when", "where", "how", "can", "able", "should", "must", "may",
+    "also", "etc", "such", "into", "about", "over", "more", "most", "other", "any", "all", "not", "but", "than",
+    "per", "via", "using", "use", "used", "including", "include", "includes",
+    # words every job description uses
+    "experience", "experienced", "years", "year", "team", "teams", "work", "working", "strong", "ability",
+    "skills", "skill", "knowledge", "understanding", "requirements", "required", "responsibilities",
+    "preferred", "plus", "role", "candidate", "candidates", "job", "company", "position", "looking", "join",
+    "help", "build", "building", "develop", "developing", "good", "excellent", "great", "new", "well",
+    "across", "within", "based", "related", "relevant", "familiarity", "proficiency", "proficient", "opportunity",
+    "bonus", "nice", "have", "high", "highly", "level", "environment", "degree", "equivalent", "field",
+    "set", "make", "ensure", "deliver", "drive", "write", "maintain", "manage", "support", "create", "implement",
+    "deploy", "design", "collaborate", "own", "lead",
+}
+
+RESUME_SECTIONS = ("experience", "education", "skills", "projects", "summary", "certification")
+
+# Skills the job description names count more than other salient words it repeats
+SKILL_WEIGHT = 3.0
+MAX_TERM_WEIGHT = 3.0
+MAX_SALIENT_TERMS = 25
+MAX_MISSING_KEYWORDS = 15
+
+# BM25 parameters; a single mention in an average-length resume earns a keyword's full weight
+KEYWORD_BM25_K1 = float(os.getenv("KEYWORD_BM25_K1", "1.2"))
+KEYWORD_BM25_B = float(os.getenv("KEYWORD_BM25_B", "0.75"))
+KEYWORD_BM25_AVG_TOKENS = float(os.getenv("KEYWORD_BM25_AVG_TOKENS", "500"))  # unless a corpus supplies its own average
+# A corpus smaller than this gives every keyword IDF 1
+KEYWORD_IDF_MIN_DOCS = int(os.getenv("KEYWORD_IDF_MIN_DOCS", "5"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9.#+/]*[a-z0-9#+]")
+_MULTIWORD_SKILLS = sorted((s for s in SKILL_VOCABULARY if " " in s), key=len, reverse=True)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").lower())
+
+
+def tokenize(text: str) -> list:
+    tokens = []
+    for token in _TOKEN_RE.findall(_normalize(text)):
+        token = token.lstrip("./")
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def _stem(token: str) -> str:
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _phrase_count(phrase: str, text: str) -> int:
+    return len(re.findall(r"(?<![a-z0-9])" + re.escape(phrase) + r"(?![a-z0-9])", text))
+
+
+def extract_skills(text: str) -> list:
+    """
+    Known skills mentioned in the text, most frequent first.
+    """
+    normalized = _normalize(text)
+    counts = Counter(t for t in tokenize(text) if t in SKILL_VOCABULARY)
+    for phrase in _MULTIWORD_SKILLS:
+        hits = _phrase_count(phrase, normalized)
+        if hits:
+            counts[phrase] += hits
+    return [skill for skill, _ in counts.most_common()]
+
+
+def job_keywords(job_description: str) -> dict:
+    """
+    Weighted keywords for a job description: every known skill it names plus its most repeated salient terms.
+    """
+    weights = {}
+    tokens = tokenize(job_description)
+    tf = Counter(tokens)
+    normalized = _normalize(job_description)
+
+    for skill in extract_skills(job_description):
+        hits = tf[skill] or len(re.findall(re.escape(skill), normalized))
+        weights[skill] = SKILL_WEIGHT * (1 + 0.5 * min(hits - 1, 2))
+
+    covered = set()
+    for skill in weights:
+        covered.update(skill.split())
+    salient = Counter(
+        _stem(t) for t in tokens
+        if len(t) > 2 and t not in STOPWORDS and not t.isdigit() and t not in covered
+    )
+    for term, count in salient.most_common(MAX_SALIENT_TERMS):
+        weights.setdefault(term, min(float(count), MAX_TERM_WEIGHT))
+    return weights
+
+
+def _resume_terms(text: str) -> tuple:
+    """
+    (term counts, token count) for a resume: tokens, their stems and the multi-word skills it mentions.
+    """
+    tokens = tokenize(text)
+    counts = Counter(tokens)
+    for stem, count in Counter(_stem(t) for t in tokens).items():
+        counts[stem] = max(counts[stem], count)
+    normalized = _normalize(text)
+    for phrase in _MULTIWORD_SKILLS:
+        hits = _phrase_count(phrase, normalized)
+        if hits:
+            counts[phrase] = hits
+    return counts, len(tokens)
+
+
+class ResumeCorpus:
+    """
+    Document frequencies over a fixed set of resumes, e.g. one screening batch, for BM25's IDF.
+    Built once and only read while scoring, so every resume scored against it sees the same IDF.
+    """
+    def __init__(self, texts, min_docs: int = KEYWORD_IDF_MIN_DOCS):
+        self.min_docs = min_docs
+        self._df = Counter()
+        self._tokens = 0
+        digests = []
+        for text in dict.fromkeys(texts):  # an upload repeated in the batch counts once
+            counts, length = _resume_terms(text)
+            self._df.update(counts.keys())
+            self._tokens += length
+            digests.append(hashlib.sha256(text.encode()).hexdigest())
+        self.documents = len(digests)
+        self.digest = hashlib.sha256("".join(sorted(digests)).encode()).hexdigest()
+
+    def __str__(self):
+        # The LLM cache keys on str() of arguments: the same set of resumes gives the same key
+        return f"ResumeCorpus({self.digest})"
+
+    def idf(self, term: str) -> float:
+        if self.documents < self.min_docs:
+            return 1.0
+        # BM25's IDF plus 1, so a skill every resume lists still counts, just less than a rare one
+        df = self._df[term]
+        return 1 + math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+
+    def avg_length(self) -> float:
+        return self._tokens / self.documents if self.documents >= self.min_docs else KEYWORD_BM25_AVG_TOKENS
+
+
+def _credit(tf: int, length: int, avg_length: float) -> float:
+    # BM25's saturating term frequency, scaled so one mention at average length is 1, and capped there
+    norm = 1 - KEYWORD_BM25_B + KEYWORD_BM25_B * length / max(avg_length, 1.0)
+    return min(tf * (KEYWORD_BM25_K1 + 1) / (tf + KEYWORD_BM25_K1 * norm), 1.0)
+
+
+def match_resume(resume_text: str, job_description: str, corpus: ResumeCorpus = None) -> dict:
+    """
+    Scores a resume against a job description without the LLM, with IDF from corpus if one is given.
+    Returns ats_score (0-100), matched_keywords, missing_keywords (heaviest first) and the resume's detected skills.
+    """
+    resume_norm = _normalize(resume_text)
+    counts, length = _resume_terms(resume_text)
+    resume_skills = extract_skills(resume_text)
+
+    if not (job_description or "").strip():
+        # No job description: score completeness (standard sections, breadth of skills) instead of fit
+        sections = sum(1 for s in RESUME_SECTIONS if s in resume_norm)
+        score = 50 * sections / len(RESUME_SECTIONS) + 50 * min(len(resume_skills), 15) / 15
+        return {
+            "ats_score": round(score),
+            "matched_keywords": [],
+            "missing_keywords": [],
+            "resume_skills": resume_skills,
+        }
+
+    weights = job_keywords(job_description)
+    avg_length = KEYWORD_BM25_AVG_TOKENS
+    if corpus is not None:
+        weights = {k: w * corpus.idf(k) for k, w in weights.items()}
+        avg_length = corpus.avg_length()
+    matched, missing, earned = [], [], 0.0
+    for keyword, weight in sorted(weights.items(), key=lambda kv: -kv[1]):
+        if " " in keyword or not keyword.isalnum():
+            tf = counts[keyword] or _phrase_count(keyword, resume_norm)
+        else:
+            tf = counts[keyword]
+        if tf:
+            matched.append(keyword)
+            earned += weight * _credit(tf, length, avg_length)
+        else:
+            missing.append(keyword)
+
+    total = sum(weights.values())
+    score = 100 * earned / total if total else 0
+    return {
+        "ats_score": round(score),
+        "matched_keywords": matched,
+        "missing_keywords": missing[:MAX_MISSING_KEYWORDS],
+        "resume_skills": resume_skills,
+    }
@@ -1,14 +1,97 @@
-import requests
+import os
 import json
+import asyncio
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
-DEFAULT_MODEL = "llama3.2"
+from services.model_router import model_for
+from services.llm_cache import cached, Fallback
+from services.scheduler import SchedulerRejected
+from services.json_repair import generate_json
+from services.llm_schemas import (
+    LinkedInProfile, LinkedInHeadline, LinkedInAbout, LinkedInExperienceEntry,
+    LinkedInProjects, LinkedInSkills, LinkedInRecommendation,
+)
+from services.json_stream import stream_json_events, replay_events
+from services.tracing import traced
 
-def generate_linkedin_profile(data: dict, model: str = DEFAULT_MODEL) -> dict:
-    """
-    Generates a professional LinkedIn profile based on user input.
-    Returns structured JSON with sections: Headline, About, Experience, etc.
-    """
+DEFAULT_MODEL = model_for("linkedin")  # override with MODEL_LINKEDIN
+
+# "single" asks for the whole profile in one generation; "sections" runs one small generation per
+# section (and per experience entry) concurrently, so latency is the slowest section rather than the
+# sum of all of them and a bad section no longer costs the whole profile.
+LINKEDIN_MODES = ("single", "sections")
+LINKEDIN_MODE = os.getenv("LINKEDIN_MODE", "single")
+# Section calls one profile runs at once; stays under SCHEDULER_MAX_QUEUED_PER_USER so a profile with
+# many experience entries does not trip the per-user queue limit by itself
+LINKEDIN_SECTION_CONCURRENCY = int(os.getenv("LINKEDIN_SECTION_CONCURRENCY", "4"))
+
+FIELD_LABELS = {
+    "fullName": "FULL NAME",
+    "targetRole": "TARGET ROLE",
+    "currentSummary": "SUMMARY OF EXPERIENCE",
+    "skills": "SKILLS",
+    "projects": "PROJECTS",
+    "experience": "EXPERIENCE HISTORY",
+    "education": "EDUCATION",
+    "certifications": "CERTIFICATIONS",
+    "strengths": "STRENGTHS",
+    "softSkills": "SOFT SKILLS",
+    "careerGoal": "CAREER GOAL",
+    "achievements": "ACHIEVEMENTS",
+    "tools": "TOOLS",
+    "languages": "LANGUAGES",
+    "location": "LOCATION",
+}
+
+# section -> (user fields it is written from, what to write, JSON shape, schema, value if generation fails).
+# Each section only sees the fields it needs, which keeps its prompt short and its cache entry valid
+# when unrelated fields change.
+SECTIONS = {
+    "headline": (
+        ("targetRole", "currentSummary", "skills", "achievements", "careerGoal", "location"),
+        "a catchy, keyword-rich LinkedIn headline (under 220 characters)",
+        '{"headline": "<headline>"}',
+        LinkedInHeadline,
+        "Error Generating Headline",
+    ),
+    "about": (
+        ("fullName", "targetRole", "currentSummary", "skills", "experience", "education", "certifications",
+         "strengths", "softSkills", "careerGoal", "achievements", "location"),
+        "a compelling LinkedIn 'About' section of 3-4 paragraphs",
+        '{"about": "<about section>"}',
+        LinkedInAbout,
+        "Please try again.",
+    ),
+    "experience_descriptions": (
+        ("targetRole", "skills", "tools"),
+        "the description for the one position below: bullet points of responsibilities and achievements (STAR method)",
+        '{"description": "<bullet points>"}',
+        LinkedInExperienceEntry,
+        "",
+    ),
+    "projects_section": (
+        ("targetRole", "projects", "skills", "tools"),
+        "formatted text for the LinkedIn Projects section",
+        '{"projects_section": "<projects section>"}',
+        LinkedInProjects,
+        "",
+    ),
+    "skills_section": (
+        ("targetRole", "skills", "tools", "softSkills", "languages", "certifications"),
+        "a formatted list of Top Skills for LinkedIn",
+        '{"skills_section": "<skills section>"}',
+        LinkedInSkills,
+        "",
+    ),
+    "recommendation_draft": (
+        ("fullName", "targetRole", "experience", "strengths", "softSkills", "achievements"),
+        "a draft recommendation they could ask a colleague to write for them",
+        '{"recommendation_draft": "<recommendation>"}',
+        LinkedInRecommendation,
+        "",
+    ),
+}
+
+def _linkedin_payload(data: dict, model: str) -> dict:
     prompt = f"""
     You are a Professional Career Coach and LinkedIn Expert.
     Create a high-impact LinkedIn profile based on the following user details:
@@ -46,27 +129,220 @@ def generate_linkedin_profile(data: dict, model: str = DEFAULT_MODEL) -> dict:
         "recommendation_draft": "<A draft recommendation text that they could ask a colleague to write>"
     }}
     """
-    
-    payload = {
+
+    return {
         "model": model,
         "prompt": prompt,
         "stream": False,
         "format": "json"
     }
-    
+
+def _fallback_profile() -> dict:
+    return Fallback({
+        "headline": "Error Generating Profile",
+        "about": "Please try again.",
+        "experience_descriptions": [],
+        "projects_section": "",
+        "skills_section": "",
+        "recommendation_draft": ""
+    })
+
+@cached("linkedin")
+@traced("linkedin")
+async def generate_linkedin_profile(data: dict, model: str = DEFAULT_MODEL) -> dict:
+    """
+    Generates a professional LinkedIn profile based on user input.
+    Returns structured JSON with sections: Headline, About, Experience, etc.
+    """
+    payload = _linkedin_payload(data, model)
+
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        ai_output = result.get("response", "{}")
-        return json.loads(ai_output)
+        return await generate_json(payload, LinkedInProfile)
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Error generating LinkedIn profile: {e}")
-        return {
-            "headline": "Error Generating Profile",
-            "about": "Please try again.",
-            "experience_descriptions": [],
-            "projects_section": "",
-            "skills_section": "",
-            "recommendation_draft": ""
-        }
+        return _fallback_profile()
+
+@traced("linkedin.stream")
+async def stream_linkedin_profile(data: dict, model: str = DEFAULT_MODEL, bypass_cache: bool = False):
+    """
+    Streaming variant of generate_linkedin_profile.
+    Yields each section as a "field" event (and each experience entry as an "item" event) as soon as it completes,
+    then {"type": "done", "result": <full profile>}.
+    """
+    if not bypass_cache:
+        hit = await generate_linkedin_profile.cache_get(data, model)
+        if hit is not None:
+            for event in replay_events(hit):
+                yield event
+            yield {"type": "done", "result": hit}
+            return
+
+    try:
+        async for event in stream_json_events(_linkedin_payload(data, model), LinkedInProfile):
+            if event["type"] == "done":
+                await generate_linkedin_profile.cache_set(event["result"], data, model)
+            yield event
+    except Exception as e:
+        print(f"Error streaming LinkedIn profile: {e}")
+        yield {"type": "error", "detail": str(e)}
+        yield {"type": "done", "result": _fallback_profile()}
+
+# --- section mode ---
+
+def _section_context(section: str, data: dict, index: int = None) -> dict:
+    """
+    The inputs one section is generated from; also its cache key.
+    """
+    context = {field: data.get(field) for field in SECTIONS[section][0]}
+    context["tone"] = data.get("tone", "Professional")
+    if index is not None:
+        context["position"] = data.get("experience", [])[index]
+    return context
+
+def _section_payload(section: str, context: dict, model: str) -> dict:
+    _, task, shape, _, _ = SECTIONS[section]
+    details = "\n".join(
+        f"    {FIELD_LABELS[field]}: {value if isinstance(value, str) else json.dumps(value)}"
+        for field, value in context.items() if field in FIELD_LABELS and value
+    )
+    if "position" in context:
+        details += f"\n    POSITION TO DESCRIBE: {json.dumps(context['position'])}"
+    prompt = f"""
+    You are a Professional Career Coach and LinkedIn Expert.
+    Write {task} for this user, in a {context['tone']} tone:
+
+{details}
+
+    Generate the output in the following JSON format ONLY:
+    {shape}
+    """
+
+    return {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+        "format": "json"
+    }
+
+@cached("linkedin_section")
+@traced("linkedin.section")
+async def generate_linkedin_section(section: str, context: dict, model: str = DEFAULT_MODEL) -> dict:
+    """
+    Generates one profile section from its context. Returns the section's schema as a dict,
+    e.g. {"headline": ...}, or {"description": ...} for an experience entry.
+    """
+    _, _, _, schema, fallback = SECTIONS[section]
+    try:
+        return await generate_json(_section_payload(section, context, model), schema)
+    except SchedulerRejected:
+        raise
+    except Exception as e:
+        print(f"Error generating LinkedIn {section}: {e}")
+        return Fallback({next(iter(schema.model_fields)): fallback})
+
+def _experience_entry(data: dict, index: int, result: dict) -> dict:
+    position = data.get("experience", [])[index]
+    position = position if isinstance(position, dict) else {}
+    return {"company": position.get("company", ""), "role": position.get("role", ""), "description": result["description"]}
+
+def _section_value(data: dict, section: str, index, result: dict):
+    if section == "experience_descriptions":
+        return _experience_entry(data, index, result)
+    return result[section]
+
+def _section_contexts(data: dict) -> list:
+    """
+    (section, index, context) for every section of the profile; index is set for experience entries.
+    """
+    parts = []
+    for section in SECTIONS:
+        if section == "experience_descriptions":
+            parts += [(section, i, _section_context(section, data, i)) for i in range(len(data.get("experience", [])))]
+        else:
+            parts.append((section, None, _section_context(section, data)))
+    return parts
+
+async def _generate_sections(data: dict, model: str, bypass_cache: bool):
+    """
+    Generates every section concurrently, yielding (section, index, result) in completion order.
+    """
+    semaphore = asyncio.Semaphore(LINKEDIN_SECTION_CONCURRENCY)
+
+    async def run(section, index, context):
+        async with semaphore:
+            return section, index, await generate_linkedin_section(section, context, model, bypass_cache=bypass_cache)
+
+    tasks = [asyncio.create_task(run(*part)) for part in _section_contexts(data)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def _merge_sections(data: dict, parts: list) -> dict:
+    """
+    Builds the single-mode response shape from (section, index, result) parts. The profile is a
+    Fallback if any section is.
+    """
+    profile = {section: "" for section in SECTIONS}
+    entries = {}
+    for section, index, result in parts:
+        if section == "experience_descriptions":
+            entries[index] = _section_value(data, section, index, result)
+        else:
+            profile[section] = _section_value(data, section, index, result)
+    profile["experience_descriptions"] = [entries[i] for i in sorted(entries)]
+    if any(isinstance(result, Fallback) for _, _, result in parts):
+        return Fallback(profile)
+    return profile
+
+@traced("linkedin.sections")
+async def generate_linkedin_sections(data: dict, model: str = DEFAULT_MODEL, bypass_cache: bool = False) -> dict:
+    """
+    Section mode of generate_linkedin_profile: every section is generated (and cached) on its own,
+    concurrently, and merged into the same response shape.
+    """
+    return _merge_sections(data, [part async for part in _generate_sections(data, model, bypass_cache)])
+
+@traced("linkedin.sections.stream")
+async def stream_linkedin_sections(data: dict, model: str = DEFAULT_MODEL, bypass_cache: bool = False):
+    """
+    Streaming variant of generate_linkedin_sections. Sections are sent as they finish, in whatever
+    order that is: a "field" event per section and an "item" event (with its "index") per experience
+    entry, then {"type": "done", "result": <full profile>}.
+    """
+    parts = []
+    try:
+        async for section, index, result in _generate_sections(data, model, bypass_cache):
+            parts.append((section, index, result))
+            value = _section_value(data, section, index, result)
+            if section == "experience_descriptions":
+                yield {"type": "item", "key": section, "index": index, "value": value}
+            else:
+                yield {"type": "field", "key": section, "value": value}
+    except SchedulerRejected as e:
+        yield {"type": "error", "detail": e.detail}
+        yield {"type": "done", "result": _fallback_profile()}
+        return
+    yield {"type": "done", "result": _merge_sections(data, parts)}
+
+async def regenerate_linkedin_section(section: str, data: dict, index: int = None, model: str = DEFAULT_MODEL) -> dict:
+    """
+    Generates a fresh version of one section (index picks the experience entry) and returns
+    {"section", "index", "value"}. The new version replaces the cached one, so a later section-mode
+    generation of the same profile includes it.
+    Raises ValueError for an unknown section or index.
+    """
+    if section not in SECTIONS:
+        raise ValueError(f"section must be one of {', '.join(SECTIONS)}")
+    if section == "experience_descriptions":
+        if index is None or not 0 <= index < len(data.get("experience", [])):
+            raise ValueError("index must point at an entry of experience")
+    else:
+        index = None
+    context = _section_context(section, data, index)
+    result = await generate_linkedin_section(section, context, model, bypass_cache=True)
+    return {"section": section, "index": index, "value": _section_value(data, section, index, result)}
@@ -0,0 +1,245 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+
+from services.semantic_cache import semantic_cache
+
+# Response cache for LLM generations.
+# Tier 1 is an in-process LRU; tier 2 is an optional SQLite file shared by workers.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")  # e.g. "llm_cache.sqlite3"; empty disables the disk tier
+
+# Seconds a cached generation stays valid, per service. Override with LLM_CACHE_TTL_<SERVICE>.
+DEFAULT_TTLS = {
+    "analyze": 6 * 3600,
+    "roadmap": 24 * 3600,
+    "portfolio": 6 * 3600,
+    "linkedin": 6 * 3600,
+    "linkedin_section": 6 * 3600,
+}
+
+
+class Fallback(dict):
+    """
+    Marks a hard-coded fallback response so it is never cached.
+    """
+
+
+def ttl_for(service: str) -> float:
+    return float(os.getenv(f"LLM_CACHE_TTL_{service.upper()}", DEFAULT_TTLS.get(service, 3600)))
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(service: str, inputs: dict) -> str:
+    """
+    Content address for a generation: SHA-256 of the service name and its normalized inputs
+    (which include the model name).
+    """
+    blob = json.dumps({"service": service, "inputs": _normalize(inputs)}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, db_path: str = LLM_CACHE_DB):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._memory = OrderedDict()  # key -> (expires_at, json string)
+        self._stats = {}
+        self._db = None
+        # One connection serves every to_thread worker; sqlite3 objects must not be used concurrently
+        self._lock = threading.Lock()
+
+    # --- disk tier ---
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, service TEXT, expires_at REAL, value TEXT)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str):
+        with self._lock:
+            row = self._conn().execute("SELECT expires_at, value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row and row[0] > time.time():
+            return row
+        return None
+
+    def _disk_set(self, key: str, service: str, expires_at: float, value: str):
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, service, expires_at, value) VALUES (?, ?, ?, ?)",
+                (key, service, expires_at, value),
+            )
+            db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            db.commit()
+
+    # --- public API ---
+
+    def _count(self, service: str, field: str):
+        counters = self._stats.setdefault(service, {"hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0})
+        counters[field] += 1
+
+    async def get(self, service: str, key: str):
+        entry = self._memory.get(key)
+        if entry:
+            if entry[0] > time.time():
+                self._memory.move_to_end(key)
+                self._count(service, "hits")
+                return json.loads(entry[1])
+            del self._memory[key]
+
+        if self.db_path:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row:
+                self._remember(key, row[0], row[1])
+                self._count(service, "disk_hits")
+                return json.loads(row[1])
+
+        self._count(service, "misses")
+        return None
+
+    async def set(self, service: str, key: str, value, ttl: float):
+        expires_at = time.time() + ttl
+        blob = json.dumps(value)
+        self._remember(key, expires_at, blob)
+        if self.db_path:
+            await asyncio.to_thread(self._disk_set, key, service, expires_at, blob)
+
+    def _remember(self, key: str, expires_at: float, blob: str):
+        self._memory[key] = (expires_at, blob)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        self._memory.clear()
+        semantic_cache.clear()
+        if self.db_path:
+            with self._lock:
+                db = self._conn()
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+
+    def stats(self) -> dict:
+        services = {}
+        for service, counters in self._stats.items():
+            lookups = counters["hits"] + counters["disk_hits"] + counters["misses"]
+            services[service] = {
+                **counters,
+                "hit_rate": round((counters["hits"] + counters["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "disk_tier": bool(self.db_path),
+            "services": services,
+        }
+
+
+cache = LLMCache()
+
+
+def cached(service: str, similar: tuple = (), similar_scope=None):
+    """
+    Caches an async generator function on its bound arguments.
+    Callers can pass bypass_cache=True to force a fresh generation (the result still refreshes the cache).
+    Results wrapped in Fallback are returned but never stored.
+
+    similar names free-text arguments that only need to be near-identical: on an exact miss, a result
+    stored for similar enough values (and identical other arguments) is reused, see semantic_cache.
+    similar_scope() returns an extra value near matches must share, e.g. the user id for personal data.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def bind(*args, **kwargs) -> dict:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return dict(bound.arguments)
+
+        def cache_key(*args, **kwargs) -> str:
+            return make_key(service, bind(*args, **kwargs))
+
+        def semantic_parts(*args, **kwargs) -> tuple:
+            arguments = bind(*args, **kwargs)
+            exact = {k: v for k, v in arguments.items() if k not in similar}
+            if similar_scope:
+                exact["_scope"] = similar_scope()
+            return make_key(service, exact), {k: arguments[k] for k in similar}
+
+        async def similar_get(*args, **kwargs):
+            if not similar:
+                return None
+            hit = semantic_cache.lookup(service, *semantic_parts(*args, **kwargs))
+            if hit is not None:
+                # Identical requests after this one hit the exact tier
+                await cache.set(service, cache_key(*args, **kwargs), hit, ttl_for(service))
+            return hit
+
+        async def store(result, *args, **kwargs):
+            ttl = ttl_for(service)
+            await cache.set(service, cache_key(*args, **kwargs), result, ttl)
+            if similar:
+                semantic_cache.store(service, *semantic_parts(*args, **kwargs), result, ttl)
+
+        @functools.wraps(func)
+        async def wrapper(*args, bypass_cache: bool = False, **kwargs):
+            if not LLM_CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            if bypass_cache:
+                cache._count(service, "bypassed")
+            else:
+                hit = await cache.get(service, cache_key(*args, **kwargs))
+                if hit is None:
+                    hit = await similar_get(*args, **kwargs)
+                if hit is not None:
+                    return hit
+
+            result = await func(*args, **kwargs)
+            if not isinstance(result, Fallback):
+                await store(result, *args, **kwargs)
+            return result
+
+        # Let streaming variants of the same generation share its cache entries
+        async def cache_get(*args, **kwargs):
+            if not LLM_CACHE_ENABLED:
+                return None
+            hit = await cache.get(service, cache_key(*args, **kwargs))
+            if hit is None:
+                hit = await similar_get(*args, **kwargs)
+            return hit
+
+        async def cache_set(result, *args, **kwargs):
+            if LLM_CACHE_ENABLED and not isinstance(result, Fallback):
+                await store(result, *args, **kwargs)
+
+        wrapper.cache_key = cache_key
+        wrapper.cache_get = cache_get
+        wrapper.cache_set = cache_set
+        return wrapper
+
+    return decorator
@@ -0,0 +1,108 @@
+from typing import Annotated, Any, Dict, List, Union
+
+from pydantic import BaseModel, Field
+
+# Shapes the frontend relies on for each JSON-mode generation.
+# Anything that fails validation is re-requested from the model field by field (see json_repair).
+
+Text = Annotated[str, Field(min_length=1)]
+
+
+class ResumeAnalysis(BaseModel):
+    ats_score: float = Field(ge=0, le=100)
+    summary: Text
+    missing_keywords: List[str] = []
+    feedback: Text
+
+
+class AnalysisNarrative(BaseModel):
+    summary: Text
+    feedback: Text
+
+
+class RoadmapStep(BaseModel):
+    step_number: int
+    title: Text
+    description: Text
+    resources: List[str] = []
+    estimated_time: str = ""
+
+
+class Roadmap(BaseModel):
+    roadmap: List[RoadmapStep] = Field(min_length=1)
+
+
+class PortfolioProject(BaseModel):
+    title: Text
+    description: str = ""
+    tech_stack: List[str] = []
+
+
+class Portfolio(BaseModel):
+    name: Text
+    tagline: Text
+    about: Text
+    skills: List[str]
+    projects: List[PortfolioProject] = []
+    contact: Dict[str, Any] = {}
+
+
+class DSAExample(BaseModel):
+    input: Any
+    output: Any
+    explanation: Any = ""
+
+
+class DSAQuestion(BaseModel):
+    title: Text
+    description: Text
+    examples: List[DSAExample] = []
+    constraints: List[Any] = []
+    starter_code: str = ""
+
+
+class BattleQuestion(BaseModel):
+    question: Text
+    options: List[Text] = Field(min_length=4, max_length=4)
+    correct_index: int = Field(ge=0, le=3)
+    difficulty: str = "Medium"
+
+
+class ExperienceDescription(BaseModel):
+    company: str = ""
+    role: str = ""
+    description: Union[str, List[str]] = ""
+
+
+class LinkedInProfile(BaseModel):
+    headline: Text
+    about: Text
+    experience_descriptions: List[ExperienceDescription] = []
+    projects_section: Union[str, List[Any]] = ""
+    skills_section: Union[str, List[Any]] = ""
+    recommendation_draft: str = ""
+
+
+# One per section for section-parallel LinkedIn generation (linkedin_service, mode="sections")
+class LinkedInHeadline(BaseModel):
+    headline: Text
+
+
+class LinkedInAbout(BaseModel):
+    about: Text
+
+
+class LinkedInExperienceEntry(BaseModel):
+    description: Union[Text, List[str]]
+
+
+class LinkedInProjects(BaseModel):
+    projects_section: Union[Text, List[Any]]
+
+
+class LinkedInSkills(BaseModel):
+    skills_section: Union[Text, List[Any]]
+
+
+class LinkedInRecommendation(BaseModel):
+    recommendation_draft: Text
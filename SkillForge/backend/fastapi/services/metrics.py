@@ -0,0 +1,178 @@
+import os
+import time
+import asyncio
+import threading
+
+# Minimal Prometheus metrics (text exposition format 0.0.4) without extra dependencies.
+# Counters and histograms live in REGISTRY; collectors add values computed at scrape time
+# (queue depth, cache sizes) from the stats the services already keep.
+
+# Seconds between event-loop lag samples; 0 disables the watcher
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+THROUGHPUT_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250)
+
+REGISTRY = []
+_collectors = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(round(series[-2], 6))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+def register_collector(collect):
+    """
+    collect() returns [(name, type, help, [(labels dict, value), ...])] and is called on every scrape.
+    """
+    _collectors.append(collect)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+            continue
+        for name, kind, help, samples in families:
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- metrics shared across services ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "skillforge_http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status")
+)
+STAGE_SECONDS = Histogram(
+    "skillforge_stage_duration_seconds", "Time spent in each pipeline stage.", ("stage", "outcome")
+)
+GENERATIONS = Counter(
+    "skillforge_generations_total", "LLM-backed service calls by outcome (ok, fallback, error).", ("service", "outcome")
+)
+OLLAMA_REQUEST_SECONDS = Histogram(
+    "skillforge_ollama_request_duration_seconds", "Wall time of Ollama calls, excluding queueing.", ("model", "backend")
+)
+OLLAMA_QUEUE_SECONDS = Histogram(
+    "skillforge_ollama_queue_seconds", "Time calls waited for a scheduler slot.", ("priority",)
+)
+OLLAMA_PROMPT_EVAL_SECONDS = Histogram(
+    "skillforge_ollama_prompt_eval_seconds", "Ollama prompt_eval_duration.", ("model",)
+)
+OLLAMA_EVAL_SECONDS = Histogram(
+    "skillforge_ollama_eval_seconds", "Ollama eval_duration (token generation).", ("model",)
+)
+OLLAMA_LOAD_SECONDS = Histogram(
+    "skillforge_ollama_load_seconds", "Ollama load_duration (model load before the call).", ("model",)
+)
+OLLAMA_TOKENS = Counter(
+    "skillforge_ollama_tokens_total", "Tokens processed by Ollama.", ("model", "kind")
+)
+OLLAMA_TOKENS_PER_SECOND = Histogram(
+    "skillforge_ollama_tokens_per_second", "Generation throughput (eval_count / eval_duration).", ("model",),
+    buckets=THROUGHPUT_BUCKETS,
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "skillforge_event_loop_lag_seconds", "How late the event loop ran a timer (blocking work on the loop).",
+    buckets=LAG_BUCKETS,
+)
+
+
+async def watch_event_loop_lag(interval: float):
+    """
+    Sleeps for interval in a loop and records how much later than requested each wake-up came.
+    Run as a background task for the life of the app.
+    """
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - started - interval))
+
+
+def record_ollama_timings(model: str, backend: str, body: dict, elapsed: float):
+    """
+    Records Ollama's own timing fields from a final /api/generate (or /api/chat) response.
+    Durations in the response are nanoseconds.
+    """
+    OLLAMA_REQUEST_SECONDS.observe(elapsed, model=model, backend=backend)
+    if body.get("prompt_eval_duration"):
+        OLLAMA_PROMPT_EVAL_SECONDS.observe(body["prompt_eval_duration"] / 1e9, model=model)
+    if body.get("load_duration"):
+        OLLAMA_LOAD_SECONDS.observe(body["load_duration"] / 1e9, model=model)
+    if body.get("prompt_eval_count"):
+        OLLAMA_TOKENS.inc(body["prompt_eval_count"], model=model, kind="prompt")
+    if body.get("eval_count"):
+        OLLAMA_TOKENS.inc(body["eval_count"], model=model, kind="completion")
+    if body.get("eval_duration"):
+        OLLAMA_EVAL_SECONDS.observe(body["eval_duration"] / 1e9, model=model)
+        if body.get("eval_count"):
+            OLLAMA_TOKENS_PER_SECOND.observe(body["eval_count"] / (body["eval_duration"] / 1e9), model=model)
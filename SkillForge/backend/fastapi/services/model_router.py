@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+
+import httpx
+
+# Routes generations across one or more Ollama instances.
+# Each call goes to the healthy backend with the fewest requests in flight (ties go to the fastest);
+# backends that fail or answer health checks slowly are ejected for a while.
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_BACKENDS = [u.strip().rstrip("/") for u in os.getenv("OLLAMA_BACKENDS", OLLAMA_URL).split(",") if u.strip()]
+
+ROUTER_HEALTH_INTERVAL = float(os.getenv("ROUTER_HEALTH_INTERVAL", "10"))  # seconds between health checks
+ROUTER_HEALTH_TIMEOUT = float(os.getenv("ROUTER_HEALTH_TIMEOUT", "2"))  # a slower /api/tags answer counts as unhealthy
+ROUTER_EJECT_FAILURES = int(os.getenv("ROUTER_EJECT_FAILURES", "3"))  # consecutive failed calls before ejection
+ROUTER_EJECT_SECONDS = float(os.getenv("ROUTER_EJECT_SECONDS", "30"))
+
+# Model per service. Override with MODEL_<SERVICE>, e.g. MODEL_GAME=llama3.2:1b, MODEL_ANALYZE=llama3.1:8b
+OLLAMA_DEFAULT_MODEL = os.getenv("OLLAMA_DEFAULT_MODEL", "llama3.2")
+SERVICES = ("analyze", "roadmap", "portfolio", "linkedin", "dsa", "yuvi", "game")
+
+
+def model_for(service: str) -> str:
+    return os.getenv(f"MODEL_{service.upper()}", OLLAMA_DEFAULT_MODEL)
+
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0  # consecutive
+        self.total_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.latency = None  # EWMA of health-check round trips, seconds
+        self.models = None  # names from /api/tags; None until the first health check
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+    def serves(self, model: str) -> bool:
+        if self.models is None or not model:
+            return True
+        return model in self.models or f"{model}:latest" in self.models
+
+    def eject(self, reason: str):
+        if self.healthy:
+            print(f"Ejecting Ollama backend {self.url} for {ROUTER_EJECT_SECONDS:g}s: {reason}")
+            self.ejections += 1
+        self.ejected_until = time.monotonic() + ROUTER_EJECT_SECONDS
+
+    def as_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.total_failures,
+            "ejections": self.ejections,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "models": sorted(self.models) if self.models is not None else None,
+        }
+
+
+class ModelRouter:
+    def __init__(self, urls: list = None):
+        self.backends = [Backend(url) for url in (urls or OLLAMA_BACKENDS)]
+        self._health_task = None
+        self._health_client = None
+
+    def pick(self, model: str = None, exclude=(), affinity: str = None) -> Backend:
+        candidates = [b for b in self.backends if b not in exclude] or self.backends
+        # With every backend ejected, keep serving from all of them rather than failing outright
+        healthy = [b for b in candidates if b.healthy] or candidates
+        capable = [b for b in healthy if b.serves(model)] or healthy
+        if affinity:
+            # Rendezvous hashing: a key stays on its backend unless that backend drops out
+            return max(capable, key=lambda b: hashlib.sha1(f"{affinity}|{b.url}".encode()).digest())
+        return min(capable, key=lambda b: (b.outstanding, b.latency if b.latency is not None else 0.0))
+
+    @asynccontextmanager
+    async def lease(self, model: str = None, exclude=(), affinity: str = None):
+        """
+        Picks a backend and counts the block as one request in flight on it.
+        Transport errors and 5xx responses raised from the block count towards ejection.
+        """
+        backend = self.pick(model, exclude, affinity)
+        backend.outstanding += 1
+        backend.requests += 1
+        try:
+            yield backend
+        except httpx.TransportError as e:
+            self._failed(backend, str(e) or type(e).__name__)
+            raise
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                self._failed(backend, f"HTTP {e.response.status_code}")
+            raise
+        else:
+            backend.failures = 0
+        finally:
+            backend.outstanding -= 1
+
+    def _failed(self, backend: Backend, reason: str):
+        backend.failures += 1
+        backend.total_failures += 1
+        if backend.failures >= ROUTER_EJECT_FAILURES:
+            backend.eject(reason)
+
+    # --- health checks ---
+
+    async def check(self, backend: Backend):
+        started = time.monotonic()
+        try:
+            response = await self._health_client.get(f"{backend.url}/api/tags")
+            response.raise_for_status()
+            backend.models = {m.get("name") for m in response.json().get("models", [])}
+        except Exception as e:
+            backend.eject(f"health check failed: {str(e) or type(e).__name__}")
+            return
+        elapsed = time.monotonic() - started
+        backend.latency = elapsed if backend.latency is None else 0.7 * backend.latency + 0.3 * elapsed
+        # /api/tags can answer while generations still fail, so an ejection always runs its full window
+        if backend.healthy:
+            backend.failures = 0
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(b) for b in self.backends))
+
+    async def _health_loop(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(ROUTER_HEALTH_INTERVAL)
+
+    def start(self):
+        if self._health_client is None:
+            # Separate from the generation pool so a saturated pool cannot fail health checks
+            self._health_client = httpx.AsyncClient(timeout=ROUTER_HEALTH_TIMEOUT)
+        # A single backend has nowhere to fail over to, so it is not polled
+        if len(self.backends) > 1 and (self._health_task is None or self._health_task.done()):
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        if self._health_client is not None:
+            await self._health_client.aclose()
+            self._health_client = None
+
+    def stats(self) -> dict:
+        return {
+            "backends": [b.as_dict() for b in self.backends],
+            "models": {service: model_for(service) for service in SERVICES},
+        }
+
+
+router = ModelRouter()
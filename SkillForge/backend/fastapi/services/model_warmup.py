@@ -0,0 +1,161 @@
+import os
+import time
+import asyncio
+
+from services.keep_alive import keep_alive
+from services.metrics import record_ollama_timings
+from services.model_router import router, model_for, SERVICES
+from services.ollama_client import get_client
+from services.scheduler import scheduler
+
+# Loads the configured models on every Ollama backend at startup with a one-token prompt. After that only
+# busy models are kept loaded (pinged again before their keep_alive runs out); a quiet model is left to
+# unload, as keep_alive intends, and Ollama's own evictions are not fought.
+# GET /ready answers 503 until the first warm-up has loaded every model, and later only while a busy
+# model is not loaded anywhere, so a load balancer only sends users to workers that are ready for them.
+MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "1") == "1"
+# Comma-separated; defaults to every model the services use (MODEL_<SERVICE> / OLLAMA_DEFAULT_MODEL)
+MODEL_WARMUP_MODELS = [m.strip() for m in os.getenv("MODEL_WARMUP_MODELS", "").split(",") if m.strip()] or sorted(
+    {model_for(service) for service in SERVICES}
+)
+MODEL_WARMUP_TIMEOUT = float(os.getenv("MODEL_WARMUP_TIMEOUT", "300"))  # seconds one load may take
+MODEL_WARMUP_INTERVAL = float(os.getenv("MODEL_WARMUP_INTERVAL", "30"))  # seconds between keep-warm checks
+MODEL_WARMUP_PROMPT = "Hi"
+
+
+class ModelWarmup:
+    def __init__(self, models: list = MODEL_WARMUP_MODELS, interval: float = MODEL_WARMUP_INTERVAL):
+        self.models = models
+        self.interval = interval
+        self.started_at = None
+        self.warmed_at = None  # end of the first pass over every model
+        self._task = None
+        self._failing = set()  # (url, model) pairs whose last load failed, so each failure is logged once
+        self._warmed = set()  # (url, model) pairs loaded at least once; the rest are retried every check
+        self._stats = {"loads": 0, "failures": 0}
+        self._load_seconds = {}  # model -> seconds its last load took
+
+    async def _load(self, backend, model: str):
+        # One token, at background priority: real traffic goes first, and renews the timer anyway
+        value = keep_alive.current(model)
+        payload = {
+            "model": model,
+            "prompt": MODEL_WARMUP_PROMPT,
+            "stream": False,
+            "keep_alive": value,
+            "options": {"num_predict": 1},
+        }
+        started = time.perf_counter()
+        try:
+            async with scheduler.slot(priority="background", user="model-warmup"):
+                response = await get_client().post(f"{backend.url}/api/generate", json=payload, timeout=MODEL_WARMUP_TIMEOUT)
+                response.raise_for_status()
+                body = response.json()
+        except Exception as e:
+            self._stats["failures"] += 1
+            if (backend.url, model) not in self._failing:
+                self._failing.add((backend.url, model))
+                print(f"Warming {model} on {backend.url} failed: {str(e) or type(e).__name__}")
+            return
+        elapsed = time.perf_counter() - started
+        self._failing.discard((backend.url, model))
+        self._warmed.add((backend.url, model))
+        self._stats["loads"] += 1
+        self._load_seconds[model] = round(elapsed, 3)
+        record_ollama_timings(model, backend.url, body, elapsed)
+        keep_alive.loaded(backend.url, model, value)
+
+    async def _sync(self, backend):
+        # Ollama may unload a model early to make room for another; /api/ps says what is really loaded
+        try:
+            response = await get_client().get(f"{backend.url}/api/ps", timeout=MODEL_WARMUP_INTERVAL)
+            response.raise_for_status()
+            running = {m.get("name") for m in response.json().get("models", [])}
+        except Exception:
+            return
+        for model in self.models:
+            if model not in running and f"{model}:latest" not in running:
+                keep_alive.unloaded(backend.url, model)
+
+    def _needs_load(self, backend, model: str) -> bool:
+        if not backend.serves(model):
+            return False
+        if (backend.url, model) not in self._warmed:
+            return True
+        # Idle models are allowed to unload; only busy ones are kept loaded between requests
+        return keep_alive.busy(model) and keep_alive.remaining(backend.url, model) <= 2 * self.interval
+
+    async def refresh(self):
+        """
+        On each healthy backend, loads the models that never warmed up there, and busy models that are
+        not loaded or will unload before the next check.
+        """
+        await asyncio.gather(*(self._sync(backend) for backend in router.backends if backend.healthy))
+        loads = [
+            self._load(backend, model)
+            for backend in router.backends if backend.healthy
+            for model in self.models
+            if self._needs_load(backend, model)
+        ]
+        await asyncio.gather(*loads)
+
+    async def _run(self):
+        await self.refresh()
+        self.warmed_at = time.time()
+        print(f"Model warm-up finished in {self.warmed_at - self.started_at:.1f}s: {self.stats()['status']}")
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+    def start(self):
+        self.started_at = time.time()
+        if MODEL_WARMUP_ENABLED and self.models and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _model_state(self, model: str) -> dict:
+        expires_in = {}
+        for backend in router.backends:
+            remaining = keep_alive.remaining(backend.url, model)
+            if backend.healthy and remaining > 0:
+                # None: a negative keep_alive, loaded until Ollama restarts
+                expires_in[backend.url] = round(remaining, 1) if remaining != float("inf") else None
+        warmed = any((backend.url, model) in self._warmed for backend in router.backends if backend.healthy)
+        if expires_in:
+            state = "warm"
+        elif warmed and not keep_alive.busy(model):
+            state = "idle"  # loaded once, then unloaded for lack of traffic; the next call reloads it
+        else:
+            state = "cold"
+        return {
+            "state": state,
+            "warm": bool(expires_in),
+            "expires_in": expires_in,
+            "last_load_seconds": self._load_seconds.get(model),
+        }
+
+    def stats(self) -> dict:
+        """
+        status is "disabled", "warming" (first pass still running), "warm" (no model is cold; idle
+        models may have unloaded) or "cold" (a model never warmed up, or a busy one is not loaded on
+        any healthy backend).
+        """
+        models = {model: self._model_state(model) for model in self.models}
+        if not MODEL_WARMUP_ENABLED:
+            status = "disabled"
+        elif self.warmed_at is None:
+            status = "warming"
+        else:
+            status = "cold" if any(state["state"] == "cold" for state in models.values()) else "warm"
+        return {"status": status, "models": models, "keep_alive": keep_alive.stats(), **self._stats}
+
+    def ready(self) -> bool:
+        return self.stats()["status"] in ("warm", "disabled")
+
+
+model_warmup = ModelWarmup()
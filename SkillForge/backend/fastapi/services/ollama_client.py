@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import httpx
+
+from services.keep_alive import keep_alive
+from services.scheduler import scheduler
+from services.model_router import router
+from services.metrics import record_ollama_timings
+from services.tracing import span
+
+# Shared async client for every service that talks to Ollama.
+# All settings can be overridden through environment variables; OLLAMA_URL / OLLAMA_BACKENDS live in model_router.
+
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "300"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "32"))
+OLLAMA_KEEPALIVE_CONNECTIONS = int(os.getenv("OLLAMA_KEEPALIVE_CONNECTIONS", "16"))
+
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled client, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(OLLAMA_READ_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+def _retryable(error: Exception) -> bool:
+    # Only failures where the backend never started the generation are safe to send elsewhere
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, httpx.ConnectError)
+
+
+async def generate(payload: dict) -> dict:
+    """
+    Sends a non-streaming /api/generate request and returns Ollama's JSON body.
+    At most OLLAMA_MAX_CONCURRENCY requests are in flight at once; the rest wait in the
+    priority scheduler without blocking the event loop. The model router picks the backend
+    and retries on another one if the first cannot be reached.
+    """
+    return await _request("/api/generate", payload)
+
+
+async def chat(payload: dict, affinity: str = None) -> dict:
+    """
+    Sends a non-streaming /api/chat request. Calls with the same affinity key go to the same
+    backend while it is healthy, so Ollama can reuse the already-evaluated message prefix.
+    """
+    return await _request("/api/chat", payload, affinity)
+
+
+def _with_keep_alive(payload: dict) -> dict:
+    # Callers may pin their own keep_alive (the warm-up does); everyone else gets the traffic-based one
+    if "keep_alive" in payload or not payload.get("model"):
+        return payload
+    return {**payload, "keep_alive": keep_alive.for_model(payload["model"])}
+
+
+async def _request(path: str, payload: dict, affinity: str = None) -> dict:
+    payload = _with_keep_alive(payload)
+    async with scheduler.slot():
+        tried = []
+        while True:
+            try:
+                async with router.lease(payload.get("model"), exclude=tried, affinity=affinity) as backend:
+                    started = time.perf_counter()
+                    with span("ollama.generate"):
+                        response = await get_client().post(f"{backend.url}{path}", json=payload)
+                        response.raise_for_status()
+                        body = response.json()
+                    record_ollama_timings(payload.get("model", ""), backend.url, body, time.perf_counter() - started)
+                    if "keep_alive" in payload:
+                        keep_alive.loaded(backend.url, payload["model"], payload["keep_alive"])
+                    return body
+            except (httpx.ConnectError, httpx.HTTPStatusError) as e:
+                tried.append(backend)
+                if not _retryable(e) or len(tried) >= len(router.backends):
+                    raise
+
+
+async def generate_stream(payload: dict):
+    """
+    Sends a streaming /api/generate request and yields each NDJSON chunk from Ollama as it arrives.
+    Closing the generator (e.g. the HTTP client disconnected) aborts the upstream request.
+    """
+    async for chunk in _stream("/api/generate", payload):
+        yield chunk
+
+
+async def chat_stream(payload: dict, affinity: str = None):
+    """
+    Streaming variant of chat(); chunks carry {"message": {"content": ...}}.
+    """
+    async for chunk in _stream("/api/chat", payload, affinity):
+        yield chunk
+
+
+async def _stream(path: str, payload: dict, affinity: str = None):
+    payload = _with_keep_alive(payload)
+    async with scheduler.slot():
+        tried = []
+        started = False
+        while True:
+            try:
+                async with router.lease(payload.get("model"), exclude=tried, affinity=affinity) as backend:
+                    url = f"{backend.url}{path}"
+                    request_started = time.perf_counter()
+                    async with get_client().stream("POST", url, json={**payload, "stream": True}) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get("error"):
+                                raise RuntimeError(chunk["error"])
+                            started = True
+                            if chunk.get("done"):
+                                elapsed = time.perf_counter() - request_started
+                                record_ollama_timings(payload.get("model", ""), backend.url, chunk, elapsed)
+                                if "keep_alive" in payload:
+                                    keep_alive.loaded(backend.url, payload["model"], payload["keep_alive"])
+                            yield chunk
+                            if chunk.get("done"):
+                                return
+                    return
+            except (httpx.ConnectError, httpx.HTTPStatusError) as e:
+                tried.append(backend)
+                if started or not _retryable(e) or len(tried) >= len(router.backends):
+                    raise
+
+
+async def close():
+    """
+    Closes the pooled client. Called from the FastAPI lifespan on shutdown.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
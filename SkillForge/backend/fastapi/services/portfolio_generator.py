@@ -1,10 +1,16 @@
-import requests
-import json
+from services.model_router import model_for
+from services.llm_cache import cached, Fallback
+from services.scheduler import SchedulerRejected, request_user
+from services.json_repair import generate_json
+from services.llm_schemas import Portfolio
+from services.tracing import traced
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
-DEFAULT_MODEL = "llama3.2"
+DEFAULT_MODEL = model_for("portfolio")  # override with MODEL_PORTFOLIO
 
-def generate_portfolio(user_data: str, model: str = DEFAULT_MODEL) -> dict:
+# Near matches only among the same user's requests: a portfolio is personal data
+@cached("portfolio", similar=("user_data",), similar_scope=request_user.get)
+@traced("portfolio")
+async def generate_portfolio(user_data: str, model: str = DEFAULT_MODEL) -> dict:
     """
     Extracts structured portfolio data from user input.
     Returns a dictionary with fields like name, tagline, about, skills, projects, contact.
@@ -49,27 +55,18 @@ def generate_portfolio(user_data: str, model: str = DEFAULT_MODEL) -> dict:
     }
     
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        
-        ai_output = result.get("response", "{}")
-        
-        if "```json" in ai_output:
-            ai_output = ai_output.split("```json")[1].split("```")[0]
-        elif "```" in ai_output:
-             ai_output = ai_output.split("```")[1].split("```")[0]
-             
-        return json.loads(ai_output)
-        
+        return await generate_json(payload, Portfolio)
+
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Error querying Ollama: {e}")
         # Return fallback data so the frontend doesn't crash
-        return {
+        return Fallback({
             "name": "Professional",
             "tagline": "Building the future with code.",
             "about": "I am a passionate developer. (AI failed to extract details)",
             "skills": ["HTML", "CSS", "JavaScript"],
             "projects": [],
             "contact": {"email": "email@example.com"}
-        }
+        })
@@ -0,0 +1,292 @@
+import os
+import re
+import sys
+import copy
+import json
+import time
+import random
+import asyncio
+import sqlite3
+from collections import OrderedDict
+
+from pydantic import ValidationError
+
+from services.dsa_service import generate_dsa_question
+from services.llm_cache import Fallback, make_key
+from services.llm_schemas import DSAQuestion
+from services.scheduler import request_user
+from services.text_vectors import vectorize, cosine, MinHashLSH
+
+# Local bank of validated DSA problems, indexed by topic, difficulty and an n-gram vector of the statement.
+# /dsa/generate serves a problem the user has not seen yet straight from the bank; only when none is left
+# does it ask the LLM, and the new problem joins the bank unless it near-duplicates one already there.
+PROBLEM_BANK_DB = os.getenv("PROBLEM_BANK_DB", "")  # e.g. "problem_bank.sqlite3"; empty keeps the bank in memory
+PROBLEM_BANK_SEED = [
+    p.strip() for p in os.getenv(
+        "PROBLEM_BANK_SEED", os.path.join(os.path.dirname(__file__), "..", "data", "dsa_problems.jsonl")
+    ).split(",") if p.strip()
+]
+PROBLEM_BANK_DUPLICATE_SIMILARITY = float(os.getenv("PROBLEM_BANK_DUPLICATE_SIMILARITY", "0.85"))  # cosine, 0..1
+PROBLEM_BANK_TOPIC_SIMILARITY = float(os.getenv("PROBLEM_BANK_TOPIC_SIMILARITY", "0.75"))  # "array" ~ "arrays"
+PROBLEM_BANK_MAX_USERS = int(os.getenv("PROBLEM_BANK_MAX_USERS", "10000"))  # users whose served problems are remembered
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dsa_problems (
+    id TEXT PRIMARY KEY, topics TEXT NOT NULL, difficulty TEXT NOT NULL, question TEXT NOT NULL,
+    source TEXT, created_at REAL
+)
+"""
+
+
+def _key(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _statement(question: dict) -> str:
+    return f"{question['title']}\n{question['description']}"
+
+
+class _Problem:
+    __slots__ = ("id", "topics", "difficulty", "question", "vector", "source")
+
+    def __init__(self, problem_id: str, topics: list, difficulty: str, question: dict, source: str):
+        self.id = problem_id
+        self.topics = topics
+        self.difficulty = difficulty
+        self.question = question
+        self.vector = vectorize(_statement(question))
+        self.source = source
+
+
+class _Topic:
+    def __init__(self, label: str):
+        self.label = label
+        self.vector = vectorize(label)
+        self.by_difficulty = {}  # difficulty -> problem ids
+
+
+class ProblemBank:
+    def __init__(self, db_path: str = PROBLEM_BANK_DB, seed_paths: list = PROBLEM_BANK_SEED,
+                 max_users: int = PROBLEM_BANK_MAX_USERS):
+        self.db_path = db_path
+        self.seed_paths = seed_paths
+        self.max_users = max_users
+        self._problems = {}
+        self._topics = {}  # topic key -> _Topic
+        self._lsh = MinHashLSH()
+        self._served = OrderedDict()  # user -> ids already served to them
+        self._db = None
+        self._stats = {"hits": 0, "misses": 0, "generated": 0, "added": 0, "duplicates": 0, "invalid": 0}
+
+    # --- storage ---
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(SCHEMA)
+            self._db.commit()
+        return self._db
+
+    def _save(self, problems: list):
+        db = self._conn()
+        db.executemany(
+            "INSERT OR IGNORE INTO dsa_problems (id, topics, difficulty, question, source, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(p.id, json.dumps(p.topics), p.difficulty, json.dumps(p.question), p.source, time.time()) for p in problems],
+        )
+        db.commit()
+
+    def _load(self):
+        added = []
+        if self.db_path:
+            for problem_id, topics, difficulty, question, source in self._conn().execute(
+                "SELECT id, topics, difficulty, question, source FROM dsa_problems ORDER BY created_at"
+            ):
+                # Stored problems were checked when they went in; index them without re-checking
+                self._index(_Problem(problem_id, json.loads(topics), difficulty, json.loads(question), source))
+        for path in self.seed_paths:
+            if os.path.exists(path):
+                counts, new = self._import(self._read_records(path), "seed")
+                added += new
+                print(f"Problem bank: imported {path}: {counts}")
+        if self.db_path and added:
+            self._save(added)
+
+    async def start(self):
+        await asyncio.to_thread(self._load)
+
+    async def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    # --- index ---
+
+    def _index(self, problem: _Problem):
+        self._problems[problem.id] = problem
+        self._lsh.add(problem.id, problem.vector)
+        for label in problem.topics:
+            topic = self._topics.get(_key(label))
+            if topic is None:
+                topic = self._topics[_key(label)] = _Topic(label)
+            topic.by_difficulty.setdefault(problem.difficulty, []).append(problem.id)
+
+    def find_duplicate(self, question: dict):
+        """
+        The banked problem whose statement is near-identical to question's, or None.
+        """
+        vector = vectorize(_statement(question))
+        for problem_id in self._lsh.candidates(vector):
+            if cosine(vector, self._problems[problem_id].vector) >= PROBLEM_BANK_DUPLICATE_SIMILARITY:
+                return self._problems[problem_id]
+        return None
+
+    def add(self, question: dict, topics: list, difficulty: str, source: str = "generated"):
+        """
+        Validates and banks a problem. Returns (status, problem) with status "added", "existing" (the
+        same statement is already banked), "duplicate" (problem is the near-duplicate already banked) or
+        "invalid" (problem is None).
+        """
+        try:
+            question = DSAQuestion.model_validate(question).model_dump()
+        except ValidationError:
+            self._stats["invalid"] += 1
+            return "invalid", None
+        problem_id = make_key("dsa_problem", {"statement": _statement(question)})[:32]
+        if problem_id in self._problems:
+            return "existing", self._problems[problem_id]
+        existing = self.find_duplicate(question)
+        if existing is not None:
+            self._stats["duplicates"] += 1
+            return "duplicate", existing
+        problem = _Problem(problem_id, list(topics), _key(difficulty), question, source)
+        self._index(problem)
+        self._stats["added"] += 1
+        return "added", problem
+
+    def _topic_for(self, topic: str):
+        """
+        The banked topic matching the request: exact (case/space-insensitive) first, then the closest
+        n-gram match above PROBLEM_BANK_TOPIC_SIMILARITY.
+        """
+        exact = self._topics.get(_key(topic))
+        if exact is not None:
+            return exact
+        vector = vectorize(topic)
+        best, best_score = None, PROBLEM_BANK_TOPIC_SIMILARITY
+        for candidate in self._topics.values():
+            score = cosine(vector, candidate.vector)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def _seen_by(self, user: str) -> set:
+        seen = self._served.get(user)
+        if seen is None:
+            seen = self._served[user] = set()
+            while len(self._served) > self.max_users:
+                self._served.popitem(last=False)
+        self._served.move_to_end(user)
+        return seen
+
+    def _take(self, topic: str, difficulty: str, count: int) -> list:
+        entry = self._topic_for(topic)
+        if entry is None:
+            return []
+        seen = self._seen_by(request_user.get())
+        unseen = [i for i in entry.by_difficulty.get(_key(difficulty), []) if i not in seen]
+        picked = random.sample(unseen, min(count, len(unseen)))
+        seen.update(picked)
+        return [copy.deepcopy(self._problems[i].question) for i in picked]
+
+    async def _generate(self, topic: str, difficulty: str, variant: int = 0) -> dict:
+        question = await generate_dsa_question(topic, difficulty, variant=variant)
+        if isinstance(question, Fallback):
+            return question
+        self._stats["generated"] += 1
+        status, problem = self.add(question, [topic], difficulty)
+        if problem is not None:
+            # A near-duplicate still goes to the user; it counts as served so the bank moves on next time
+            self._seen_by(request_user.get()).add(problem.id)
+            if status == "added" and self.db_path:
+                await asyncio.to_thread(self._save, [problem])
+        return question
+
+    async def get(self, topic: str, difficulty: str) -> dict:
+        """
+        A problem for topic and difficulty that this user has not been served yet; only generates
+        when the bank has none left.
+        """
+        banked = self._take(topic, difficulty, 1)
+        if banked:
+            self._stats["hits"] += 1
+            return banked[0]
+        self._stats["misses"] += 1
+        return await self._generate(topic, difficulty)
+
+    async def get_batch(self, topic: str, difficulty: str, count: int) -> list:
+        """
+        count distinct problems, taking what the bank has and generating the rest concurrently.
+        """
+        questions = self._take(topic, difficulty, count)
+        self._stats["hits"] += len(questions)
+        missing = count - len(questions)
+        if missing:
+            self._stats["misses"] += missing
+            questions += await asyncio.gather(*(self._generate(topic, difficulty, i) for i in range(missing)))
+        return questions
+
+    # --- import ---
+
+    @staticmethod
+    def _read_records(path: str) -> list:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                return [json.loads(line) for line in f if line.strip()]
+            return json.load(f)
+
+    def _import(self, records: list, source: str) -> tuple:
+        """
+        Banks records of {"topics": [...] or "topic": ..., "difficulty": ..., <DSAQuestion fields>}.
+        Returns ({"added", "existing", "duplicates", "invalid"}, added problems).
+        """
+        counts = {"added": 0, "existing": 0, "duplicates": 0, "invalid": 0}
+        added = []
+        for record in records:
+            topics = record.get("topics") or [record.get("topic")]
+            if not all(isinstance(t, str) and t.strip() for t in topics) or not record.get("difficulty"):
+                counts["invalid"] += 1
+                continue
+            question = {k: v for k, v in record.items() if k not in ("topic", "topics", "difficulty")}
+            status, problem = self.add(question, topics, record["difficulty"], source)
+            counts["duplicates" if status == "duplicate" else status] += 1
+            if status == "added":
+                added.append(problem)
+        return counts, added
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "problems": len(self._problems),
+            "topics": {
+                topic.label: {d: len(ids) for d, ids in topic.by_difficulty.items()}
+                for topic in self._topics.values()
+            },
+            "persistent": bool(self.db_path),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
+
+
+problem_bank = ProblemBank()
+
+
+if __name__ == "__main__":
+    # python -m services.problem_bank data.jsonl [more.json ...]  -> imports into PROBLEM_BANK_DB
+    if not PROBLEM_BANK_DB or len(sys.argv) < 2:
+        sys.exit("usage: PROBLEM_BANK_DB=problem_bank.sqlite3 python -m services.problem_bank FILE [FILE ...]")
+    bank = ProblemBank(seed_paths=[])
+    bank._load()
+    for path in sys.argv[1:]:
+        counts, added = bank._import(bank._read_records(path), os.path.basename(path))
+        bank._save(added)
+        print(f"{path}: {counts}")
@@ -0,0 +1,205 @@
+import os
+import re
+from collections import Counter
+
+# Keeps resume / job-description text inside a per-service token budget before it is inlined into a prompt.
+# Token counts are estimated (about 4 characters per token for English); no tokenizer is needed.
+
+# Tokens of resume text per prompt. Override with PROMPT_BUDGET_<SERVICE>.
+DEFAULT_BUDGETS = {
+    "analyze": 1500,
+    "portfolio": 2000,
+}
+JOB_DESCRIPTION_BUDGET = int(os.getenv("PROMPT_BUDGET_JOB_DESCRIPTION", "800"))
+
+# Sections to keep first, per service; anything not listed comes after, and DROPPED_SECTIONS never make it in
+SECTION_PRIORITIES = {
+    "analyze": ("skills", "experience", "projects", "summary", "certifications", "education"),
+    "portfolio": ("header", "summary", "skills", "projects", "experience", "education", "certifications"),
+}
+DROPPED_SECTIONS = ("references", "interests")
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "about me", "objective", "career objective"),
+    "skills": ("skills", "technical skills", "core competencies", "key skills", "technologies", "tech stack"),
+    "experience": ("experience", "work experience", "professional experience", "employment history", "internships",
+                   "internship", "work history"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "education": ("education", "academic background", "qualifications"),
+    "certifications": ("certifications", "certificates", "licenses", "courses", "awards", "achievements"),
+    "references": ("references",),
+    "interests": ("interests", "hobbies", "hobbies and interests", "declaration"),
+}
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.I)
+_BULLET_RE = re.compile(r"^[•●▪◦‣⁃∙*\-–]+\s*")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+
+
+def budget_for(service: str) -> int:
+    return int(os.getenv(f"PROMPT_BUDGET_{service.upper()}", DEFAULT_BUDGETS.get(service, 2000)))
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    # Code, emails and URLs tokenize worse than prose, so take the larger of the two estimates
+    return max(len(text) // 4, round(len(text.split()) * 1.3))
+
+
+def clean_text(text: str) -> str:
+    """
+    Normalizes pdfplumber output: collapses whitespace, drops page numbers, repeats of page
+    headers/footers and immediately repeated lines.
+    """
+    lines = [re.sub(r"[ \t ]+", " ", line).strip() for line in (text or "").replace("\r", "\n").split("\n")]
+    repeated = {
+        line for line, count in Counter(l.lower() for l in lines if l).items()
+        if count >= 3 and len(line) <= 60
+    }
+    cleaned, seen_repeated = [], set()
+    for line in lines:
+        line = _BULLET_RE.sub("- ", line) if _BULLET_RE.match(line) else line
+        if _PAGE_NUMBER_RE.match(line):
+            continue
+        if line.lower() in repeated:
+            # Keep the first occurrence: a page header is usually the candidate's name
+            if line.lower() in seen_repeated:
+                continue
+            seen_repeated.add(line.lower())
+        if not line and (not cleaned or not cleaned[-1]):
+            continue
+        if line and cleaned and line == cleaned[-1]:
+            continue
+        cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+def _heading(line: str):
+    candidate = line.strip(" :-|").lower()
+    if len(candidate) > 40:
+        return None
+    return _HEADING_LOOKUP.get(candidate)
+
+
+def split_sections(text: str) -> list:
+    """
+    Splits resume text into [(section, text)] in document order. Text before the first
+    recognized heading (name, contact details) is the "header" section.
+    """
+    sections = [["header", []]]
+    for line in text.split("\n"):
+        name = _heading(line)
+        if name:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def _truncate_line(line: str, budget: int) -> str:
+    """
+    The longest start of one line that fits the budget: whole sentences if any fit, else whole words,
+    else characters. Counts are kept running so a very long line stays linear.
+    """
+    def fits(chars, words):
+        return max(chars // 4, round(words * 1.3)) <= budget
+
+    for pieces in (_SENTENCE_RE.split(line), line.split()):
+        kept, chars, words = [], 0, 0
+        for piece in pieces:
+            chars += len(piece) + (1 if kept else 0)
+            words += len(piece.split())
+            if not fits(chars, words):
+                break
+            kept.append(piece)
+        if kept:
+            return " ".join(kept)
+    return line[:budget * 4].strip()
+
+
+def truncate_to_budget(text: str, budget: int) -> str:
+    """
+    Cuts text at a line boundary so that it fits the token budget. The line that crosses the budget is
+    cut at a sentence or word instead, so non-empty text never comes back empty.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    budget = max(budget, 1)
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            partial = _truncate_line(line, budget - used - 1) if budget - used > 1 else ""
+            if partial:
+                kept.append(partial)
+            break
+        kept.append(line)
+        used += cost
+    result = "\n".join(kept)
+    if not result.strip():
+        # Only blank lines fit before the first real one; start from that line instead
+        result = _truncate_line(text.strip().split("\n", 1)[0], budget)
+    return result
+
+
+class Compacted:
+    def __init__(self, text: str, original_tokens: int, budget: int, sections: list = None):
+        self.text = text
+        self.original_tokens = original_tokens
+        self.budget = budget
+        self.sections = sections or []
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    def report(self) -> dict:
+        return {
+            "original": self.original_tokens,
+            "compacted": self.tokens,
+            "budget": self.budget,
+            "sections": self.sections,
+        }
+
+
+def compact_resume(text: str, service: str, budget: int = None) -> Compacted:
+    """
+    Cleans extracted resume text and, if it is still over the service's budget, trims its sections
+    to fit, giving leftover room to the sections that service cares about most.
+    """
+    budget = budget or budget_for(service)
+    original_tokens = estimate_tokens(text)
+    cleaned = clean_text(text)
+    sections = split_sections(cleaned)
+    if estimate_tokens(cleaned) <= budget:
+        return Compacted(cleaned, original_tokens, budget, [name for name, _ in sections])
+
+    priorities = SECTION_PRIORITIES.get(service, ())
+    rank = {name: i for i, name in enumerate(priorities)}
+    ordered = sorted(
+        (i for i, (name, _) in enumerate(sections) if name not in DROPPED_SECTIONS),
+        key=lambda i: (rank.get(sections[i][0], len(priorities)), i),
+    )
+    # First pass: every section gets up to an equal share, so one long experience list cannot crowd out
+    # projects. Second pass: leftover budget extends the trimmed sections in priority order.
+    share = budget // max(len(ordered), 1)
+    chosen = {i: truncate_to_budget(sections[i][1], share) for i in ordered}
+    for i in ordered:
+        remaining = budget - sum(estimate_tokens(body) + 1 for body in chosen.values())
+        if remaining < 20:
+            break
+        if chosen[i] != sections[i][1]:
+            chosen[i] = truncate_to_budget(sections[i][1], estimate_tokens(chosen[i]) + remaining)
+    chosen = {i: body for i, body in chosen.items() if body}
+    # Re-assemble in document order so the model still reads a normal resume
+    kept = [i for i in range(len(sections)) if i in chosen]
+    compacted = "\n\n".join(chosen[i] for i in kept)
+    return Compacted(compacted, original_tokens, budget, [sections[i][0] for i in kept])
+
+
+def compact_job_description(text: str, budget: int = JOB_DESCRIPTION_BUDGET) -> Compacted:
+    original_tokens = estimate_tokens(text)
+    cleaned = clean_text(text)
+    return Compacted(truncate_to_budget(cleaned, budget), original_tokens, budget)
@@ -0,0 +1,173 @@
+import os
+import re
+import asyncio
+from collections import OrderedDict, deque
+
+from services.game_service import generate_battle_question
+from services.llm_cache import Fallback
+from services.scheduler import request_priority
+
+# Per-topic pool of pre-generated Game Box questions.
+# A background task tops a topic up to the high-water mark whenever it drops to the low-water mark.
+GAME_POOL_LOW_WATER = int(os.getenv("GAME_POOL_LOW_WATER", "3"))
+GAME_POOL_HIGH_WATER = int(os.getenv("GAME_POOL_HIGH_WATER", "10"))
+GAME_POOL_REFILL_CONCURRENCY = int(os.getenv("GAME_POOL_REFILL_CONCURRENCY", "2"))
+GAME_POOL_MAX_TOPICS = int(os.getenv("GAME_POOL_MAX_TOPICS", "64"))
+GAME_POOL_PREWARM_TOPICS = [t.strip() for t in os.getenv("GAME_POOL_PREWARM_TOPICS", "").split(",") if t.strip()]
+
+# Questions whose word sets overlap at least this much with a recent one are dropped
+DUPLICATE_SIMILARITY = 0.8
+RECENT_QUESTIONS_PER_TOPIC = 200
+
+
+def _topic_key(topic: str) -> str:
+    return re.sub(r"\s+", " ", topic).strip().lower()
+
+
+def _fingerprint(question: dict) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+", question["question"].lower()))
+
+
+def _is_near_duplicate(fingerprint: frozenset, recent) -> bool:
+    for seen in recent:
+        union = len(fingerprint | seen)
+        if union and len(fingerprint & seen) / union >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+class _Topic:
+    def __init__(self, topic: str):
+        self.topic = topic  # original spelling, used in the prompt
+        self.questions = deque()
+        self.recent = deque(maxlen=RECENT_QUESTIONS_PER_TOPIC)
+        self.refill_task = None
+        self.served = 0
+        self.pool_hits = 0
+        self.duplicates_dropped = 0
+
+
+class QuestionPool:
+    def __init__(
+        self,
+        low_water: int = GAME_POOL_LOW_WATER,
+        high_water: int = GAME_POOL_HIGH_WATER,
+        refill_concurrency: int = GAME_POOL_REFILL_CONCURRENCY,
+        max_topics: int = GAME_POOL_MAX_TOPICS,
+    ):
+        self.low_water = low_water
+        self.high_water = high_water
+        self.refill_concurrency = refill_concurrency
+        self.max_topics = max_topics
+        self._topics = OrderedDict()
+
+    def _get_topic(self, topic: str) -> _Topic:
+        key = _topic_key(topic)
+        entry = self._topics.get(key)
+        if entry is None:
+            entry = self._topics[key] = _Topic(topic)
+            while len(self._topics) > self.max_topics:
+                _, evicted = self._topics.popitem(last=False)
+                if evicted.refill_task:
+                    evicted.refill_task.cancel()
+        self._topics.move_to_end(key)
+        return entry
+
+    def _accept(self, entry: _Topic, question: dict) -> bool:
+        fingerprint = _fingerprint(question)
+        if _is_near_duplicate(fingerprint, entry.recent):
+            entry.duplicates_dropped += 1
+            return False
+        entry.recent.append(fingerprint)
+        return True
+
+    def _maybe_refill(self, entry: _Topic):
+        if len(entry.questions) > self.low_water:
+            return
+        if entry.refill_task and not entry.refill_task.done():
+            return
+        entry.refill_task = asyncio.create_task(self._refill(entry))
+
+    async def _refill(self, entry: _Topic):
+        # Runs in its own task, so this only lowers the priority of the refill's Ollama calls
+        request_priority.set("background")
+        # Bound the attempts so a model that keeps repeating itself cannot spin forever
+        attempts_left = self.high_water * 3
+        while len(entry.questions) < self.high_water and attempts_left > 0:
+            batch = min(self.refill_concurrency, self.high_water - len(entry.questions), attempts_left)
+            attempts_left -= batch
+            # Refill variants never coalesce with user requests, so they add new questions to the pool
+            results = await asyncio.gather(*(generate_battle_question(entry.topic, variant=f"refill-{i}") for i in range(batch)))
+            for question in results:
+                if isinstance(question, Fallback):
+                    # Ollama is down or returning garbage; try again on the next pop
+                    return
+                if self._accept(entry, question):
+                    entry.questions.append(question)
+
+    async def _generate_now(self, entry: _Topic, variant: int = 0) -> dict:
+        # Concurrent cold-topic requests share one generation; a batch asks for distinct variants
+        question = await generate_battle_question(entry.topic, variant=variant)
+        if not isinstance(question, Fallback):
+            self._accept(entry, question)
+        return question
+
+    async def get(self, topic: str) -> dict:
+        """
+        Pops a ready question for the topic. Only a cold topic waits on the LLM.
+        """
+        entry = self._get_topic(topic)
+        entry.served += 1
+        if entry.questions:
+            entry.pool_hits += 1
+            question = entry.questions.popleft()
+            self._maybe_refill(entry)
+            return question
+        self._maybe_refill(entry)
+        return await self._generate_now(entry)
+
+    async def get_batch(self, topic: str, count: int) -> list:
+        """
+        Returns count questions for a whole match, taking what the pool has and generating the rest concurrently.
+        """
+        entry = self._get_topic(topic)
+        entry.served += count
+        questions = []
+        while entry.questions and len(questions) < count:
+            questions.append(entry.questions.popleft())
+        entry.pool_hits += len(questions)
+
+        missing = count - len(questions)
+        if missing:
+            questions.extend(await asyncio.gather(*(self._generate_now(entry, i) for i in range(missing))))
+        self._maybe_refill(entry)
+        return questions
+
+    def prewarm(self, topics: list):
+        for topic in topics:
+            self._maybe_refill(self._get_topic(topic))
+
+    def stats(self) -> dict:
+        return {
+            "low_water": self.low_water,
+            "high_water": self.high_water,
+            "topics": {
+                key: {
+                    "ready": len(entry.questions),
+                    "served": entry.served,
+                    "pool_hits": entry.pool_hits,
+                    "duplicates_dropped": entry.duplicates_dropped,
+                    "refilling": bool(entry.refill_task and not entry.refill_task.done()),
+                }
+                for key, entry in self._topics.items()
+            },
+        }
+
+    async def close(self):
+        tasks = [e.refill_task for e in self._topics.values() if e.refill_task and not e.refill_task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+question_pool = QuestionPool()
@@ -0,0 +1,281 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+import sqlite3
+
+from services.supabase_auth import authenticated_user
+
+# Persists /analyze and /roadmap results to the Supabase tables (resume_analyses, career_roadmaps,
+# user_activity) so a revisit can be served from storage instead of regenerating.
+# Writes go through a background batched writer; requests never wait on the database.
+RESULT_STORE_URL = os.getenv("RESULT_STORE_URL", "")  # postgresql://... or sqlite:///results.sqlite3; empty disables
+RESULT_STORE_BATCH_SIZE = int(os.getenv("RESULT_STORE_BATCH_SIZE", "50"))
+RESULT_STORE_FLUSH_INTERVAL = float(os.getenv("RESULT_STORE_FLUSH_INTERVAL", "1.0"))  # seconds
+RESULT_STORE_MAX_PENDING = int(os.getenv("RESULT_STORE_MAX_PENDING", "1000"))  # rows; more are dropped
+
+TABLES = {
+    "resume_analyses": ("id", "user_id", "file_name", "job_description", "ats_score", "analysis_result", "input_hash"),
+    "career_roadmaps": ("id", "user_id", "current_role", "target_role", "skills", "roadmap_data", "input_hash"),
+    "user_activity": ("id", "user_id", "activity_type", "metadata"),
+}
+JSON_COLUMNS = {"analysis_result", "roadmap_data", "metadata"}
+
+# Tables as created by supabase/03-05 (+11), minus the auth.users foreign keys and RLS
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_analyses (
+    id TEXT PRIMARY KEY, user_id TEXT NOT NULL, file_name TEXT NOT NULL, job_description TEXT,
+    ats_score INTEGER, analysis_result TEXT, input_hash TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE INDEX IF NOT EXISTS resume_analyses_user_input_hash_idx ON resume_analyses(user_id, input_hash, created_at);
+CREATE TABLE IF NOT EXISTS career_roadmaps (
+    id TEXT PRIMARY KEY, user_id TEXT NOT NULL, "current_role" TEXT NOT NULL, "target_role" TEXT NOT NULL,
+    skills TEXT, roadmap_data TEXT, input_hash TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE INDEX IF NOT EXISTS career_roadmaps_user_input_hash_idx ON career_roadmaps(user_id, input_hash, created_at);
+CREATE TABLE IF NOT EXISTS user_activity (
+    id TEXT PRIMARY KEY, user_id TEXT NOT NULL, activity_type TEXT NOT NULL, metadata TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+"""
+
+
+def current_user_id():
+    """
+    The request's verified Supabase user id (from its access token), or None for anonymous requests,
+    which are not stored: every table requires a user_id.
+    """
+    return authenticated_user.get()
+
+
+def _columns(table: str) -> str:
+    # "current_role" / "target_role" are reserved words in Postgres
+    return ", ".join(f'"{c}"' for c in TABLES[table])
+
+
+def _decode(row: dict) -> dict:
+    for column in JSON_COLUMNS & row.keys():
+        if isinstance(row[column], str):
+            row[column] = json.loads(row[column])
+    for column in ("id", "user_id", "created_at"):
+        if row.get(column) is not None:
+            row[column] = str(row[column])
+    return row
+
+
+class SQLiteBackend:
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.executescript(SQLITE_SCHEMA)
+        return self._db
+
+    def _write(self, table: str, rows: list):
+        placeholders = ", ".join("?" for _ in TABLES[table])
+        db = self._conn()
+        db.executemany(
+            f"INSERT OR IGNORE INTO {table} ({_columns(table)}) VALUES ({placeholders})",
+            [tuple(json.dumps(r.get(c)) if c in JSON_COLUMNS else r.get(c) for c in TABLES[table]) for r in rows],
+        )
+        db.commit()
+
+    def _fetch(self, table: str, where: dict):
+        clause = " AND ".join(f'"{c}" = ?' for c in where)
+        row = self._conn().execute(
+            f"SELECT {_columns(table)}, created_at FROM {table} WHERE {clause} ORDER BY created_at DESC LIMIT 1",
+            tuple(where.values()),
+        ).fetchone()
+        return _decode(dict(row)) if row else None
+
+    async def start(self):
+        await asyncio.to_thread(self._conn)
+
+    async def write(self, table: str, rows: list):
+        await asyncio.to_thread(self._write, table, rows)
+
+    async def fetch(self, table: str, where: dict):
+        return await asyncio.to_thread(self._fetch, table, where)
+
+    async def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+class PostgresBackend:
+    """
+    Writes to the Supabase tables over a direct Postgres connection (asyncpg). Connect with a role that
+    bypasses RLS, e.g. the service role's connection string; the backend scopes every read to one user itself.
+    """
+    name = "postgres"
+    CASTS = {"id": "::uuid", "user_id": "::uuid", "analysis_result": "::jsonb", "roadmap_data": "::jsonb", "metadata": "::jsonb"}
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._pool = None
+
+    async def start(self):
+        try:
+            import asyncpg
+        except ImportError:
+            raise RuntimeError("RESULT_STORE_URL points at Postgres but asyncpg is not installed (pip install asyncpg)")
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+
+    async def write(self, table: str, rows: list):
+        columns = TABLES[table]
+        placeholders = ", ".join(f"${i}{self.CASTS.get(c, '')}" for i, c in enumerate(columns, start=1))
+        async with self._pool.acquire() as conn:
+            await conn.executemany(
+                f"INSERT INTO public.{table} ({_columns(table)}) VALUES ({placeholders}) ON CONFLICT (id) DO NOTHING",
+                [tuple(json.dumps(r.get(c)) if c in JSON_COLUMNS else r.get(c) for c in columns) for r in rows],
+            )
+
+    async def fetch(self, table: str, where: dict):
+        clause = " AND ".join(f'"{c}" = ${i}{self.CASTS.get(c, "")}' for i, c in enumerate(where, start=1))
+        async with self._pool.acquire() as conn:
+            row = await conn.fetchrow(
+                f"SELECT {_columns(table)}, created_at FROM public.{table} WHERE {clause} ORDER BY created_at DESC LIMIT 1",
+                *where.values(),
+            )
+        return _decode(dict(row)) if row else None
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def backend_for(url: str):
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("postgres://", "postgresql://")):
+        return PostgresBackend(url)
+    raise ValueError(f"Unsupported RESULT_STORE_URL: {url}")
+
+
+class ResultStore:
+    def __init__(self, url: str = RESULT_STORE_URL, batch_size: int = RESULT_STORE_BATCH_SIZE,
+                 flush_interval: float = RESULT_STORE_FLUSH_INTERVAL, max_pending: int = RESULT_STORE_MAX_PENDING):
+        self.backend = backend_for(url) if url else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue = None
+        self._pending = {}  # id -> (table, row), readable before the write lands
+        self._writer = None
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "dropped": 0, "failed": 0, "hits": 0, "misses": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def start(self):
+        if not self.enabled:
+            return
+        await self.backend.start()
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._writer:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+            # Rows still queued (or in a batch the writer was cancelled in) are written before shutdown;
+            # inserts ignore ids that already landed
+            await self._flush(list(self._pending.values()))
+        if self.enabled:
+            await self.backend.close()
+
+    def save(self, table: str, row: dict):
+        """
+        Queues a row for the background writer and returns its id. Returns None if the store is
+        disabled or the backlog is full (the result is simply not persisted).
+        """
+        if not self.enabled or self._queue is None:
+            return None
+        if len(self._pending) >= self.max_pending:
+            self._stats["dropped"] += 1
+            print(f"Result store backlog full, dropping {table} row")
+            return None
+        row = {**row, "id": row.get("id") or str(uuid.uuid4())}
+        self._pending[row["id"]] = (table, row)
+        self._queue.put_nowait((table, row))
+        self._stats["queued"] += 1
+        return row["id"]
+
+    async def _lookup(self, table: str, where: dict):
+        for pending_table, row in reversed(list(self._pending.values())):
+            if pending_table == table and all(row.get(k) == v for k, v in where.items()):
+                return _decode(dict(row))
+        try:
+            return await self.backend.fetch(table, where)
+        except Exception as e:
+            print(f"Result store lookup failed: {e}")
+            return None
+
+    async def get(self, table: str, result_id: str, user_id: str):
+        if not self.enabled or not user_id:
+            return None
+        try:
+            result_id = str(uuid.UUID(result_id))
+        except ValueError:
+            return None
+        return await self._lookup(table, {"id": result_id, "user_id": user_id})
+
+    async def find(self, table: str, input_hash: str, user_id: str):
+        """
+        The user's most recent stored result for these inputs, or None.
+        """
+        if not self.enabled or not user_id:
+            return None
+        row = await self._lookup(table, {"user_id": user_id, "input_hash": input_hash})
+        self._stats["hits" if row else "misses"] += 1
+        return row
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        by_table = {}
+        for table, row in batch:
+            by_table.setdefault(table, []).append(row)
+        for table, rows in by_table.items():
+            try:
+                await self.backend.write(table, rows)
+                self._stats["written"] += len(rows)
+            except Exception as e:
+                self._stats["failed"] += len(rows)
+                print(f"Result store write to {table} failed ({len(rows)} rows): {e}")
+            for row in rows:
+                self._pending.pop(row["id"], None)
+        self._stats["batches"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name if self.enabled else None,
+            "pending": len(self._pending),
+            **self._stats,
+        }
+
+
+result_store = ResultStore()
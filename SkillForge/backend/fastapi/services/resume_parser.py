@@ -1,16 +1,143 @@
-import pdfplumber
+import io
+import os
+import asyncio
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor
 
-def parse_resume(file_path: str) -> str:
+from services.tracing import span
+
+# Limits that keep a single upload from monopolizing memory or a worker
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+MAX_RESUME_PAGES = int(os.getenv("MAX_RESUME_PAGES", "20"))
+MAX_RESUME_CHARS = int(os.getenv("MAX_RESUME_CHARS", "60000"))
+
+# "process" runs pdfplumber in a process pool so extraction uses other cores; "thread" keeps it in-process
+RESUME_PARSER_MODE = os.getenv("RESUME_PARSER_MODE", "process")
+RESUME_PARSER_WORKERS = int(os.getenv("RESUME_PARSER_WORKERS", "4"))
+# Extracted text is cached by SHA-256 of the PDF bytes
+PARSED_RESUME_CACHE_SIZE = int(os.getenv("PARSED_RESUME_CACHE_SIZE", "256"))
+
+_executor = None
+_parsed = OrderedDict()  # sha256 -> text
+_in_flight = {}  # sha256 -> Future, so concurrent uploads of one file parse it once
+_stats = {"hits": 0, "misses": 0}
+
+
+class ResumeTooLarge(ValueError):
+    pass
+
+
+def parse_resume(source) -> str:
     """
-    Extracts text from a PDF file using pdfplumber.
+    Extracts text from a PDF using pdfplumber.
+    source can be a file path or a seekable binary file object (e.g. an upload's spooled file).
+    Stops after MAX_RESUME_PAGES pages or MAX_RESUME_CHARS characters.
     """
-    text = ""
+    # Imported on first use: pdfplumber (with pdfminer) is the slowest import in the app, and in
+    # "process" mode only the parser workers ever need it
+    import pdfplumber
+
+    parts = []
+    total = 0
     try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
+        with pdfplumber.open(source) as pdf:
+            for page in pdf.pages[:MAX_RESUME_PAGES]:
+                page_text = page.extract_text() or ""
+                # Drop the page's cached layout objects before moving on
+                page.close()
+                parts.append(page_text)
+                total += len(page_text)
+                if total >= MAX_RESUME_CHARS:
+                    break
     except Exception as e:
         print(f"Error parsing PDF: {e}")
         return ""
-    
-    return text.strip()
+
+    return "\n".join(parts)[:MAX_RESUME_CHARS].strip()
+
+
+def parse_resume_bytes(data: bytes) -> str:
+    """
+    Process-pool entry point: bytes pickle cheaply, file objects do not.
+    """
+    return parse_resume(io.BytesIO(data))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        if RESUME_PARSER_MODE == "process":
+            # spawn, not fork: the parent runs an event loop and worker threads
+            _executor = ProcessPoolExecutor(
+                max_workers=RESUME_PARSER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=RESUME_PARSER_WORKERS, thread_name_prefix="resume-parser")
+    return _executor
+
+
+async def read_upload(upload) -> bytes:
+    """
+    Reads an UploadFile into memory, refusing anything over MAX_RESUME_BYTES.
+    UploadFile's async API does the read in a worker thread once the spooled file has moved to disk.
+    """
+    await upload.seek(0)
+    data = await upload.read(MAX_RESUME_BYTES + 1)
+    if len(data) > MAX_RESUME_BYTES:
+        raise ResumeTooLarge(f"Resume exceeds {MAX_RESUME_BYTES // (1024 * 1024)} MB limit.")
+    return data
+
+
+async def parse_resume_data(data: bytes) -> str:
+    """
+    Returns the extracted text for a PDF, parsing it in the worker pool only the first time these bytes are seen.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in _parsed:
+        _parsed.move_to_end(digest)
+        _stats["hits"] += 1
+        return _parsed[digest]
+
+    if digest in _in_flight:
+        _stats["hits"] += 1
+        return await asyncio.shield(_in_flight[digest])
+
+    _stats["misses"] += 1
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_get_executor(), parse_resume_bytes, data)
+    _in_flight[digest] = future
+    try:
+        with span("resume.parse"):
+            text = await asyncio.shield(future)
+    except BrokenExecutor:
+        # A worker died (e.g. OOM on a hostile PDF); start a fresh pool for the next request
+        shutdown()
+        raise
+    finally:
+        _in_flight.pop(digest, None)
+
+    # Empty text means pdfplumber failed; let a retry try again
+    if text:
+        _parsed[digest] = text
+        while len(_parsed) > PARSED_RESUME_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    return text
+
+
+def stats() -> dict:
+    return {
+        "mode": RESUME_PARSER_MODE,
+        "workers": RESUME_PARSER_WORKERS,
+        "cached": len(_parsed),
+        **_stats,
+    }
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
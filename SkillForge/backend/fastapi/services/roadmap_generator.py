@@ -1,20 +1,19 @@
-import requests
-import json
+from services.model_router import model_for
+from services.llm_cache import cached, Fallback
+from services.scheduler import SchedulerRejected
+from services.json_repair import generate_json
+from services.llm_schemas import Roadmap
+from services.json_stream import stream_json_events, replay_events
+from services.tracing import traced
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
-DEFAULT_MODEL = "llama3.2"
+DEFAULT_MODEL = model_for("roadmap")  # override with MODEL_ROADMAP
 
-def generate_roadmap(current_role: str, target_role: str, skills: str, model: str = DEFAULT_MODEL) -> dict:
-    """
-    Generates a career roadmap from current_role to target_role using a local LLM via Ollama.
-    Returns a dictionary with a list of steps.
-    """
-    
+def _roadmap_payload(current_role: str, target_role: str, skills: str, model: str) -> dict:
     prompt = f"""
     You are an expert Career Coach and Mentor.
     Create a detailed, step-by-step career roadmap for a user wanting to go from {current_role} to {target_role}.
     The user currently has these skills: {skills}.
-    
+
     Provide the output in the following JSON format ONLY. Do not include any other text or markdown formatting outside the JSON.
     {{
         "roadmap": [
@@ -29,38 +28,66 @@ def generate_roadmap(current_role: str, target_role: str, skills: str, model: st
         ]
     }}
     """
-    
-    payload = {
+
+    return {
         "model": model,
         "prompt": prompt,
         "stream": False,
         "format": "json"
     }
-    
+
+def _fallback_roadmap(e: Exception) -> dict:
+    return Fallback({
+        "roadmap": [
+            {
+                "step_number": 1,
+                "title": "Error",
+                "description": f"Failed to generate roadmap. Ensure Ollama is running. Error: {str(e)}",
+                "resources": [],
+                "estimated_time": "0 weeks"
+            }
+        ]
+    })
+
+@cached("roadmap", similar=("current_role", "target_role", "skills"))
+@traced("roadmap")
+async def generate_roadmap(current_role: str, target_role: str, skills: str, model: str = DEFAULT_MODEL) -> dict:
+    """
+    Generates a career roadmap from current_role to target_role using a local LLM via Ollama.
+    Returns a dictionary with a list of steps.
+    """
+    payload = _roadmap_payload(current_role, target_role, skills, model)
+
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        
-        ai_output = result.get("response", "{}")
-        
-        if "```json" in ai_output:
-            ai_output = ai_output.split("```json")[1].split("```")[0]
-        elif "```" in ai_output:
-             ai_output = ai_output.split("```")[1].split("```")[0]
-             
-        return json.loads(ai_output)
-        
+        return await generate_json(payload, Roadmap)
+
+    except SchedulerRejected:
+        raise
     except Exception as e:
         print(f"Error querying Ollama: {e}")
-        return {
-            "roadmap": [
-                {
-                    "step_number": 1,
-                    "title": "Error",
-                    "description": f"Failed to generate roadmap. Ensure Ollama is running. Error: {str(e)}",
-                    "resources": [],
-                    "estimated_time": "0 weeks"
-                }
-            ]
-        }
+        return _fallback_roadmap(e)
+
+@traced("roadmap.stream")
+async def stream_roadmap(current_role: str, target_role: str, skills: str, model: str = DEFAULT_MODEL, bypass_cache: bool = False):
+    """
+    Streaming variant of generate_roadmap.
+    Yields {"type": "item", "key": "roadmap", "value": <step>} as each step completes,
+    then {"type": "done", "result": <full roadmap>}.
+    """
+    if not bypass_cache:
+        hit = await generate_roadmap.cache_get(current_role, target_role, skills, model)
+        if hit is not None:
+            for event in replay_events(hit):
+                yield event
+            yield {"type": "done", "result": hit}
+            return
+
+    try:
+        async for event in stream_json_events(_roadmap_payload(current_role, target_role, skills, model), Roadmap):
+            if event["type"] == "done":
+                await generate_roadmap.cache_set(event["result"], current_role, target_role, skills, model)
+            yield event
+    except Exception as e:
+        print(f"Error streaming roadmap: {e}")
+        yield {"type": "error", "detail": str(e)}
+        yield {"type": "done", "result": _fallback_roadmap(e)}
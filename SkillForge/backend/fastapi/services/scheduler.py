@@ -0,0 +1,240 @@
+import os
+import time
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from services.metrics import OLLAMA_QUEUE_SECONDS
+from services.tracing import span
+
+# Priority scheduler in front of Ollama.
+# Interactive requests (Yuvi hints, game rounds) jump ahead of heavy generations; within a priority
+# class, users take turns so one user's burst cannot starve everyone else.
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "16"))  # Ollama calls in flight at once
+SCHEDULER_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", "64"))  # waiting calls across all classes
+SCHEDULER_MAX_QUEUED_PER_USER = int(os.getenv("SCHEDULER_MAX_QUEUED_PER_USER", "8"))
+
+# Highest priority first
+PRIORITY_CLASSES = ("interactive", "standard", "heavy", "background")
+
+# Seconds a call may wait for a slot before it is rejected with 503; 0 waits indefinitely.
+# Override with SCHEDULER_MAX_WAIT_<CLASS>.
+DEFAULT_MAX_WAIT = {
+    "interactive": 10,
+    "standard": 30,
+    "heavy": 60,
+    "background": 0,
+}
+
+ROUTE_PRIORITIES = {
+    "/dsa/yuvi": "interactive",
+    "/dsa/yuvi/stream": "interactive",
+    "/game/generate": "interactive",
+    "/game/generate/batch": "interactive",
+    "/dsa/generate": "interactive",
+    "/analyze": "standard",
+    "/roadmap": "standard",
+    "/roadmap/stream": "standard",
+    "/generate-portfolio": "heavy",
+    "/linkedin/generate": "heavy",
+    "/linkedin/generate/stream": "heavy",
+    "/analyze/batch": "background",
+}
+
+DEFAULT_PRIORITY = "standard"
+
+request_priority = contextvars.ContextVar("request_priority", default=DEFAULT_PRIORITY)
+request_user = contextvars.ContextVar("request_user", default="anonymous")
+
+
+def max_wait_for(priority: str) -> float:
+    return float(os.getenv(f"SCHEDULER_MAX_WAIT_{priority.upper()}", DEFAULT_MAX_WAIT[priority]))
+
+
+def priority_for_path(path: str):
+    return ROUTE_PRIORITIES.get(path.rstrip("/") or "/")
+
+
+class SchedulerRejected(HTTPException):
+    """
+    Raised instead of queueing when the scheduler cannot serve a call in time.
+    429 for a user over their own queue limit, 503 when the server as a whole is saturated.
+    """
+
+    def __init__(self, status_code: int, detail: str, retry_after: int = 5):
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+
+
+class _Waiter:
+    __slots__ = ("user", "future", "enqueued_at")
+
+    def __init__(self, user: str):
+        self.user = user
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+
+
+class _ClassStats:
+    def __init__(self):
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "user_limit": 0, "deadline": 0}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self, queued: int) -> dict:
+        return {
+            "queued": queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_wait_ms": round(1000 * self.total_wait / self.admitted, 1) if self.admitted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 1),
+        }
+
+
+class Scheduler:
+    def __init__(
+        self,
+        capacity: int = OLLAMA_MAX_CONCURRENCY,
+        max_queue: int = SCHEDULER_MAX_QUEUE,
+        max_per_user: int = SCHEDULER_MAX_QUEUED_PER_USER,
+    ):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.in_flight = 0
+        # priority -> user -> deque of waiters; users rotate round-robin within a class
+        self._queues = {p: OrderedDict() for p in PRIORITY_CLASSES}
+        self._queued = 0
+        self._queued_by_user = {}
+        self._stats = {p: _ClassStats() for p in PRIORITY_CLASSES}
+
+    def _reject(self, priority: str, reason: str, status_code: int, detail: str):
+        self._stats[priority].rejected[reason] += 1
+        raise SchedulerRejected(status_code, detail)
+
+    def check_admission(self, priority: str = None, user: str = None):
+        """
+        Rejects up front when a call would be refused on arrival, so streaming endpoints
+        can answer 429/503 before the response starts.
+        """
+        priority = priority or request_priority.get()
+        user = user or request_user.get()
+        if priority == "background" or (self.in_flight < self.capacity and not self._queued):
+            # Background work is bounded by its own concurrency settings and simply waits its turn
+            return
+        if self._queued_by_user.get(user, 0) >= self.max_per_user:
+            self._reject(priority, "user_limit", 429, "Too many queued AI requests for this user; retry shortly.")
+        if self._queued >= self.max_queue:
+            self._reject(priority, "queue_full", 503, "The AI model is busy; retry shortly.")
+
+    def _enqueue(self, priority: str, waiter: _Waiter):
+        self._queues[priority].setdefault(waiter.user, deque()).append(waiter)
+        self._queued += 1
+        self._queued_by_user[waiter.user] = self._queued_by_user.get(waiter.user, 0) + 1
+
+    def _forget(self, priority: str, waiter: _Waiter) -> bool:
+        users = self._queues[priority]
+        waiters = users.get(waiter.user)
+        if not waiters or waiter not in waiters:
+            return False
+        waiters.remove(waiter)
+        if not waiters:
+            del users[waiter.user]
+        self._queued -= 1
+        self._queued_by_user[waiter.user] -= 1
+        if not self._queued_by_user[waiter.user]:
+            del self._queued_by_user[waiter.user]
+        return True
+
+    def _next_waiter(self):
+        for priority in PRIORITY_CLASSES:
+            users = self._queues[priority]
+            if users:
+                user, waiters = next(iter(users.items()))
+                waiter = waiters[0]
+                self._forget(priority, waiter)
+                if user in users:
+                    users.move_to_end(user)  # this user goes to the back of the rotation
+                return priority, waiter
+        return None, None
+
+    def _dispatch(self):
+        while self.in_flight < self.capacity:
+            priority, waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            self.in_flight += 1
+            self._admitted(priority, waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _admitted(self, priority: str, enqueued_at: float):
+        stats = self._stats[priority]
+        waited = time.monotonic() - enqueued_at
+        stats.admitted += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        OLLAMA_QUEUE_SECONDS.observe(waited, priority=priority)
+
+    def _release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    async def acquire(self, priority: str = None, user: str = None):
+        with span("ollama.queue"):
+            await self._acquire(priority, user)
+
+    async def _acquire(self, priority: str = None, user: str = None):
+        priority = priority or request_priority.get()
+        user = user or request_user.get()
+        if self.in_flight < self.capacity and not self._queued:
+            self.in_flight += 1
+            self._admitted(priority, time.monotonic())
+            return
+
+        self.check_admission(priority, user)
+        waiter = _Waiter(user)
+        self._enqueue(priority, waiter)
+        max_wait = max_wait_for(priority)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max_wait or None)
+        except asyncio.TimeoutError:
+            if self._forget(priority, waiter):
+                self._reject(priority, "deadline", 503, f"The AI model queue did not free up within {max_wait:g}s; retry shortly.")
+            # Granted in the same tick the deadline fired; keep the slot
+        except BaseException:
+            # Caller cancelled (e.g. the client disconnected) while queued or right after being granted
+            if not self._forget(priority, waiter) and waiter.future.done():
+                self._release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, priority: str = None, user: str = None):
+        """
+        Holds one Ollama slot for the duration of the block, waiting by priority class and per-user turn.
+        """
+        await self.acquire(priority, user)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "queued": self._queued,
+            "max_queue": self.max_queue,
+            "max_queued_per_user": self.max_per_user,
+            "classes": {
+                priority: self._stats[priority].as_dict(sum(len(w) for w in self._queues[priority].values()))
+                for priority in PRIORITY_CLASSES
+            },
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,161 @@
+import os
+import re
+import json
+import time
+import itertools
+from collections import OrderedDict
+
+from services.text_vectors import vectorize, cosine, MinHashLSH
+
+# Near-duplicate tier behind the exact LLM cache. "frontend dev -> ML engineer, skills: python, react" and
+# "Frontend Developer -> ML Engineer, skills: React, Python" hash differently but are the same request:
+# inputs are normalized (case, common abbreviations, order of comma-separated lists), turned into n-gram
+# vectors, and a stored result is reused when every compared input is at least the service's threshold
+# similar. Candidates come from a MinHash LSH index, so lookups do not scan every entry.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))  # per service, least recently used evicted
+
+# Minimum cosine similarity per compared input. Override with SEMANTIC_CACHE_THRESHOLD_<SERVICE>.
+DEFAULT_THRESHOLDS = {
+    "roadmap": 0.9,
+    "yuvi": 0.85,
+    "portfolio": 0.97,  # a resume that differs in more than a line or two is someone else's portfolio
+}
+
+ABBREVIATIONS = {
+    "dev": "developer", "devs": "developers", "eng": "engineer", "engr": "engineer", "swe": "software engineer",
+    "sde": "software development engineer", "sr": "senior", "jr": "junior", "mgr": "manager", "pm": "product manager",
+    "ml": "machine learning", "ai": "artificial intelligence", "ds": "data science", "qa": "quality assurance",
+    "js": "javascript", "ts": "typescript", "k8s": "kubernetes", "db": "database", "ui": "user interface",
+    "ux": "user experience", "dsa": "data structures and algorithms", "ds&a": "data structures and algorithms",
+    "whats": "what is", "hows": "how is", "dont": "do not", "cant": "cannot", "im": "i am",
+}
+
+
+def threshold_for(service: str) -> float:
+    return float(os.getenv(f"SEMANTIC_CACHE_THRESHOLD_{service.upper()}", DEFAULT_THRESHOLDS.get(service, 0.9)))
+
+
+def normalize(value) -> str:
+    """
+    Canonical text for comparison: lower case, "front-end" -> "frontend", abbreviations spelled out,
+    and comma-separated lists sorted and de-duplicated.
+    """
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True)
+    text = value.lower().replace("'", "")
+    text = re.sub(r"\b(front|back|full)[\s_-]+(end|stack)\b", r"\1\2", text)
+    if "," in text:
+        return ", ".join(sorted({normalize(item) for item in text.split(",") if item.strip()}))
+    return " ".join(ABBREVIATIONS.get(word, word) for word in re.findall(r"[a-z0-9+#&]+", text))
+
+
+class _Entry:
+    __slots__ = ("key", "scope", "vectors", "result", "expires_at")
+
+    def __init__(self, key: str, scope: str, vectors: dict, result: str, expires_at: float):
+        self.key = key
+        self.scope = scope
+        self.vectors = vectors
+        self.result = result
+        self.expires_at = expires_at
+
+
+class _ServiceIndex:
+    def __init__(self):
+        self.entries = OrderedDict()  # id -> _Entry, least recently used first
+        self.ids = {}  # scope + normalized fields -> id, so a refresh replaces its entry
+        self.lsh = MinHashLSH()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "expired": 0}
+        self.hit_similarity = 0.0  # sum over hits, for the average
+
+
+def _features(vectors: dict) -> list:
+    # Prefix each feature with its input's name so "skills: python" never matches "target: python"
+    return [f"{name}:{gram}" for name, vector in vectors.items() for gram in vector]
+
+
+class SemanticCache:
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._services = {}
+        self._ids = itertools.count()
+
+    def _index(self, service: str) -> _ServiceIndex:
+        index = self._services.get(service)
+        if index is None:
+            index = self._services[service] = _ServiceIndex()
+        return index
+
+    def _drop(self, index: _ServiceIndex, entry_id):
+        entry = index.entries.pop(entry_id)
+        index.ids.pop(entry.key, None)
+        index.lsh.remove(entry_id)
+
+    def lookup(self, service: str, scope: str, fields: dict):
+        """
+        A stored result for the same scope (the inputs that must match exactly, as a key) whose fields
+        are each at least threshold_for(service) similar to these, or None.
+        """
+        if not SEMANTIC_CACHE_ENABLED:
+            return None
+        index = self._index(service)
+        vectors = {name: vectorize(normalize(value)) for name, value in fields.items()}
+        threshold = threshold_for(service)
+        now = time.time()
+        best_id, best_score = None, threshold
+        for entry_id in index.lsh.candidates(_features(vectors)):
+            entry = index.entries[entry_id]
+            if entry.expires_at <= now:
+                self._drop(index, entry_id)
+                index.stats["expired"] += 1
+                continue
+            if entry.scope != scope:
+                continue
+            score = min(cosine(vectors[name], entry.vectors.get(name, {})) for name in vectors)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+        if best_id is None:
+            index.stats["misses"] += 1
+            return None
+        index.entries.move_to_end(best_id)
+        index.stats["hits"] += 1
+        index.hit_similarity += best_score
+        return json.loads(index.entries[best_id].result)
+
+    def store(self, service: str, scope: str, fields: dict, result, ttl: float):
+        if not SEMANTIC_CACHE_ENABLED:
+            return
+        index = self._index(service)
+        normalized = {name: normalize(value) for name, value in fields.items()}
+        key = json.dumps([scope, normalized], sort_keys=True)
+        if key in index.ids:
+            self._drop(index, index.ids[key])
+        vectors = {name: vectorize(text) for name, text in normalized.items()}
+        entry_id = next(self._ids)
+        index.entries[entry_id] = _Entry(key, scope, vectors, json.dumps(result), time.time() + ttl)
+        index.ids[key] = entry_id
+        index.lsh.add(entry_id, _features(vectors))
+        index.stats["stored"] += 1
+        while len(index.entries) > self.max_entries:
+            self._drop(index, next(iter(index.entries)))
+            index.stats["evicted"] += 1
+
+    def clear(self):
+        self._services.clear()
+
+    def stats(self) -> dict:
+        services = {}
+        for service, index in self._services.items():
+            lookups = index.stats["hits"] + index.stats["misses"]
+            services[service] = {
+                "entries": len(index.entries),
+                "threshold": threshold_for(service),
+                **index.stats,
+                "hit_rate": round(index.stats["hits"] / lookups, 4) if lookups else 0.0,
+                "avg_hit_similarity": round(index.hit_similarity / index.stats["hits"], 4) if index.stats["hits"] else None,
+            }
+        return {"enabled": SEMANTIC_CACHE_ENABLED, "max_entries": self.max_entries, "services": services}
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,90 @@
+import os
+import copy
+import asyncio
+import inspect
+import functools
+
+from services.llm_cache import make_key
+
+# In-flight deduplication: concurrent identical generations share one upstream Ollama call.
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "1") == "1"
+MAX_VARIANTS = int(os.getenv("SINGLE_FLIGHT_MAX_VARIANTS", "5"))
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}  # key -> asyncio.Task
+        self._stats = {}
+
+    def _count(self, service: str, field: str):
+        counters = self._stats.setdefault(service, {"leaders": 0, "followers": 0})
+        counters[field] += 1
+
+    async def do(self, service: str, key: str, factory):
+        """
+        Runs factory() once per key at a time; callers arriving while it runs await the same task.
+        The task is shielded, so one caller disconnecting does not cancel the others' result.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(service, "followers")
+            # Followers get their own copy so no caller can mutate another's response
+            return copy.deepcopy(await asyncio.shield(task))
+
+        self._count(service, "leaders")
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def close(self):
+        # Shielded flights outlive their callers; stop them before the Ollama client is closed under them
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        services = {}
+        for service, counters in self._stats.items():
+            calls = counters["leaders"] + counters["followers"]
+            services[service] = {
+                **counters,
+                "coalesced_rate": round(counters["followers"] / calls, 4) if calls else 0.0,
+            }
+        return {"enabled": SINGLE_FLIGHT_ENABLED, "in_flight": len(self._inflight), "services": services}
+
+
+single_flight = SingleFlight()
+
+
+def coalesced(service: str):
+    """
+    Shares one in-flight call of an async generator function between concurrent callers with the same
+    bound arguments. Callers that want distinct outputs pass variant=<n>: each variant is its own flight,
+    so N concurrent requests for variants 0..N-1 still produce N generations (and identical fan-outs share them).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, variant=0, **kwargs):
+            if not SINGLE_FLIGHT_ENABLED:
+                return await func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = make_key(service, {**bound.arguments, "_variant": variant})
+            return await single_flight.do(service, key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+async def fan_out(func, count: int, *args, **kwargs) -> list:
+    """
+    Runs count distinct variants of a coalesced generation concurrently.
+    """
+    if not 1 <= count <= MAX_VARIANTS:
+        raise ValueError(f"variants must be between 1 and {MAX_VARIANTS}.")
+    return list(await asyncio.gather(*(func(*args, variant=i, **kwargs) for i in range(count))))
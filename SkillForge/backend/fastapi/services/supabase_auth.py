@@ -0,0 +1,57 @@
+import os
+import hmac
+import json
+import time
+import uuid
+import base64
+import hashlib
+from contextvars import ContextVar
+
+# Verifies the Supabase access token the frontend sends as "Authorization: Bearer <jwt>".
+# Stored results are keyed on the verified user id only: X-User-Id is client-chosen, so it is used for
+# scheduler fairness but never to read or write a user's data (the result store's Postgres connection
+# bypasses RLS, so this check is the only thing scoping rows to their owner).
+# Tokens are checked against the project's JWT secret (HS256; Project Settings -> API -> JWT Secret).
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWT_LEEWAY = float(os.getenv("SUPABASE_JWT_LEEWAY", "30"))  # seconds of clock skew allowed on exp
+
+# The verified Supabase user id of the request being served, or None
+authenticated_user = ContextVar("authenticated_user", default=None)
+
+
+def _b64decode(part: str) -> bytes:
+    return base64.urlsafe_b64decode(part + "=" * (-len(part) % 4))
+
+
+def verify_access_token(token: str):
+    """
+    The user id (sub) of a valid, unexpired Supabase access token, or None.
+    """
+    if not SUPABASE_JWT_SECRET or not token:
+        return None
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        if header.get("alg") != "HS256":
+            return None
+        expected = hmac.new(SUPABASE_JWT_SECRET.encode(), f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+            return None
+        claims = json.loads(_b64decode(payload_b64))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(claims, dict) or float(claims.get("exp", 0)) + SUPABASE_JWT_LEEWAY < time.time():
+        return None
+    audience = claims.get("aud")
+    if SUPABASE_JWT_AUDIENCE and SUPABASE_JWT_AUDIENCE not in (audience if isinstance(audience, list) else [audience]):
+        return None
+    try:
+        return str(uuid.UUID(str(claims.get("sub", ""))))
+    except ValueError:
+        return None
+
+
+def user_from_authorization(value: str):
+    scheme, _, token = (value or "").partition(" ")
+    return verify_access_token(token.strip()) if scheme.lower() == "bearer" else None
@@ -0,0 +1,98 @@
+import re
+import math
+import struct
+import hashlib
+from collections import Counter
+
+# Pure-Python text similarity for short texts (problem statements, prompts): sparse n-gram vectors
+# compared by cosine, and a MinHash LSH index that finds likely-similar entries without comparing
+# against every one. No embedding model or numpy needed.
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")  # keeps "c++" and "c#" apart from "c"
+
+
+def _stem(word: str) -> str:
+    # Plural folding only: "arrays" -> "array", "queries" -> "query"; "class" stays
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def ngrams(text: str) -> Counter:
+    """
+    Word unigrams and bigrams, plus character trigrams of each word (padded, so "graph" and "graphing"
+    still share most of their features).
+    """
+    words = [_stem(w) for w in _WORD_RE.findall(text.lower())]
+    grams = Counter(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f" {word} "
+        grams.update(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return grams
+
+
+def vectorize(text: str) -> dict:
+    """
+    L2-normalized sparse n-gram vector: {feature: weight}.
+    """
+    grams = ngrams(text)
+    norm = math.sqrt(sum(count * count for count in grams.values()))
+    return {gram: count / norm for gram, count in grams.items()} if norm else {}
+
+
+def cosine(a: dict, b: dict) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(gram, 0.0) for gram, weight in a.items())
+
+
+class MinHashLSH:
+    """
+    Locality-sensitive index over feature sets. Entries whose sets overlap a lot share a bucket with
+    high probability, so candidates() returns likely near-duplicates without a full scan; callers
+    confirm them with cosine(). Pairs with Jaccard similarity above about (1 / bands) ** (1 / rows) are found.
+    """
+
+    def __init__(self, bands: int = 20, rows: int = 3):
+        self.bands = bands
+        self.rows = rows
+        self._hashes = bands * rows
+        self._buckets = {}  # (band, band signature) -> keys
+        self._entries = {}  # key -> its buckets
+
+    def _buckets_for(self, features) -> list:
+        # One SHAKE-128 call per feature yields all of its hash values; the signature is the
+        # column-wise minimum
+        unpack = struct.Struct(f"<{self._hashes}I").unpack
+        hashes = [unpack(hashlib.shake_128(f.encode("utf-8")).digest(4 * self._hashes)) for f in features]
+        if not hashes:
+            return []
+        signature = list(map(min, zip(*hashes)))
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def add(self, key, features):
+        self.remove(key)
+        buckets = self._buckets_for(features)
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, set()).add(key)
+        self._entries[key] = buckets
+
+    def remove(self, key):
+        for bucket in self._entries.pop(key, []):
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[bucket]
+
+    def candidates(self, features) -> set:
+        found = set()
+        for bucket in self._buckets_for(features):
+            found |= self._buckets.get(bucket, set())
+        return found
+
+    def __len__(self) -> int:
+        return len(self._entries)
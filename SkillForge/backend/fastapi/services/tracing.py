@@ -0,0 +1,91 @@
+import time
+import asyncio
+import inspect
+import functools
+import contextvars
+from contextlib import contextmanager
+
+from services.llm_cache import Fallback
+from services.metrics import STAGE_SECONDS, GENERATIONS
+
+# Lightweight tracing: span() times a stage into skillforge_stage_duration_seconds and, inside an HTTP
+# request, appends it to that request's trace (returned to the client as a Server-Timing header).
+
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def start_trace() -> list:
+    trace = []
+    current_trace.set(trace)
+    return trace
+
+
+@contextmanager
+def span(stage: str):
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage, outcome=outcome)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.append((stage, elapsed))
+
+
+def server_timing(trace: list) -> str:
+    return ", ".join(f'{stage.replace(".", "-")};dur={elapsed * 1000:.1f}' for stage, elapsed in trace)
+
+
+def _outcome(result) -> str:
+    return "fallback" if isinstance(result, Fallback) else "ok"
+
+
+def traced(service: str):
+    """
+    Wraps an LLM-backed service function (coroutine or async generator) in a span and counts its
+    outcome in skillforge_generations_total: ok, fallback (a hard-coded Fallback was returned), error
+    or cancelled (the client went away mid-stream).
+    For streams, the outcome comes from the result in the final "done" event.
+    """
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def stream_wrapper(*args, **kwargs):
+                outcome = "ok"
+                try:
+                    with span(service):
+                        async for event in func(*args, **kwargs):
+                            if isinstance(event, dict) and event.get("type") == "done":
+                                outcome = _outcome(event.get("result"))
+                            yield event
+                except (GeneratorExit, asyncio.CancelledError):
+                    outcome = "cancelled"
+                    raise
+                except BaseException:
+                    outcome = "error"
+                    raise
+                finally:
+                    GENERATIONS.inc(service=service, outcome=outcome)
+            return stream_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                with span(service):
+                    result = await func(*args, **kwargs)
+            except BaseException:
+                GENERATIONS.inc(service=service, outcome="error")
+                raise
+            GENERATIONS.inc(service=service, outcome=_outcome(result))
+            return result
+        return wrapper
+
+    return decorator
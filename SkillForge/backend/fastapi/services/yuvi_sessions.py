@@ -0,0 +1,208 @@
+import os
+import re
+import time
+import uuid
+import asyncio
+import difflib
+from collections import OrderedDict
+
+from services.ollama_client import chat
+from services.prompt_budget import estimate_tokens
+from services.scheduler import request_priority
+
+# Conversation memory for Yuvi. Each session is an Ollama chat whose message prefix (persona + problem,
+# then earlier turns) stays byte-identical between turns, and every turn of a session goes to the same
+# backend, so Ollama only evaluates the new message instead of the whole prompt.
+# Follow-up turns send a diff of the user's code rather than the full code; older turns are folded into
+# a summary once the history outgrows its budget.
+YUVI_MAX_SESSIONS = int(os.getenv("YUVI_MAX_SESSIONS", "1000"))
+YUVI_SESSION_TTL = float(os.getenv("YUVI_SESSION_TTL", "3600"))  # idle seconds before a session is forgotten
+YUVI_HISTORY_BUDGET = int(os.getenv("YUVI_HISTORY_BUDGET", "2000"))  # tokens of turns kept before summarizing
+YUVI_KEEP_TURNS = int(os.getenv("YUVI_KEEP_TURNS", "2"))  # latest exchanges kept verbatim when summarizing
+
+_SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+SYSTEM_PROMPT = """You are 'Yuvi', a friendly and encouraging AI Coding Tutor.
+The user is solving this problem:
+{question}
+
+Provide helpful, concise hints or explanations.
+DO NOT give the full solution unless explicitly asked.
+Be encouraging!
+After their first message, the user sends changes to their code as a unified diff against the code they sent before."""
+
+SUMMARY_PROMPT = """Summarize this tutoring conversation in at most 150 words for the tutor's own notes:
+what the user is trying, which hints were already given, and what they still struggle with.
+Do not include code.
+
+{previous}{transcript}"""
+
+
+class YuviSession:
+    def __init__(self, session_id: str, question: str):
+        self.id = session_id
+        self.question = question
+        self.messages = []  # user/assistant turns after the system message
+        self.summary = ""
+        self.code = None  # code as the model last saw it
+        self.anchor = None  # code written into the system message at the last summarization
+        self.turns = 0
+        self.last_used = time.time()
+        self.lock = asyncio.Lock()
+        self.summarizing = False
+
+    def system_message(self) -> dict:
+        content = SYSTEM_PROMPT.format(question=self.question)
+        if self.summary:
+            content += f"\n\nSummary of the conversation so far:\n{self.summary}"
+        if self.anchor is not None:
+            content += f"\n\nThe user's code at that point:\n```\n{self.anchor}\n```"
+        return {"role": "system", "content": content}
+
+    def user_message(self, code: str, user_query: str) -> tuple:
+        """
+        Returns (message, kind) where kind is "full", "diff" or "unchanged".
+        """
+        if self.code is None:
+            kind, body = "full", f"Here is my current code:\n```\n{code}\n```"
+        elif code == self.code:
+            kind, body = "unchanged", "My code is unchanged."
+        else:
+            diff = "\n".join(difflib.unified_diff(
+                self.code.splitlines(), code.splitlines(), "before", "after", n=2, lineterm=""
+            ))
+            if len(diff) < len(code):
+                kind, body = "diff", f"I changed my code:\n```diff\n{diff}\n```"
+            else:
+                kind, body = "full", f"I rewrote my code:\n```\n{code}\n```"
+        return {"role": "user", "content": f'{body}\n\nQuestion: "{user_query}"'}, kind
+
+    def payload(self, message: dict, model: str, stream: bool) -> dict:
+        return {
+            "model": model,
+            "messages": [self.system_message(), *self.messages, message],
+            "stream": stream,
+        }
+
+    def commit(self, message: dict, reply: str, code: str):
+        # Only turns the model actually answered become history; a failed turn is resent in full next time
+        self.messages += [message, {"role": "assistant", "content": reply}]
+        self.code = code
+        self.turns += 1
+        self.last_used = time.time()
+
+    def history_tokens(self) -> int:
+        return sum(estimate_tokens(m["content"]) for m in self.messages)
+
+    async def summarize(self, model: str) -> bool:
+        """
+        Folds all but the last YUVI_KEEP_TURNS exchanges into the summary. Changes the system message,
+        so the next turn pays one full prompt evaluation; every turn after that reuses the prefix again.
+        The lock is only held to snapshot and to swap in the result, so the user's next turn never
+        waits behind the model call; turns added meanwhile are kept.
+        """
+        async with self.lock:
+            keep = 2 * YUVI_KEEP_TURNS
+            if self.summarizing or len(self.messages) <= keep or self.history_tokens() <= YUVI_HISTORY_BUDGET:
+                return False
+            old = self.messages[:-keep] if keep else list(self.messages)
+            previous_summary = self.summary
+            self.summarizing = True
+        try:
+            transcript = "\n\n".join(f"{m['role'].upper()}: {m['content']}" for m in old)
+            previous = f"Earlier summary:\n{previous_summary}\n\n" if previous_summary else ""
+            request_priority.set("background")
+            result = await chat({
+                "model": model,
+                "messages": [{"role": "user", "content": SUMMARY_PROMPT.format(previous=previous, transcript=transcript)}],
+                "stream": False,
+            })
+            summary = (result.get("message") or {}).get("content", "").strip()
+            if not summary:
+                return False
+            async with self.lock:
+                # Turns are only ever appended (summarizing is exclusive), so old is still the prefix
+                self.summary = summary
+                self.messages = self.messages[len(old):]
+                # The full code may only exist in the turns just summarized away; pin the latest version
+                # so the next diff still has a base
+                self.anchor = self.code
+            return True
+        finally:
+            self.summarizing = False
+
+    def as_dict(self) -> dict:
+        return {
+            "session_id": self.id,
+            "turns": self.turns,
+            "history_tokens": self.history_tokens(),
+            "summarized": bool(self.summary),
+        }
+
+
+class YuviSessions:
+    def __init__(self, max_sessions: int = YUVI_MAX_SESSIONS, ttl: float = YUVI_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._tasks = set()
+        self._stats = {"created": 0, "resumed": 0, "full": 0, "diff": 0, "unchanged": 0, "summaries": 0}
+
+    def _expire(self):
+        now = time.time()
+        for session_id in [s for s, session in self._sessions.items() if now - session.last_used > self.ttl]:
+            del self._sessions[session_id]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def open(self, session_id: str, question: str) -> YuviSession:
+        """
+        Returns the session to continue, or a new one when the id is missing, unknown, expired or
+        was opened for a different problem. Clients may pick their own id (8-64 of [A-Za-z0-9_-]).
+        """
+        self._expire()
+        session = self._sessions.get(session_id) if session_id else None
+        if session and session.question == question:
+            self._sessions.move_to_end(session_id)
+            self._stats["resumed"] += 1
+            return session
+        if not (session_id and _SESSION_ID_RE.match(session_id)):
+            session_id = uuid.uuid4().hex
+        session = YuviSession(session_id, question)
+        self._sessions[session_id] = session
+        self._stats["created"] += 1
+        return session
+
+    def end(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def record(self, kind: str):
+        self._stats[kind] += 1
+
+    def maybe_summarize(self, session: YuviSession, model: str):
+        """
+        Summarizes in the background after a turn, so the user never waits for it.
+        """
+        if session.history_tokens() <= YUVI_HISTORY_BUDGET or len(session.messages) <= 2 * YUVI_KEEP_TURNS:
+            return
+        task = asyncio.create_task(self._summarize(session, model))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, session: YuviSession, model: str):
+        try:
+            if await session.summarize(model):
+                self._stats["summaries"] += 1
+        except Exception as e:
+            print(f"Yuvi session summary failed: {e}")
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"sessions": len(self._sessions), "max_sessions": self.max_sessions, **self._stats}
+
+
+yuvi_sessions = YuviSessions()
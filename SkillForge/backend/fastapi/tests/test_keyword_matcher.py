@@ -0,0 +1,31 @@
+from services.keyword_matcher import match_resume, ResumeCorpus
+
+JOB = "We need a Python developer with Kubernetes, Docker, AWS and machine learning experience. Rust is a plus."
+RESUME = "Software engineer. Skills: python, docker, aws. Built services on kubernetes. " + "Worked on backend APIs. " * 20
+
+
+def test_score_does_not_depend_on_earlier_calls():
+    before = match_resume(RESUME, JOB)
+    for i in range(30):
+        match_resume(f"Resume {i}: rust, machine learning, go, terraform. " + "Shipped features. " * i, JOB)
+        ResumeCorpus([f"Resume {i}: python, docker, aws, kubernetes"] * 3)
+    assert match_resume(RESUME, JOB) == before
+
+
+def test_batch_corpus_scores_every_resume_against_the_same_idf():
+    batch = [RESUME] + [f"Candidate {i}: python, docker, aws, kubernetes. " + "Team work. " * 10 for i in range(10)]
+    corpus = ResumeCorpus(batch)
+    first = [match_resume(text, JOB, corpus) for text in batch]
+    again = [match_resume(text, JOB, corpus) for text in reversed(batch)][::-1]
+    assert first == again
+    assert str(corpus) == str(ResumeCorpus(list(reversed(batch))))
+
+
+def test_skill_every_candidate_lists_counts_less():
+    batch = [f"Candidate {i}: python, docker, aws, kubernetes" for i in range(10)]
+    common = match_resume("python docker aws kubernetes", JOB, ResumeCorpus(batch))
+    assert common["ats_score"] < match_resume("python docker aws kubernetes", JOB)["ats_score"]
+
+
+def test_keyword_stuffing_does_not_raise_the_score():
+    assert match_resume(RESUME + " python" * 50, JOB)["ats_score"] == match_resume(RESUME, JOB)["ats_score"]
@@ -63,6 +63,7 @@ export default function DSADojoPage() {
     ]);
     const [userQuery, setUserQuery] = useState('');
     const [yuviThinking, setYuviThinking] = useState(false);
+    const [yuviSessionId, setYuviSessionId] = useState<string | null>(null);
     const chatEndRef = useRef<HTMLDivElement>(null);
 
     useEffect(() => {
@@ -142,11 +143,13 @@ export default function DSADojoPage() {
                 body: JSON.stringify({
                     code,
                     question: JSON.stringify(question),
-                    user_query: userQuery
+                    user_query: userQuery,
+                    session_id: yuviSessionId
                 }),
             });
 
             const data = await response.json();
+            setYuviSessionId(data.session_id ?? null);
             setChatHistory([...newHistory, { role: 'yuvi', content: data.response }]);
         } catch (error) {
             setChatHistory([...newHistory, { role: 'yuvi', content: "I'm having trouble connecting right now. Try again?" }]);
@@ -2,6 +2,7 @@
 
 import React, { useState } from 'react';
 import RoadmapDisplay from '../../components/RoadmapDisplay';
+import { authHeaders } from '../../lib/api';
 
 export default function RoadmapPage() {
     const [formData, setFormData] = useState({
@@ -29,6 +30,7 @@ export default function RoadmapPage() {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    ...(await authHeaders()),
                 },
                 body: JSON.stringify(formData),
             });
@@ -1,8 +1,16 @@
 // API client for SkillForge backend services
 
+import { getAccessToken } from './auth';
+
 const FASTAPI_URL = process.env.NEXT_PUBLIC_FASTAPI_URL || 'http://localhost:8000';
 const NODE_API_URL = process.env.NEXT_PUBLIC_NODE_API_URL || 'http://localhost:5000';
 
+// The backend stores results only for requests carrying a verified Supabase access token
+export async function authHeaders(): Promise<Record<string, string>> {
+  const token = await getAccessToken();
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
+
 // Types
 export interface AnalyzeResponse {
   filename: string;
@@ -75,6 +83,7 @@ export async function analyzeResume(file: File, jobDescription: string): Promise
 
   const response = await fetch(`${FASTAPI_URL}/analyze`, {
     method: 'POST',
+    headers: await authHeaders(),
     body: formData,
   });
 
@@ -91,6 +100,7 @@ export async function generateRoadmap(data: RoadmapRequest): Promise<RoadmapResp
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
+      ...(await authHeaders()),
     },
     body: JSON.stringify(data),
   });
@@ -159,13 +169,18 @@ export async function runCode(language: string, code: string, stdin: string = ''
   return response.json();
 }
 
-export async function askYuvi(code: string, question: string, userQuery: string): Promise<{ response: string }> {
+export async function askYuvi(
+  code: string,
+  question: string,
+  userQuery: string,
+  sessionId?: string
+): Promise<{ response: string; session_id: string }> {
   const response = await fetch(`${FASTAPI_URL}/dsa/yuvi`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
     },
-    body: JSON.stringify({ code, question, user_query: userQuery }),
+    body: JSON.stringify({ code, question, user_query: userQuery, session_id: sessionId }),
   });
 
   if (!response.ok) {
@@ -7,6 +7,13 @@ export const getCurrentUser = async () => {
   return user;
 };
 
+// Get the signed-in user's access token, for the backend to verify
+export const getAccessToken = async (): Promise<string | null> => {
+  const supabase = createClient();
+  const { data: { session } } = await supabase.auth.getSession();
+  return session?.access_token || null;
+};
+
 // Check if user is authenticated
 export const isAuthenticated = async (): Promise<boolean> => {
   const user = await getCurrentUser();
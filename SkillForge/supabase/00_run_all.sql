@@ -34,6 +34,9 @@
 -- Step 10: Create certificates table
 \i 10_create_certificates.sql
 
+-- Step 11: Add input hashes used by the FastAPI result store
+\i 11_add_result_input_hash.sql
+
 -- Verify setup
 SELECT 'Database setup complete!' AS status;
 
@@ -0,0 +1,11 @@
+-- Add input_hash to resume_analyses and career_roadmaps
+-- Lets the FastAPI backend return a stored result for identical inputs instead of regenerating it
+
+ALTER TABLE public.resume_analyses ADD COLUMN IF NOT EXISTS input_hash TEXT;
+ALTER TABLE public.career_roadmaps ADD COLUMN IF NOT EXISTS input_hash TEXT;
+
+-- Lookups are always scoped to one user
+CREATE INDEX IF NOT EXISTS resume_analyses_user_input_hash_idx
+    ON public.resume_analyses(user_id, input_hash, created_at DESC);
+CREATE INDEX IF NOT EXISTS career_roadmaps_user_input_hash_idx
+    ON public.career_roadmaps(user_id, input_hash, created_at DESC);